@@ -0,0 +1,43 @@
+"""About: Throughput benchmark of parse_activity_overview over saved activity overview pages (run from the repository root: python -m benchmarks.benchmark_activity_parser)."""
+
+# Import packages
+
+import glob
+import os
+import time
+
+from strava_club_scraper.parser_utils import parse_activity_overview
+
+
+# Settings and variables
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'activity_overview_*.html')))
+
+REPEATS = 2000
+
+
+# Functions
+
+
+def benchmark_activity_parser(*, repeats: int = REPEATS) -> dict[str, float]:
+    """Parse each fixture repeats times, returning the parsed pages per second of each fixture."""
+    throughputs = {}
+
+    for fixture in FIXTURES:
+        with open(fixture, encoding='utf-8') as file:
+            html = file.read()
+
+        start = time.perf_counter()
+
+        for _ in range(repeats):
+            parse_activity_overview(html=html)
+
+        throughputs[os.path.basename(fixture)] = repeats / (time.perf_counter() - start)
+
+    # Return objects
+    return throughputs
+
+
+if __name__ == '__main__':
+    for fixture, throughput in benchmark_activity_parser().items():
+        print(f'{fixture}: {throughput:,.0f} pages/s ({1000 / throughput:.3f} ms/page)')
@@ -0,0 +1,118 @@
+"""About: Benchmark of the vectorized duration and unit conversions (transform_utils) against the previous row-wise apply conversions (run from the repository root: python -m benchmarks.benchmark_durations)."""
+
+# Import packages
+
+import random
+import re
+import time
+
+import pandas as pd
+
+from strava_club_scraper.transform_utils import durations_to_seconds, units_to_float
+
+
+# Settings and variables
+
+ROWS = 200_000
+
+
+# Functions
+
+
+def get_seconds(*, time_str: str) -> int:
+    """Get seconds from time (previous helper of the activities conversion)."""
+    h, m, s = time_str.split(sep=':')
+
+    # Return objects
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+
+def activities_durations_apply(*, series: pd.Series) -> pd.Series:
+    """Previous activities elapsed_time/moving_time conversion: two row-wise apply, with re.sub, split and get_seconds per row."""
+    series = series.apply(
+        lambda row: (
+            re.sub(pattern=r'^([0-9]+)s$', repl=r'00:00:\1', string=row, flags=0)
+            if len(row.split(sep=':')) == 1
+            else (re.sub(pattern=r'^(.*)$', repl=r'00:\1', string=row, flags=0) if len(row.split(sep=':')) == 2 else row)
+        )
+        if not pd.isna(row)
+        else row,
+    )
+
+    # Return objects
+    return series.apply(lambda row: get_seconds(time_str=str(row)) if not pd.isna(row) else row)
+
+
+def leaderboard_durations_apply(*, series: pd.Series) -> pd.Series:
+    """Previous leaderboard moving_time conversion: chained regex replaces and a row-wise apply splitting each value twice."""
+    series = series.fillna(value='0m', axis=0)
+    series = series.replace(to_replace=r'^([0-9]+m)$', value=r'00:\1', regex=True)
+    series = series.replace(to_replace=r'h ', value=r':', regex=True)
+    series = series.replace(to_replace=r'm$', value=r'', regex=True)
+
+    # Return objects
+    return series.apply(lambda row: float(row.split(sep=':')[0]) * 3600 + float(row.split(sep=':')[1]) * 60)
+
+
+def distances_replace(*, series: pd.Series) -> pd.Series:
+    """Previous leaderboard distance conversion: chained regex replaces and astype."""
+    series = series.replace(to_replace=r',', value=r'', regex=True)
+    series = series.replace(to_replace=r'\s+km$', value=r'', regex=True)
+    series = series.replace(to_replace=r'^--$', value=r'0', regex=True)
+
+    # Return objects
+    return series.astype(dtype='float') * 1000
+
+
+def benchmark(*, function: callable, series: pd.Series, repeats: int = 3) -> tuple[float, pd.Series]:
+    """Best time of repeats runs of function over series, and its result."""
+    times = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(series=series)
+        times.append(time.perf_counter() - start)
+
+    # Return objects
+    return min(times), result
+
+
+def benchmark_durations(*, rows: int = ROWS) -> list[tuple[str, float, float]]:
+    """Compare the previous and the vectorized conversions over rows random values of each column, checking that both give the same values."""
+    random.seed(0)
+
+    columns = {
+        'activities moving_time': (
+            pd.Series(data=[random.choice([f'{random.randint(1, 9)}:{random.randint(0, 59):02d}:{random.randint(0, 59):02d}', f'{random.randint(1, 59)}:{random.randint(0, 59):02d}', f'{random.randint(1, 59)}s']) for _ in range(rows)], dtype='object'),
+            activities_durations_apply,
+            durations_to_seconds,
+        ),
+        'leaderboard moving_time': (
+            pd.Series(data=[random.choice([f'{random.randint(1, 30)}h {random.randint(0, 59)}m', f'{random.randint(1, 59)}m']) for _ in range(rows)], dtype='object'),
+            leaderboard_durations_apply,
+            durations_to_seconds,
+        ),
+        'leaderboard distance': (
+            pd.Series(data=[random.choice([f'{random.uniform(0, 2000):,.1f} km', '--']) for _ in range(rows)], dtype='object'),
+            distances_replace,
+            lambda series: units_to_float(series=series, unit='km', factor=1000, placeholder_value=0),
+        ),
+    }
+
+    results = []
+
+    for column, (series, previous, vectorized) in columns.items():
+        time_previous, result_previous = benchmark(function=previous, series=series)
+        time_vectorized, result_vectorized = benchmark(function=vectorized, series=series)
+
+        pd.testing.assert_series_equal(left=result_previous.astype(dtype='float'), right=result_vectorized.astype(dtype='float'), check_names=False)
+
+        results.append((column, time_previous, time_vectorized))
+
+    # Return objects
+    return results
+
+
+if __name__ == '__main__':
+    for column, time_previous, time_vectorized in benchmark_durations():
+        print(f'{column} ({ROWS:,} rows): apply {time_previous:.3f}s, vectorized {time_vectorized:.3f}s (x{time_previous / time_vectorized:.1f})')
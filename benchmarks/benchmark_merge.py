@@ -0,0 +1,89 @@
+"""About: Benchmark of the hashed-key anti join merge (merge_club_datasets) against the previous outer merge with indicator, at 10k, 100k and 1M stored rows (run from the repository root: python -m benchmarks.benchmark_merge)."""
+
+# Import packages
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from strava_club_scraper.sink_utils import DATASET_MERGE_KEYS, LEADERBOARD_MEMBER_COLUMNS, club_dataset, merge_club_datasets
+
+
+# Settings and variables
+
+ROWS = [10_000, 100_000, 1_000_000]
+
+
+# Functions
+
+
+def merge_club_datasets_previous(*, df: pd.DataFrame, df_import: pd.DataFrame) -> pd.DataFrame:
+    """Previous merge of a scraped dataset df into the stored rows df_import: outer merge with indicator on the deduplicated keys, then query of the 'left_only' rows."""
+    if not df_import.empty:
+        dataset = club_dataset(columns=df.columns)
+        keys = DATASET_MERGE_KEYS[dataset]
+
+        if dataset == 'leaderboard':
+            df_import = df_import.drop(columns=LEADERBOARD_MEMBER_COLUMNS, errors='ignore')
+
+        left, right = (df, df_import) if dataset == 'members' else (df_import, df)
+        left = left.merge(right=right.filter(items=keys).drop_duplicates(subset=None, keep='first', ignore_index=True), how='outer', on=keys, indicator=True).query(expr='_merge == "left_only"').drop(columns=['_merge'], errors='ignore')
+
+        df, df_import = (left, df_import) if dataset == 'members' else (df, left)
+
+    # Return objects
+    return pd.concat(objs=[df, df_import], axis=0, ignore_index=True, sort=False)
+
+
+def club_datasets(*, dataset: str, rows: int, rng: np.random.Generator) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Random stored rows of a dataset and scraped rows (a tenth of the stored rows: half of them scraped again, half new)."""
+    ids = rng.permutation(rows * 2)[:rows]
+    scraped = rows // 10
+    scraped_ids = np.concatenate([ids[: scraped // 2], np.arange(rows * 2, rows * 2 + scraped // 2)])
+
+    if dataset == 'activities':
+
+        def frame(*, ids: np.ndarray, date: str) -> pd.DataFrame:
+            return pd.DataFrame(data={'club_id': (ids % 5).astype(str), 'activity_id': ids.astype(str), 'activity_date': pd.Timestamp(date), 'distance': rng.random(len(ids)), 'activity_kudos': rng.integers(0, 9, len(ids))})
+
+    else:
+
+        def frame(*, ids: np.ndarray, date: str) -> pd.DataFrame:
+            return pd.DataFrame(data={'club_id': (ids % 5).astype(str), 'athlete_id': ids.astype(str), 'join_date': pd.Timestamp(date), 'athlete_name': f'Athlete {date}'})
+
+    # Return objects
+    return frame(ids=scraped_ids, date='2023-02-01'), frame(ids=ids, date='2023-01-01')
+
+
+def benchmark_merge(*, rows: list[int] = ROWS) -> list[tuple[str, int, float, float]]:
+    """Merge scraped rows into rows stored rows of each dataset with both merges, checking that they give the same rows, and return the seconds of each."""
+    rng = np.random.default_rng(seed=0)
+
+    results = []
+
+    for dataset, key in (('activities', 'activity_id'), ('members', 'athlete_id')):
+        for stored_rows in rows:
+            df, df_import = club_datasets(dataset=dataset, rows=stored_rows, rng=rng)
+
+            timings = []
+            merged = []
+
+            for merge in (merge_club_datasets_previous, merge_club_datasets):
+                start = time.perf_counter()
+                df_updated = merge(df=df, df_import=df_import)
+                timings.append(time.perf_counter() - start)
+
+                merged.append(df_updated.sort_values(by=['club_id', key], ignore_index=True))
+
+            pd.testing.assert_frame_equal(left=merged[0], right=merged[1], check_dtype=False)
+
+            results.append((dataset, stored_rows, *timings))
+
+    # Return objects
+    return results
+
+
+if __name__ == '__main__':
+    for dataset, stored_rows, time_previous, time_anti_join in benchmark_merge():
+        print(f'{dataset} ({stored_rows:,} stored rows): outer merge {time_previous:.3f}s, anti join {time_anti_join:.3f}s (x{time_previous / time_anti_join:.1f})')
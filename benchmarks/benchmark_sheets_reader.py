@@ -0,0 +1,107 @@
+"""About: Benchmark of the schema-driven Google Sheets reader (google_sheets_df) against the previous read_google_sheets conversions, over synthetic club activities sheet values (run from the repository root: python -m benchmarks.benchmark_sheets_reader)."""
+
+# Import packages
+
+import random
+import time
+from typing import Any
+
+from dateutil import parser
+import pandas as pd
+
+from strava_club_scraper.sheets_utils import google_sheets_df
+from strava_club_scraper.sink_utils import DATASET_SCHEMAS
+from strava_club_scraper.strava_club_scraper import CLUB_ACTIVITIES_COLUMNS
+
+
+# Settings and variables
+
+ROWS = 60_000
+
+
+# Functions
+
+
+def read_google_sheets_previous(*, values: list[list[str]]) -> pd.DataFrame:
+    """Previous read_google_sheets conversions (formatted values): regex replace of the blank cells over the whole DataFrame, dateutil parse of each date and one astype per numeric column."""
+    df_import = pd.DataFrame(data=values[1:], index=None, columns=values[0], dtype='str')
+    df_import = df_import.replace(to_replace=r'^\s*$', value=None, regex=True)
+
+    for column, dtype in DATASET_SCHEMAS['activities'].items():
+        if dtype == 'date':
+            df_import[column] = df_import[column].apply(parser.parse)
+
+        elif dtype in {'float', 'int'}:
+            df_import = df_import.astype(dtype={column: dtype})
+
+    # Return objects
+    return df_import
+
+
+def activities_values(*, rows: int) -> tuple[list[list[str]], list[list[Any]]]:
+    """Random club activities sheet values: formatted (as read by the previous reader) and unformatted (as read by google_sheets_values)."""
+    schema = DATASET_SCHEMAS['activities']
+
+    def cell(*, column: str) -> Any:
+        dtype = schema.get(column, 'str')
+
+        if dtype == 'float':
+            return random.choice([12.5, 300, ''])
+
+        if dtype == 'int':
+            return random.randint(0, 20)
+
+        if dtype == 'date':
+            return f'2023-07-{random.randint(1, 28):02d}'
+
+        if dtype == 'bool':
+            return random.choice([True, False])
+
+        if column in {'club_id', 'athlete_id', 'activity_id'}:
+            return random.randint(1, 10**9)
+
+        return random.choice(['Morning Run', 'Evening Ride', ''])
+
+    values = [CLUB_ACTIVITIES_COLUMNS] + [[cell(column=column) for column in CLUB_ACTIVITIES_COLUMNS] for _ in range(rows)]
+    values_formatted = [[str(value).upper() if isinstance(value, bool) else str(value) for value in row] for row in values]
+
+    # Return objects
+    return values_formatted, values
+
+
+def benchmark(*, function: callable, values: list[list[Any]], repeats: int = 3) -> float:
+    """Best time of repeats conversions of values by function."""
+    times = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(values=values)
+        times.append(time.perf_counter() - start)
+
+    # Return objects
+    return min(times)
+
+
+def benchmark_sheets_reader(*, rows: int = ROWS) -> dict[str, float]:
+    """Convert rows random club activities with both readers, checking that they give the same numeric and date columns, and return the seconds of each."""
+    random.seed(0)
+
+    values_formatted, values = activities_values(rows=rows)
+
+    df_previous = read_google_sheets_previous(values=values_formatted)
+    df = google_sheets_df(values=values)
+
+    for column, dtype in DATASET_SCHEMAS['activities'].items():
+        if dtype in {'date', 'float', 'int'}:
+            pd.testing.assert_series_equal(left=df_previous[column], right=df[column], check_dtype=False)
+
+    # Return objects
+    return {
+        'read_google_sheets (previous)': benchmark(function=read_google_sheets_previous, values=values_formatted),
+        'google_sheets_df': benchmark(function=google_sheets_df, values=values),
+    }
+
+
+if __name__ == '__main__':
+    for name, seconds in benchmark_sheets_reader().items():
+        print(f'{name} ({ROWS:,} rows): {seconds:.3f}s')
@@ -0,0 +1,131 @@
+"""About: Micro-benchmark of the table-driven stat parser (parse_stats) against the previous per-item conversion loop, over recorded "More stats" strings (run from the repository root: python -m benchmarks.benchmark_stat_parser)."""
+
+# Import packages
+
+import re
+import time
+from typing import Any
+
+from strava_club_scraper.parser_utils import MORE_STATS_LABELS, convert_list_to_dictionary, parse_stats
+
+
+# Settings and variables
+
+# "More stats" section texts of recorded activity overview pages (as returned by html_element_text)
+RECORDED_MORE_STATS = [
+    'Show Less\nAvg Max\nSpeed 25.3km/h 55.1km/h\nHeart Rate 140 bpm 170 bpm\nCadence 85 110\nPower 1,201 W 1,550 W\nCalories 1,234\nTemperature 21 ℃\nElapsed Time 1:45:00',
+    'Show More\nAvg Max\nHeart Rate 152 bpm 181 bpm\nCadence 172 188\nCalories 712\nElapsed Time 54:03',
+    'Show More\nAvg Max\nSpeed 31.2km/h 62.4km/h\nPower 245 W 812 W\nCalories 2,045\nTemperature 14 ℃\nElapsed Time 3:02:11',
+    'Show Less\nAvg Max\nSpeed 4.8km/h 7.1km/h\nHeart Rate 101 bpm 128 bpm\nCalories —\nElapsed Time 2:11:40',
+]
+
+REPEATS = 5000
+
+
+# Functions
+
+
+def more_stats_labels(*, text: str) -> dict[str, str]:
+    """Split a "More stats" section text into label and value pairs (shared by both parsers)."""
+    for pattern, repl in MORE_STATS_LABELS:
+        text = pattern.sub(repl, text)
+
+    # Return objects
+    return convert_list_to_dictionary(to_convert=text.split(sep='\n'))
+
+
+def convert_stats_loop(*, stats: dict[str, str]) -> dict[str, Any]:
+    """Previous conversion of the "More stats": every conversion (uncompiled re.sub calls, exceptions as control flow) re-run for every stat item."""
+    d = {}
+
+    for item, value in stats.items():
+        d[item] = value
+
+        for label in ['Max Speed', 'Average Speed']:
+            try:
+                d[label] = re.sub(pattern=r'km/h$', repl=r'', string=d[label], flags=0)
+                d[label] = float(d[label]) / 3.6
+
+            except Exception:
+                pass
+
+        for label in ['Max Heart Rate', 'Average Heart Rate']:
+            try:
+                d[label] = re.sub(pattern=r' bpm', repl=r'', string=d[label], flags=0)
+                d[label] = float(d[label])
+
+            except Exception:
+                pass
+
+        for label in ['Max Cadence', 'Average Cadence']:
+            try:
+                d[label] = float(d[label])
+
+            except Exception:
+                pass
+
+        for label in ['Max Power', 'Average Power']:
+            try:
+                d[label] = re.sub(pattern=r',', repl=r'', string=d[label], flags=0)
+                d[label] = re.sub(pattern=r' W', repl=r'', string=d[label], flags=0)
+                d[label] = float(d[label])
+
+            except Exception:
+                pass
+
+        try:
+            d['Elevation'] = re.sub(pattern=r',', repl=r'', string=d['Elevation'], flags=0)
+            d['Elevation'] = re.sub(pattern=r'm$', repl=r'', string=d['Elevation'], flags=0)
+            d['Elevation'] = float(d['Elevation'])
+
+        except Exception:
+            pass
+
+        try:
+            d['Calories'] = re.sub(pattern=r',', repl=r'', string=d['Calories'], flags=0)
+            d['Calories'] = re.sub(pattern='—', repl=r'', string=d['Calories'], flags=0)
+            d['Calories'] = None if d['Calories'] == '' else float(d['Calories'])
+
+        except Exception:
+            pass
+
+        try:
+            d['Steps'] = re.sub(pattern=r',', repl=r'', string=d['Steps'], flags=0)
+            d['Steps'] = float(d['Steps'])
+
+        except Exception:
+            pass
+
+        try:
+            d['Temperature'] = re.sub(pattern=r'^([0-9]+).*', repl=r'\1', string=d['Temperature'], flags=0)
+            d['Temperature'] = float(d['Temperature'])
+
+        except Exception:
+            pass
+
+    # Return objects
+    return d
+
+
+def benchmark_stat_parser(*, repeats: int = REPEATS) -> dict[str, float]:
+    """Convert the recorded stats repeats times with both parsers, returning the microseconds per activity of each."""
+    recorded_stats = [more_stats_labels(text=text) for text in RECORDED_MORE_STATS]
+
+    timings = {}
+
+    for name, convert in (('conversion loop', convert_stats_loop), ('parse_stats', parse_stats)):
+        start = time.perf_counter()
+
+        for _ in range(repeats):
+            for stats in recorded_stats:
+                convert(stats=stats)
+
+        timings[name] = (time.perf_counter() - start) / (repeats * len(recorded_stats)) * 1e6
+
+    # Return objects
+    return timings
+
+
+if __name__ == '__main__':
+    for name, microseconds in benchmark_stat_parser().items():
+        print(f'{name}: {microseconds:.1f} us/activity')
@@ -0,0 +1,55 @@
+"""About: Benchmark of pooled WebDriver sessions (WebDriverPool) against cold WebDriver starts, i.e. the time to get a ready session (requires Chrome or Firefox and their driver, run from the repository root: python -m benchmarks.benchmark_webdriver_pool)."""
+
+# Import packages
+
+import tempfile
+import time
+
+from strava_club_scraper.selenium_utils import WebDriverPool, selenium_webdriver
+
+
+# Settings and variables
+
+WEB_BROWSER = 'chrome'
+
+# Sessions requested (e.g. one per club of strava_club_leaderboard or per worker of strava_club_activities)
+SESSIONS = 8
+
+POOL_SIZE = 2
+
+
+# Functions
+
+
+def benchmark_cold_starts(*, sessions: int = SESSIONS) -> float:
+    """Start and quit sessions WebDriver sessions one after the other, returning the average seconds to get a ready session."""
+    elapsed = 0.0
+
+    for _ in range(sessions):
+        start = time.perf_counter()
+        driver = selenium_webdriver(web_browser=WEB_BROWSER, headless=True)
+        elapsed += time.perf_counter() - start
+
+        driver.quit()
+
+    # Return objects
+    return elapsed / sessions
+
+
+def benchmark_pool(*, sessions: int = SESSIONS, size: int = POOL_SIZE) -> dict[str, float]:
+    """Acquire and release sessions WebDriver sessions of a pool of size sessions (persistent user_data_dir per slot), returning the report of the pool."""
+    with tempfile.TemporaryDirectory() as user_data_dir, WebDriverPool(size=size, user_data_dir=user_data_dir, web_browser=WEB_BROWSER, headless=True) as pool:
+        for _ in range(sessions):
+            driver = pool.acquire()
+            driver.get('about:blank')
+            pool.release(driver=driver)
+
+        report = pool.report()
+
+    # Return objects
+    return report
+
+
+if __name__ == '__main__':
+    print(f'cold start: {benchmark_cold_starts():.3f}s/session')
+    print(f'pool: {benchmark_pool()}')
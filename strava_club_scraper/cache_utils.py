@@ -0,0 +1,193 @@
+"""About: Persistent SQLite caches for scraped Strava data and geocoded locations."""
+
+# Import packages
+
+from datetime import datetime, timedelta
+import json
+import sqlite3
+import threading
+from typing import Any
+
+
+# Classes
+
+
+class ActivityCache:
+    """
+    SQLite cache of parsed activity overview pages, keyed by activity_id.
+
+    refresh_fields: fields that can still change after the activity was uploaded (e.g. activity_kudos), with the activity age until which they are refreshed. A cached activity is a hit only if, for every refresh field, it was scraped after the activity was older than the given age; all other fields are considered immutable.
+    max_age: entries scraped longer ago are evicted.
+    max_entries: maximum number of entries kept (the most recently scraped ones).
+    """
+
+    def __init__(self, *, path: str, refresh_fields: dict[str, timedelta] | None = None, max_age: timedelta | None = timedelta(days=365), max_entries: int | None = None) -> None:
+        self.path = path
+        self.refresh_fields = {'activity_kudos': timedelta(days=7)} if refresh_fields is None else refresh_fields
+        self.max_age = max_age
+        self.max_entries = max_entries
+
+        self.connection = sqlite3.connect(database=path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS activities (activity_id TEXT PRIMARY KEY, activity_date TEXT NOT NULL, scraped_at TEXT NOT NULL, data TEXT NOT NULL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS activities_scraped_at ON activities (scraped_at)')
+        self.connection.commit()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+        self.lock = threading.Lock()
+
+    def is_fresh(self, *, activity_date: datetime, scraped_at: datetime) -> bool:
+        """Check if no refresh field of a cached activity can have changed since it was scraped."""
+        return all(scraped_at - activity_date >= refresh_age for refresh_age in self.refresh_fields.values())
+
+    def get(self, *, activity_id: str) -> dict[str, Any] | None:
+        """Get a cached activity, None if it is not cached or needs to be refreshed."""
+        with self.lock:
+            row = self.connection.execute('SELECT activity_date, scraped_at, data FROM activities WHERE activity_id = ?', (activity_id,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            if not self.is_fresh(activity_date=datetime.fromisoformat(row[0]), scraped_at=datetime.fromisoformat(row[1])):
+                self.refreshes += 1
+                return None
+
+            self.hits += 1
+
+        d = json.loads(row[2])
+        d['activity_date'] = datetime.fromisoformat(d['activity_date'])
+
+        # Return objects
+        return d
+
+    def put(self, *, activity_id: str, d: dict[str, Any]) -> None:
+        """Store a parsed activity (club_id excluded, as the same activity can belong to multiple clubs)."""
+        data = json.dumps({key: value for key, value in d.items() if key != 'club_id'}, default=lambda value: value.isoformat())
+
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO activities (activity_id, activity_date, scraped_at, data) VALUES (?, ?, ?, ?)',
+                (activity_id, d['activity_date'].isoformat(), datetime.now().isoformat(), data),
+            )
+            self.connection.commit()
+
+    def evict(self) -> int:
+        """Evict entries older than max_age and beyond max_entries. Returns the number of evicted entries."""
+        with self.lock:
+            evicted = 0
+
+            if self.max_age is not None:
+                evicted += self.connection.execute('DELETE FROM activities WHERE scraped_at < ?', ((datetime.now() - self.max_age).isoformat(),)).rowcount
+
+            if self.max_entries is not None:
+                evicted += self.connection.execute(
+                    'DELETE FROM activities WHERE activity_id NOT IN (SELECT activity_id FROM activities ORDER BY scraped_at DESC LIMIT ?)',
+                    (self.max_entries,),
+                ).rowcount
+
+            self.connection.commit()
+
+        # Return objects
+        return evicted
+
+    def report(self) -> dict[str, int]:
+        """Get the statistics of the cache."""
+        with self.lock:
+            report = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'entries': self.connection.execute('SELECT COUNT(*) FROM activities').fetchone()[0],
+            }
+
+        # Return objects
+        return report
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class GeocodeCache:
+    """
+    SQLite cache of geocoded locations (country_code and country), keyed by normalized location string. Locations not found are cached too, so that they are not sent to the geocoder again.
+
+    max_age: entries geocoded longer ago are evicted.
+    max_entries: maximum number of entries kept (the most recently geocoded ones).
+    """
+
+    def __init__(self, *, path: str, max_age: timedelta | None = timedelta(days=365), max_entries: int | None = None) -> None:
+        self.path = path
+        self.max_age = max_age
+        self.max_entries = max_entries
+
+        self.connection = sqlite3.connect(database=path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS geocodes (location TEXT PRIMARY KEY, country_code TEXT, country TEXT, geocoded_at TEXT NOT NULL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS geocodes_geocoded_at ON geocodes (geocoded_at)')
+        self.connection.commit()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+        self.lock = threading.Lock()
+
+    def get(self, *, location: str) -> dict[str, str | None] | None:
+        """Get a cached location (country_code and country, None values if it was not found by the geocoder), None if it is not cached."""
+        with self.lock:
+            row = self.connection.execute('SELECT country_code, country FROM geocodes WHERE location = ?', (location,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        # Return objects
+        return {'country_code': row[0], 'country': row[1]}
+
+    def put(self, *, location: str, country_code: str | None, country: str | None) -> None:
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO geocodes (location, country_code, country, geocoded_at) VALUES (?, ?, ?, ?)',
+                (location, country_code, country, datetime.now().isoformat()),
+            )
+            self.connection.commit()
+
+    def evict(self) -> int:
+        """Evict entries older than max_age and beyond max_entries. Returns the number of evicted entries."""
+        with self.lock:
+            evicted = 0
+
+            if self.max_age is not None:
+                evicted += self.connection.execute('DELETE FROM geocodes WHERE geocoded_at < ?', ((datetime.now() - self.max_age).isoformat(),)).rowcount
+
+            if self.max_entries is not None:
+                evicted += self.connection.execute(
+                    'DELETE FROM geocodes WHERE location NOT IN (SELECT location FROM geocodes ORDER BY geocoded_at DESC LIMIT ?)',
+                    (self.max_entries,),
+                ).rowcount
+
+            self.connection.commit()
+
+        # Return objects
+        return evicted
+
+    def report(self) -> dict[str, int | float]:
+        """Get the statistics of the cache."""
+        with self.lock:
+            report = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / (self.hits + self.misses), 3) if self.hits + self.misses else None,
+                'entries': self.connection.execute('SELECT COUNT(*) FROM geocodes').fetchone()[0],
+            }
+
+        # Return objects
+        return report
+
+    def close(self) -> None:
+        self.connection.close()
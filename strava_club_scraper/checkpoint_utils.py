@@ -0,0 +1,87 @@
+"""About: Append-only progress journal for crash-resumable scraping runs."""
+
+# Import packages
+
+from datetime import datetime
+import hashlib
+import json
+import os
+import threading
+from typing import Any
+
+
+# Classes
+
+
+class RunJournal:
+    """
+    Append-only JSON Lines progress journal of a scraping run (collected feed activities_id per club and completed activities, independent of the club).
+
+    The journal file is identified by the run parameters: a run restarted with the same parameters loads the progress of the interrupted run instead of starting over.
+    """
+
+    def __init__(self, *, directory: str, parameters: dict[str, Any]) -> None:
+        run_id = hashlib.sha256(json.dumps(parameters, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'run_{run_id}.jsonl')
+
+        # Progress of an interrupted run
+        self.feeds = {}
+        self.activities = {}
+
+        if os.path.exists(self.path):
+            valid_size = 0
+
+            with open(self.path, mode='rb') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+
+                    # Last line truncated by the crash
+                    except json.JSONDecodeError:
+                        break
+
+                    if not line.endswith(b'\n'):
+                        break
+
+                    valid_size += len(line)
+
+                    if record['type'] == 'feed':
+                        self.feeds[record['club_id']] = record['activities_id']
+
+                    if record['type'] == 'activity':
+                        d = record['activity']
+                        d['activity_date'] = datetime.fromisoformat(d['activity_date'])
+                        self.activities[d['activity_id']] = d
+
+            # Remove the truncated line, so that new records are appended after the last complete one
+            os.truncate(self.path, valid_size)
+
+        self.file = open(self.path, mode='a', encoding='utf-8')
+        self.lock = threading.Lock()
+
+    def append(self, *, record: dict[str, Any]) -> None:
+        """Append a record and flush it to disk."""
+        with self.lock:
+            self.file.write(json.dumps(record, default=lambda value: value.isoformat()) + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def record_feed(self, *, club_id: str, activities_id: list[str]) -> None:
+        self.feeds[club_id] = activities_id
+        self.append(record={'type': 'feed', 'club_id': club_id, 'activities_id': activities_id})
+
+    def record_activity(self, *, d: dict[str, Any]) -> None:
+        d = {key: value for key, value in d.items() if key != 'club_id'}
+        self.activities[d['activity_id']] = d
+        self.append(record={'type': 'activity', 'activity': d})
+
+    def close(self) -> None:
+        """Close the journal file (no-op if already closed)."""
+        self.file.close()
+
+    def complete(self) -> None:
+        """Close and delete the journal once the run finished."""
+        self.close()
+        os.remove(self.path)
@@ -0,0 +1,214 @@
+"""About: Country resolution of free-text athlete locations (persistent cache, offline gazetteer and network geocoder)."""
+
+# Import packages
+
+import csv
+import functools
+from importlib import resources
+import logging
+import queue
+import re
+import threading
+import unicodedata
+
+from geopy.exc import GeopyError
+from geopy.extra.rate_limiter import RateLimiter
+from geopy.geocoders import Nominatim
+
+from .cache_utils import GeocodeCache
+
+
+# Settings and variables
+
+logger = logging.getLogger(name=__name__)
+
+
+# Functions
+
+
+def normalize_location(*, location: str) -> str:
+    """Normalize a location string (Unicode normalization, case folding and collapsed whitespaces), used as geocode cache key."""
+    return ' '.join(unicodedata.normalize('NFKC', location).casefold().split())
+
+
+def gazetteer_key(*, name: str) -> str:
+    """Gazetteer lookup key of a place name (normalized location without accents and dots, e.g. 'U.S.A.' -> 'usa')."""
+    name = unicodedata.normalize('NFKD', normalize_location(location=name))
+    name = ''.join(character for character in name if not unicodedata.combining(character))
+
+    # Return objects
+    return re.sub(pattern=r'\.', repl=r'', string=name, flags=0).strip()
+
+
+@functools.cache
+def load_gazetteer() -> dict[str, tuple[str, str] | None]:
+    """
+    Load the bundled gazetteer (countries, with their English/native names and common abbreviations, and first-level regions of common countries) as a mapping of gazetteer_key to (country_code, country).
+
+    Names of places in different countries (e.g. 'Georgia', listed once per country, or 'Victoria', listed without a country) are ambiguous and map to None, their locations being resolved by the geocoder.
+    """
+    gazetteer = {}
+
+    with resources.files(__package__).joinpath('data', 'gazetteer.csv').open(mode='r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            key = gazetteer_key(name=row['name'])
+            value = (row['country_code'], row['country']) if row['country_code'] else None
+
+            gazetteer[key] = value if gazetteer.get(key, value) == value else None
+
+    # Return objects
+    return gazetteer
+
+
+def resolve_country_offline(*, location: str) -> dict[str, str] | None:
+    """
+    Resolve the country of a 'City, Region, Country' location with the bundled gazetteer, None if it cannot be resolved offline.
+
+    The location parts are looked up from the last one (usually the country, else the region): the first part found in the gazetteer decides.
+    """
+    gazetteer = load_gazetteer()
+
+    for part in reversed(location.split(sep=',')):
+        key = gazetteer_key(name=part)
+
+        if key in gazetteer:
+            if gazetteer[key] is None:
+                return None
+
+            country_code, country = gazetteer[key]
+
+            return {'country_code': country_code, 'country': country}
+
+    # Return objects
+    return None
+
+
+# Classes
+
+
+class LocationCountryResolver:
+    """
+    Resolve the country (country_code and country) of athlete locations: offline with the bundled gazetteer, else from the geocode cache, else with the Nominatim geocoder (at most one request per min_delay_seconds, results stored in the cache).
+
+    geocode_cache: persistent cache of the geocoder results; None to query the geocoder for each location not resolved offline.
+
+    Locations can also be resolved in a background thread (a single one, so that the geocoder policy of one request per second holds): locations submitted while scraping are queued and deduplicated, and join() returns the countries of all submitted locations.
+    """
+
+    def __init__(self, *, geocode_cache: GeocodeCache | None = None, user_agent: str = 'strava-club-scraper', min_delay_seconds: float = 1.0) -> None:
+        self.geocode_cache = geocode_cache
+        # Geocoder errors (e.g. timeouts, "Too Many Requests", service errors) are raised after the retries of the rate limiter, to not be cached as locations not found
+        self.geocode = RateLimiter(Nominatim(user_agent=user_agent).geocode, min_delay_seconds=min_delay_seconds, swallow_exceptions=False)
+
+        # Statistics
+        self.resolved_cache = 0
+        self.resolved_offline = 0
+        self.resolved_network = 0
+
+        # Background resolution
+        self.locations = queue.Queue()
+        self.submitted = set()
+        self.countries = {}
+        self.thread = None
+        self.error = None
+
+        self.lock = threading.Lock()
+
+    def worker(self) -> None:
+        """Resolve the queued locations until the end of the queue (None)."""
+        while True:
+            location = self.locations.get()
+
+            if location is None:
+                break
+
+            try:
+                self.countries[location] = self.resolve(location=location)
+
+            except Exception as error:
+                self.error = error
+                break
+
+    def submit(self, *, location: str) -> None:
+        """Queue a location to be resolved in the background (locations already submitted are skipped)."""
+        if location in self.submitted:
+            return
+
+        self.submitted.add(location)
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.worker, name='location-country-resolver', daemon=True)
+            self.thread.start()
+
+        self.locations.put(location)
+
+    def join(self) -> dict[str, dict[str, str | None]]:
+        """Wait for the submitted locations to be resolved and get their country_code and country, by location."""
+        if self.thread is not None:
+            self.locations.put(None)
+            self.thread.join()
+            self.thread = None
+
+        if self.error is not None:
+            raise self.error
+
+        # Return objects
+        return self.countries
+
+    def resolve(self, *, location: str) -> dict[str, str | None]:
+        """Get the country_code and country of a location (None values if it cannot be resolved). Locations whose geocoding failed are not cached, to be geocoded again by the next run."""
+        # Offline gazetteer
+        country = resolve_country_offline(location=location)
+
+        if country is not None:
+            with self.lock:
+                self.resolved_offline += 1
+
+            return country
+
+        key = normalize_location(location=location)
+
+        # Geocode cache
+        if self.geocode_cache is not None:
+            country = self.geocode_cache.get(location=key)
+
+            if country is not None:
+                with self.lock:
+                    self.resolved_cache += 1
+
+                return country
+
+        # Nominatim geocoder
+        try:
+            geolocation = self.geocode(location, language='en', exactly_one=True, addressdetails=True, namedetails=True, timeout=None)
+
+        except GeopyError as error:
+            logger.warning('Geocoding of %r failed: %s', location, error)
+            return {'country_code': None, 'country': None}
+
+        address = geolocation.raw.get('address', {}) if geolocation is not None else {}
+        country = {'country_code': address.get('country_code'), 'country': address.get('country')}
+
+        with self.lock:
+            self.resolved_network += 1
+
+        if self.geocode_cache is not None:
+            self.geocode_cache.put(location=key, country_code=country['country_code'], country=country['country'])
+
+        # Return objects
+        return country
+
+    def report(self) -> dict[str, int | float]:
+        """Get the statistics of the resolver: locations resolved from the cache, offline and with the network geocoder, and the share resolved without network requests."""
+        with self.lock:
+            resolved = self.resolved_cache + self.resolved_offline + self.resolved_network
+
+            report = {
+                'resolved_cache': self.resolved_cache,
+                'resolved_offline': self.resolved_offline,
+                'resolved_network': self.resolved_network,
+                'hit_rate': round((self.resolved_cache + self.resolved_offline) / resolved, 3) if resolved else None,
+            }
+
+        # Return objects
+        return report
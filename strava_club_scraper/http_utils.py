@@ -0,0 +1,208 @@
+"""About: Browserless HTTP client reusing the cookies of an authenticated Selenium WebDriver session."""
+
+# Import packages
+
+import asyncio
+import gzip
+import http.client
+import logging
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+import zlib
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from .parser_utils import is_too_many_requests
+from .rate_limit_utils import AdaptiveRateLimiter
+
+
+# Settings and variables
+
+logger = logging.getLogger(name=__name__)
+
+# Status of the pages whose request failed (connection error, timeout or malformed response), without HTTP response
+HTTP_ERROR_STATUS = 0
+
+
+# Functions
+
+
+def webdriver_http_headers(*, driver: WebDriver) -> dict[str, str]:
+    """Build HTTP request headers (cookies and user agent) from an authenticated WebDriver session."""
+    cookies = driver.get_cookies()
+    user_agent = driver.execute_script('return navigator.userAgent;')
+
+    headers = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Encoding': 'gzip, deflate',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Connection': 'keep-alive',
+        'Cookie': '; '.join(f'{cookie["name"]}={cookie["value"]}' for cookie in cookies),
+        'User-Agent': user_agent,
+    }
+
+    # Return objects
+    return headers
+
+
+def http_response_body(*, response: http.client.HTTPResponse) -> str:
+    """Read, decompress and decode the body of an HTTP response."""
+    body = response.read()
+
+    content_encoding = response.getheader('Content-Encoding', '').lower()
+
+    if content_encoding == 'gzip':
+        body = gzip.decompress(body)
+
+    elif content_encoding == 'deflate':
+        body = zlib.decompress(body)
+
+    charset = response.headers.get_content_charset() or 'utf-8'
+
+    # Return objects
+    return body.decode(charset, errors='replace')
+
+
+def http_get(*, connection: http.client.HTTPSConnection, path: str, headers: dict[str, str]) -> tuple[int, str]:
+    """GET a path on a keep-alive connection, reconnecting once if the server closed the idle connection."""
+    for attempt in range(2):
+        try:
+            connection.request(method='GET', url=path, headers=headers)
+            response = connection.getresponse()
+            body = http_response_body(response=response)
+            break
+
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            connection.close()
+
+            if attempt == 1:
+                raise
+
+    # Return objects
+    return response.status, body
+
+
+def http_get_rate_limited(*, connection: http.client.HTTPSConnection, path: str, headers: dict[str, str], rate_limiter: AdaptiveRateLimiter | None = None) -> tuple[int, str]:
+    """GET a path, waiting for the rate limiter (if any) and recording the response in it ("Too Many Requests" status or page, as Strava also answers it with a 200 status)."""
+    if rate_limiter is None:
+        return http_get(connection=connection, path=path, headers=headers)
+
+    rate_limiter.acquire()
+
+    start = time.monotonic()
+    status, body = http_get(connection=connection, path=path, headers=headers)
+
+    if status == 429 or is_too_many_requests(html=body):
+        rate_limiter.record_rate_limited(elapsed=time.monotonic() - start)
+
+    else:
+        rate_limiter.record_success(elapsed=time.monotonic() - start)
+
+    # Return objects
+    return status, body
+
+
+async def http_fetch_page(*, url: str, headers: dict[str, str], connections: asyncio.Queue, rate_limiter: AdaptiveRateLimiter | None = None) -> tuple[int, str]:
+    """Fetch one page using a connection borrowed from the connections pool. A failed request returns HTTP_ERROR_STATUS and an empty body, its connection being closed (reopened by its next request) instead of being returned to the pool mid-response."""
+    url_parts = urlsplit(url)
+    path = url_parts.path + ('?' + url_parts.query if url_parts.query else '')
+
+    connection = await connections.get()
+
+    try:
+        status, body = await asyncio.to_thread(http_get_rate_limited, connection=connection, path=path, headers=headers, rate_limiter=rate_limiter)
+
+    except (OSError, http.client.HTTPException) as exception:
+        logger.warning('%s request failed: %r', url, exception)
+        connection.close()
+        status, body = HTTP_ERROR_STATUS, ''
+
+    finally:
+        connections.put_nowait(connection)
+
+    # Return objects
+    return status, body
+
+
+async def http_fetch_pages(*, urls: list[str], headers: dict[str, str], connections: asyncio.Queue, concurrency: int, rate_limiter: AdaptiveRateLimiter | None = None) -> list[tuple[int, str]]:
+    """Fetch pages with at most concurrency connections borrowed from the connections pool at a time. Results keep the order of urls (failed requests being returned with HTTP_ERROR_STATUS, see http_fetch_page)."""
+    semaphore = asyncio.Semaphore(value=concurrency)
+
+    async def fetch_page(url: str) -> tuple[int, str]:
+        async with semaphore:
+            return await http_fetch_page(url=url, headers=headers, connections=connections, rate_limiter=rate_limiter)
+
+    pages = await asyncio.gather(*(fetch_page(url) for url in urls))
+
+    # Return objects
+    return list(pages)
+
+
+# Classes
+
+
+class HttpPageFetcher:
+    """
+    Concurrent page fetcher of a single host, reused by all page batches of a scrape (also usable as a context manager, closing the connections on exit).
+
+    The keep-alive connections pool lives on an event loop running in a dedicated thread, so that get_pages is a blocking call that also works when the caller already runs an event loop (e.g. Jupyter).
+
+    host: host of all fetched pages (e.g. 'www.strava.com').
+    headers: HTTP request headers (see webdriver_http_headers).
+    concurrency: number of keep-alive connections.
+    """
+
+    def __init__(self, *, host: str, headers: dict[str, str], concurrency: int = 8, timeout: float = 30, rate_limiter: AdaptiveRateLimiter | None = None) -> None:
+        self.host = host
+        self.headers = headers
+        self.concurrency = max(concurrency, 1)
+        self.rate_limiter = rate_limiter
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='http-page-fetcher', daemon=True)
+        self.thread.start()
+
+        # Connections pool
+        self.connections = [http.client.HTTPSConnection(host=host, timeout=timeout) for _ in range(self.concurrency)]
+        self.connections_queue = self.run(coroutine=self.connections_pool())
+
+    async def connections_pool(self) -> asyncio.Queue:
+        """Create the connections pool queue on the event loop of the fetcher."""
+        connections_queue = asyncio.Queue()
+
+        for connection in self.connections:
+            connections_queue.put_nowait(connection)
+
+        # Return objects
+        return connections_queue
+
+    def run(self, *, coroutine: Any) -> Any:
+        """Run a coroutine on the event loop of the fetcher, blocking until it completes."""
+        return asyncio.run_coroutine_threadsafe(coro=coroutine, loop=self.loop).result()
+
+    def get_pages(self, *, urls: list[str], concurrency: int | None = None) -> list[tuple[int, str]]:
+        """Fetch pages concurrently (with at most concurrency connections, default: all connections of the pool), returning (status, body) tuples in the order of urls (HTTP_ERROR_STATUS for failed requests)."""
+        if not urls:
+            return []
+
+        concurrency = self.concurrency if concurrency is None else min(max(concurrency, 1), self.concurrency)
+
+        # Return objects
+        return self.run(coroutine=http_fetch_pages(urls=urls, headers=self.headers, connections=self.connections_queue, concurrency=concurrency, rate_limiter=self.rate_limiter))
+
+    def close(self) -> None:
+        """Close the connections and stop the event loop."""
+        for connection in self.connections:
+            connection.close()
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> 'HttpPageFetcher':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
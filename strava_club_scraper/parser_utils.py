@@ -0,0 +1,414 @@
+"""About: lxml parsers for Strava pages, working on a single page source snapshot instead of multiple WebDriver round trips."""
+
+# Import packages
+
+from collections import Counter
+from html import unescape as html_unescape
+import json
+import logging
+import re
+from typing import Any
+
+from dateutil import parser
+import lxml.html as lh
+
+from .transform_utils import duration_to_seconds
+
+
+# Settings and variables
+
+logger = logging.getLogger(name=__name__)
+
+# Tags rendered on their own line (approximation of Selenium's WebElement.text)
+BLOCK_TAGS = frozenset(
+    {
+        'address',
+        'article',
+        'aside',
+        'blockquote',
+        'button',
+        'dd',
+        'div',
+        'dl',
+        'dt',
+        'figcaption',
+        'figure',
+        'footer',
+        'form',
+        'h1',
+        'h2',
+        'h3',
+        'h4',
+        'h5',
+        'h6',
+        'header',
+        'li',
+        'main',
+        'nav',
+        'ol',
+        'p',
+        'pre',
+        'section',
+        'table',
+        'tbody',
+        'tfoot',
+        'thead',
+        'tr',
+        'ul',
+    },
+)
+
+# Tags rendered inline, separated by a whitespace
+CELL_TAGS = frozenset({'td', 'th'})
+
+# Tags without rendered text
+SKIPPED_TAGS = frozenset({'noscript', 'script', 'style', 'template'})
+
+NUMBER_PATTERN = re.compile(pattern=r'-?[0-9][0-9,]*(?:\.[0-9]+)?', flags=0)
+KILOMETERS_PATTERN = re.compile(pattern=r'km$', flags=0)
+
+# "More stats" section text to label and value lines (applied in order)
+MORE_STATS_LABELS = [
+    (re.compile(pattern=r'Show More\n|Show Less\n|Avg Max\n', flags=0), r''),
+    # Speed
+    (re.compile(pattern=r'^Speed ', flags=0), r'Average Speed\n'),
+    (re.compile(pattern=r'(km/h*?) ', flags=0), r'\1\nMax Speed\n'),
+    # Heart Rate
+    (re.compile(pattern=r'Heart Rate ', flags=0), r'Average Heart Rate\n'),
+    (re.compile(pattern=r'(Heart Rate\n[0-9]{1,} bpm) ', flags=0), r'\1\nMax Heart Rate\n'),
+    # Cadence
+    (re.compile(pattern=r'Cadence ', flags=0), r'Average Cadence\n'),
+    (re.compile(pattern=r'(Average Cadence\n[0-9]{1,}) ([0-9]{1,})', flags=0), r'\1\nMax Cadence\n\2'),
+    # Power
+    (re.compile(pattern=r'Power ', flags=0), r'Average Power\n'),
+    (re.compile(pattern=r'(Average Power\n[0-9,]{1,} W) ([0-9,]{1,} W)', flags=0), r'\1\nMax Power\n\2'),
+    # Calories/Temperature/Elapsed Time
+    (re.compile(pattern=r'(Calories|Temperature|Carbon Saved|Elapsed Time) ', flags=0), r'\1\n'),
+]
+
+ATHLETE_ID_PATTERN = re.compile(pattern=r'/athletes/([0-9]+)', flags=0)
+
+TOO_MANY_REQUESTS_PATTERN = re.compile(pattern=r'<pre[^>]*>\s*Too Many Requests\s*</pre>', flags=0)
+
+
+# Functions
+
+
+def parse_number(*, value: str) -> float | None:
+    """Get the first number of a stat value (e.g. '1,234 m', '25.3km/h', '150 bpm'), None if there is none (e.g. '\u2014')."""
+    match = NUMBER_PATTERN.search(value)
+
+    # Return objects
+    return None if match is None else float(match.group().replace(',', ''))
+
+
+def parse_distance(*, value: str) -> float | None:
+    """Get meters from a distance stat value ('12.3 km', or '1,500 m' for activity_type = 'Swim')."""
+    distance = parse_number(value=value)
+
+    if distance is not None and KILOMETERS_PATTERN.search(value) is not None:
+        distance = distance * 1000
+
+    # Return objects
+    return distance
+
+
+def parse_speed(*, value: str) -> float | None:
+    """Get meters per second from a speed stat value in km/h."""
+    speed = parse_number(value=value)
+
+    # Return objects
+    return None if speed is None else speed / 3.6
+
+
+def parse_duration(*, value: str) -> int | None:
+    """Get seconds from a duration stat value, None if it is not a duration (logged, so that duration columns only hold numbers)."""
+    seconds = duration_to_seconds(duration=value)
+
+    if seconds is None:
+        logger.warning('Duration stat value %r is not a duration', value)
+
+    # Return objects
+    return seconds
+
+
+def parse_text(*, value: str) -> str:
+    return value
+
+
+# Strava stat labels: activities dataset column and value parser
+STAT_SCHEMA = {
+    'Distance': ('distance', parse_distance),
+    'Elevation': ('elevation_gain', parse_number),
+    'Moving Time': ('moving_time', parse_duration),
+    'Elapsed Time': ('elapsed_time', parse_duration),
+    'Duration': ('duration', parse_duration),
+    'Pace': ('pace', parse_text),
+    'Average Speed': ('average_speed', parse_speed),
+    'Max Speed': ('max_speed', parse_speed),
+    'Average Heart Rate': ('average_heart_rate', parse_number),
+    'Max Heart Rate': ('max_heart_rate', parse_number),
+    'Average Cadence': ('average_cadence', parse_number),
+    'Max Cadence': ('max_cadence', parse_number),
+    'Average Power': ('average_watts', parse_number),
+    'Max Power': ('max_watts', parse_number),
+    'Calories': ('calories', parse_number),
+    'Steps': ('steps', parse_number),
+    'Temperature': ('average_temperature', parse_number),
+    'Carbon Saved': ('carbon_saved', parse_text),
+    'Relative Effort': ('relative_effort', parse_number),
+    'Tough Relative Effort': ('tough_relative_effort', parse_number),
+    'Historic Relative Effort': ('historic_relative_effort', parse_number),
+    'Massive Relative Effort': ('massive_relative_effort', parse_number),
+}
+
+
+def parse_stats(*, stats: dict[str, str], unknown_labels: Counter | None = None) -> dict[str, Any]:
+    """Convert stats (label and value pairs) using STAT_SCHEMA. Stats with unknown labels are kept unconverted under their label and counted in unknown_labels (if any, e.g. one counter per scrape)."""
+    d = {}
+
+    for label, value in stats.items():
+        if label in STAT_SCHEMA:
+            column, parse = STAT_SCHEMA[label]
+            d[column] = parse(value=value)
+
+        else:
+            if unknown_labels is not None:
+                unknown_labels[label] += 1
+
+            d[label] = value
+
+    # Return objects
+    return d
+
+
+def convert_list_to_dictionary(*, to_convert: list[str]) -> dict[str, str]:
+    to_convert = iter(to_convert)
+    dictionary = dict(zip(to_convert, to_convert))
+
+    # Return objects
+    return dictionary
+
+
+def collect_element_text(*, element: lh.HtmlElement, parts: list[str]) -> None:
+    """Recursively append the rendered text of an element (and its tail) to parts."""
+    tag = element.tag if isinstance(element.tag, str) else None
+
+    # Comments and processing instructions have a non-str tag
+    if tag is not None and tag not in SKIPPED_TAGS:
+        if tag in BLOCK_TAGS or tag == 'br':
+            parts.append('\n')
+
+        elif tag in CELL_TAGS:
+            parts.append(' ')
+
+        if element.text:
+            parts.append(element.text)
+
+        for child in element:
+            collect_element_text(element=child, parts=parts)
+
+        if tag in BLOCK_TAGS:
+            parts.append('\n')
+
+    if element.tail:
+        parts.append(element.tail)
+
+
+def html_element_text(*, element: lh.HtmlElement) -> str:
+    """Get the text of an element with one line per block element and collapsed whitespaces, similar to Selenium's WebElement.text."""
+    parts = [element.text or '']
+
+    for child in element:
+        collect_element_text(element=child, parts=parts)
+
+    lines = (' '.join(line.split()) for line in ''.join(parts).split(sep='\n'))
+    text = '\n'.join(line for line in lines if line != '')
+
+    # Return objects
+    return text
+
+
+def xpath_text(*, tree: lh.HtmlElement, xpath: str) -> str | None:
+    """Get the text of the first element matching xpath, None if there is no match."""
+    elements = tree.xpath(xpath)
+    text = html_element_text(element=elements[0]) if elements else None
+
+    # Return objects
+    return text
+
+
+def is_too_many_requests(*, html: str) -> bool:
+    """Check if a page source is Strava's "Too Many Requests" response."""
+    return TOO_MANY_REQUESTS_PATTERN.search(html) is not None
+
+
+def parse_activity_overview(*, html: str, unknown_labels: Counter | None = None) -> dict[str, Any]:
+    """
+    Parse a Strava activity overview page (https://www.strava.com/activities/<activity_id>/overview) from a single page source snapshot.
+
+    Since the snapshot contains the whole DOM, the "Show More" stats are parsed without clicking the button. Stat labels missing from STAT_SCHEMA are counted in unknown_labels (see parse_stats).
+    """
+    tree = lh.fromstring(html=html)
+
+    d = {}
+
+    # athlete_name, activity_type
+    title = xpath_text(tree=tree, xpath='.//span[@class="title"]').split(sep=' – ')
+    d['athlete_name'], d['activity_type'] = title[0:2]
+
+    # commute
+    if len(title) > 2:
+        d['commute'] = re.sub(pattern=r'^Commute$', repl=r'True', string=title[2], flags=0)
+        d['commute'] = bool(d['commute'])
+
+    # activity_date
+    d['activity_date'] = xpath_text(tree=tree, xpath='.//div[@class="details-container"]//time')
+    d['activity_date'] = re.sub(pattern=r'^(.*) on (.*)$', repl=r'\2 \1', string=d['activity_date'], flags=0)
+    d['activity_date'] = parser.parse(d['activity_date'])
+
+    # athlete_id
+    d['athlete_id'] = tree.xpath('.//div[@class="details-container"]//a/@href')[0]
+    d['athlete_id'] = re.sub(pattern=r'^.*/athletes/(.*)$', repl=r'\1', string=d['athlete_id'], flags=0)
+
+    # activity_name
+    d['activity_name'] = xpath_text(tree=tree, xpath='.//div[@class="details-container"]//h1')
+
+    # activity_description
+    activity_description = xpath_text(tree=tree, xpath='.//div[@class="details-container"]//div[@class="content"]')
+
+    if activity_description is not None:
+        d['activity_description'] = activity_description
+
+    # activity_location
+    activity_location = xpath_text(tree=tree, xpath='.//div[@class="details-container"]//span[@class="location"]')
+
+    if activity_location is not None:
+        d['activity_location'] = activity_location
+
+    # Inline stats (value and label pairs)
+    inline_stats = html_element_text(element=tree.xpath('.//ul[@class="inline-stats section"]')[0]).split(sep='\n')
+    inline_stats = convert_list_to_dictionary(to_convert=inline_stats)
+    inline_stats = {label: value for value, label in inline_stats.items()}
+
+    d.update(parse_stats(stats=inline_stats, unknown_labels=unknown_labels))
+
+    # More stats (label and value pairs)
+    more_stats = tree.xpath('.//div[@class="section more-stats"]')
+
+    if more_stats:
+        more_stats = html_element_text(element=more_stats[0])
+
+        for pattern, repl in MORE_STATS_LABELS:
+            more_stats = pattern.sub(repl, more_stats)
+
+        more_stats = convert_list_to_dictionary(to_convert=more_stats.split(sep='\n'))
+
+        d.update(parse_stats(stats=more_stats, unknown_labels=unknown_labels))
+
+    # activity_device
+    activity_device = xpath_text(tree=tree, xpath='.//div[@class="section device-section"]//div[@class="device spans8"]')
+
+    if activity_device is not None:
+        d['activity_device'] = activity_device
+
+    # activity_kudos
+    d['activity_kudos'] = xpath_text(tree=tree, xpath='.//span[@data-testid="kudos_count"]')
+    d['activity_kudos'] = int(d['activity_kudos'])
+
+    # Return objects
+    return d
+
+
+def parse_club_header(*, tree: lh.HtmlElement) -> dict[str, str]:
+    """Parse the details of a Strava Club (club_name, club_activity_type and club_location) from the header of its pages."""
+    d = {}
+
+    # club_name
+    d['club_name'] = xpath_text(tree=tree, xpath='//h1[@class="mb-sm"]').split(sep='\n')[0]
+
+    # club_activity_type
+    d['club_activity_type'] = xpath_text(tree=tree, xpath='//div[@class="club-meta"]//div[@class="location"]//span[@class="app-icon-wrapper  "]')
+
+    # club_location
+    d['club_location'] = xpath_text(tree=tree, xpath='//div[@class="club-meta"]//div[@class="location"]')
+    d['club_location'] = re.sub(pattern=rf'^{re.escape(d["club_activity_type"] or "")}(.*)$', repl=r'\1', string=d['club_location'], flags=0).strip()
+
+    # Return objects
+    return d
+
+
+def parse_club_members_page(*, html: str) -> dict[str, Any]:
+    """
+    Parse a Strava Club members page (https://www.strava.com/clubs/<club_id>/members?page=<page>) from a single page source snapshot.
+
+    Returns the club details, the members of the page, if there is a next page and the last page number shown in the pagination (None if there is no pagination).
+    """
+    tree = lh.fromstring(html=html)
+
+    # club_name, club_activity_type, club_location
+    d = parse_club_header(tree=tree)
+
+    # members
+    d['members'] = []
+
+    for member in tree.xpath('//ul[@class="list-athletes"]//li'):
+        athlete = {}
+
+        # athlete_id
+        athlete['athlete_id'] = member.xpath('.//div[@class="text-headline"]//a/@href')[0]
+        athlete['athlete_id'] = re.sub(pattern=r'^.*/athletes/(.*)$', repl=r'\1', string=athlete['athlete_id'], flags=0)
+
+        # athlete_name
+        athlete['athlete_name'] = xpath_text(tree=member, xpath='.//div[@class="text-headline"]')
+
+        # athlete_location
+        athlete['athlete_location'] = (xpath_text(tree=member, xpath='.//div[@class="location"]') or '').strip()
+
+        # athlete_picture
+        avatar_props = member.xpath('.//div[contains(@data-react-class, "AvatarWrapper")]/@data-react-props')
+        athlete['athlete_picture'] = json.loads(html_unescape(avatar_props[0])).get('src') if avatar_props else None
+
+        d['members'].append(athlete)
+
+    # Pagination
+    d['next_page'] = bool(tree.xpath('//li[@class="next_page"]'))
+    pages = [int(page) for page in tree.xpath('//li[contains(@class, "next_page")]/../li/a/text()') if page.strip().isdigit()]
+    d['last_page'] = max(pages) if pages else None
+
+    # Return objects
+    return d
+
+
+def parse_club_leaderboard(*, html: str) -> dict[str, Any]:
+    """
+    Parse a Strava Club leaderboard (https://www.strava.com/clubs/<club_id>/leaderboard) from a single page source snapshot, in one pass over its table.
+
+    Returns the club details and the leaderboard rows (the table columns, by header, and athlete_id); no rows if the leaderboard is empty.
+    """
+    tree = lh.fromstring(html=html)
+
+    # club_name, club_activity_type, club_location
+    d = parse_club_header(tree=tree)
+
+    # Leaderboard rows
+    d['rows'] = []
+
+    tables = tree.xpath('//table[@class="dense striped sortable"]')
+
+    if tree.xpath('//div[@class="leaderboard"]//h4[@class="empty-results"]') or not tables:
+        return d
+
+    header = [html_element_text(element=cell) for cell in tables[0].xpath('.//tr[th][1]/th')]
+
+    for row in tables[0].xpath('.//tr[td]'):
+        leaderboard_row = dict(zip(header, (html_element_text(element=cell) for cell in row.xpath('./td'))))
+
+        # athlete_id
+        athlete_id = [match.group(1) for match in (ATHLETE_ID_PATTERN.search(href) for href in row.xpath('./td//div//a/@href')) if match is not None]
+        leaderboard_row['athlete_id'] = athlete_id[0] if athlete_id else None
+
+        d['rows'].append(leaderboard_row)
+
+    # Return objects
+    return d
@@ -0,0 +1,131 @@
+"""About: Adaptive token bucket rate limiter for Strava page fetches."""
+
+# Import packages
+
+import random
+import threading
+import time
+
+
+# Classes
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket rate limiter shared by all page fetches (thread-safe).
+
+    The rate (requests/second) is learned during the session: it increases additively after each successful fetch and decreases multiplicatively after each "Too Many Requests" response, which also triggers an exponential backoff (with jitter) for all fetches.
+
+    rate, burst: initial rate and bucket size for a single worker (see scale_to_workers for concurrent workers).
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 1.0,
+        burst: int = 4,
+        rate_min: float = 0.05,
+        rate_max: float = 10.0,
+        rate_increase: float = 0.02,
+        rate_decrease: float = 0.5,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.rate_initial = rate
+        self.burst_initial = burst
+        self.rate_min = rate_min
+        self.rate_max = rate_max
+        self.rate_increase = rate_increase
+        self.rate_decrease = rate_decrease
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.backoff_until = 0.0
+        self.consecutive_rate_limited = 0
+
+        # Statistics
+        self.requests = 0
+        self.requests_rate_limited = 0
+        self.time_fetching = 0.0
+        self.time_throttled = 0.0
+
+        self.lock = threading.Lock()
+
+    def scale_to_workers(self, *, workers: int) -> None:
+        """Set the rate and bucket size to their initial values per worker, for workers fetching concurrently (scaling up or down from the initial values, so that a run does not inherit the scale of a previous run). Once decreased by a "Too Many Requests" response, the rate is never raised, only lowered to the scaled initial rate."""
+        workers = max(workers, 1)
+
+        with self.lock:
+            rate = min(self.rate_max, self.rate_initial * workers)
+
+            self.rate = rate if self.requests_rate_limited == 0 else min(self.rate, rate)
+            self.burst = self.burst_initial * workers
+            self.tokens = min(self.tokens, float(self.burst))
+
+    def acquire(self) -> None:
+        """Block until a request can be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+
+                # Refill tokens
+                self.tokens = min(float(self.burst), self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                wait = self.backoff_until - now
+
+                if wait <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                if wait <= 0:
+                    wait = (1 - self.tokens) / self.rate
+
+                self.time_throttled += wait
+
+            time.sleep(wait)
+
+    def record_success(self, *, elapsed: float) -> None:
+        """Record a successful fetch that took elapsed seconds (additive rate increase)."""
+        with self.lock:
+            self.requests += 1
+            self.time_fetching += elapsed
+            self.consecutive_rate_limited = 0
+            self.rate = min(self.rate_max, self.rate + self.rate_increase)
+
+    def record_rate_limited(self, *, elapsed: float) -> float:
+        """Record a "Too Many Requests" response (multiplicative rate decrease and exponential backoff with jitter). Returns the backoff in seconds."""
+        with self.lock:
+            self.requests += 1
+            self.requests_rate_limited += 1
+            self.time_fetching += elapsed
+            self.consecutive_rate_limited += 1
+            self.rate = max(self.rate_min, self.rate * self.rate_decrease)
+
+            # Equal jitter: half of the exponential backoff is fixed, the other half random
+            backoff = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_rate_limited - 1))
+            backoff = backoff / 2 + random.uniform(0, backoff / 2)
+
+            self.backoff_until = max(self.backoff_until, time.monotonic() + backoff)
+            self.tokens = 0.0
+
+        # Return objects
+        return backoff
+
+    def report(self) -> dict[str, float]:
+        """Get the statistics of the session."""
+        with self.lock:
+            report = {
+                'requests': self.requests,
+                'requests_rate_limited': self.requests_rate_limited,
+                'rate': round(self.rate, 3),
+                'time_fetching': round(self.time_fetching, 1),
+                'time_throttled': round(self.time_throttled, 1),
+            }
+
+        # Return objects
+        return report
@@ -2,18 +2,131 @@
 
 # Import packages
 
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import os
-from typing import Literal
+import queue
+import threading
+import time
+from typing import Any, Literal
 
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.proxy import Proxy, ProxyType
 
 
+# Settings and variables
+
+logger = logging.getLogger(name=__name__)
+
+# Resources blocked by the scrape profile: images, media, fonts and third-party trackers/maps (Chrome DevTools Protocol URL patterns)
+SCRAPE_PROFILE_BLOCKED_URLS = [
+    # Images
+    '*.png',
+    '*.jpg',
+    '*.jpeg',
+    '*.gif',
+    '*.webp',
+    '*.avif',
+    '*.svg',
+    '*.ico',
+    # Media
+    '*.mp4',
+    '*.webm',
+    '*.m3u8',
+    '*.mp3',
+    # Fonts
+    '*.woff',
+    '*.woff2',
+    '*.ttf',
+    '*.otf',
+    # Trackers and analytics
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*connect.facebook.net*',
+    '*branch.io*',
+    '*sentry.io*',
+    '*snowplow*',
+    '*optimizely.com*',
+    '*onetrust.com*',
+    '*cookielaw.org*',
+    # Maps
+    '*mapbox.com*',
+    '*heatmap-external*',
+]
+
+# Chrome features not needed for scraping
+SCRAPE_PROFILE_CHROME_ARGUMENTS = [
+    '--blink-settings=imagesEnabled=false',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-extensions',
+    '--disable-features=MediaRouter,OptimizationHints,Translate',
+    '--disable-sync',
+    '--mute-audio',
+    '--no-first-run',
+]
+
+# Firefox preferences blocking images, media, fonts and trackers
+SCRAPE_PROFILE_FIREFOX_PREFERENCES = {
+    'permissions.default.image': 2,
+    'media.autoplay.default': 5,
+    'media.autoplay.blocking_policy': 2,
+    'gfx.downloadable_fonts.enabled': False,
+    'browser.display.use_document_fonts': 0,
+    'privacy.trackingprotection.enabled': True,
+    'privacy.trackingprotection.socialtracking.enabled': True,
+    'network.prefetch-next': False,
+    'network.dns.disablePrefetch': True,
+    'browser.safebrowsing.malware.enabled': False,
+    'browser.safebrowsing.phishing.enabled': False,
+}
+
+# Bytes transferred and load times of the current page (Navigation and Resource Timing APIs)
+PAGE_LOAD_METRICS_SCRIPT = """
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    url: location.href,
+    resources: resources.length,
+    bytes_transferred: (navigation ? navigation.transferSize : 0) + resources.reduce((total, resource) => total + resource.transferSize, 0),
+    dom_content_loaded: navigation ? navigation.domContentLoadedEventEnd : null,
+    load: navigation && navigation.loadEventEnd > 0 ? navigation.loadEventEnd : null,
+};
+"""
+
+
 # Functions
 
 
-def selenium_webdriver(*, web_browser: Literal['chrome', 'firefox'] = 'chrome', user_agent: str = 'Mozilla/5.0', headless: bool = False, javascript_disable: bool = False, proxy_disable: bool = False) -> WebDriver:
+def page_load_metrics(*, driver: WebDriver) -> dict[str, Any]:
+    """
+    Get the bytes transferred and load times (milliseconds since the navigation start) of the current page.
+
+    Cross-origin resources not sending a Timing-Allow-Origin header are reported with 0 bytes.
+    """
+    return driver.execute_script(PAGE_LOAD_METRICS_SCRIPT)
+
+
+def selenium_webdriver(
+    *,
+    web_browser: Literal['chrome', 'firefox'] = 'chrome',
+    user_agent: str = 'Mozilla/5.0',
+    headless: bool = False,
+    javascript_disable: bool = False,
+    proxy_disable: bool = False,
+    scrape_profile: bool = False,
+    user_data_dir: str | None = None,
+) -> WebDriver:
+    """
+    Start a WebDriver session.
+
+    scrape_profile: block images, media, fonts, maps and third-party trackers, and disable browser features not needed for scraping (pages are only read for their text and attributes).
+    user_data_dir: persistent browser profile directory (disk cache, cookies) reused across sessions, instead of a throwaway profile; a directory can only be used by one running browser at a time.
+    """
     # WebDriver options
     if web_browser == 'chrome':
         webdriver_options = webdriver.ChromeOptions()
@@ -50,8 +163,19 @@ def selenium_webdriver(*, web_browser: Literal['chrome', 'firefox'] = 'chrome',
             proxy.proxy_type = ProxyType.DIRECT
             webdriver_options.proxy = proxy
 
+        if scrape_profile:
+            for argument in SCRAPE_PROFILE_CHROME_ARGUMENTS:
+                webdriver_options.add_argument(argument)
+
+        if user_data_dir is not None:
+            webdriver_options.add_argument(f'--user-data-dir={os.path.abspath(user_data_dir)}')
+
         driver = webdriver.Chrome(options=webdriver_options)
 
+        if scrape_profile:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': SCRAPE_PROFILE_BLOCKED_URLS})
+
     if web_browser == 'firefox':
         webdriver_options = webdriver.FirefoxOptions()
         webdriver_options.page_load_strategy = 'eager'
@@ -79,6 +203,15 @@ def selenium_webdriver(*, web_browser: Literal['chrome', 'firefox'] = 'chrome',
         if proxy_disable:
             webdriver_options.set_preference('network.proxy.type', ProxyType.DIRECT.value)
 
+        if scrape_profile:
+            for name, value in SCRAPE_PROFILE_FIREFOX_PREFERENCES.items():
+                webdriver_options.set_preference(name, value)
+
+        if user_data_dir is not None:
+            os.makedirs(user_data_dir, exist_ok=True)
+            webdriver_options.add_argument('-profile')
+            webdriver_options.add_argument(os.path.abspath(user_data_dir))
+
         # Firefox About Profiles - about:profiles
         # webdriver_options.add_argument('-profile')
         # webdriver_options.add_argument(os.path.join(os.path.expanduser('~'), 'AppData', 'Roaming', 'Mozilla', 'Firefox', 'Profiles', 'nsp3n4ed.default-release'))
@@ -87,3 +220,197 @@ def selenium_webdriver(*, web_browser: Literal['chrome', 'firefox'] = 'chrome',
 
     # Return objects
     return driver
+
+
+# Classes
+
+
+class WebDriverPool:
+    """
+    Pool of WebDriver sessions started ahead of time in the background and handed out ready on demand (thread-safe).
+
+    Each slot of the pool keeps its own persistent user_data_dir (warm disk cache across sessions and runs). Released sessions are reused; sessions not running anymore or used more than max_uses times are recycled (quit and restarted in the background).
+
+    max_start_retries: consecutive failed starts of a slot retried before acquire raises the exception of the last one.
+    acquire_timeout: seconds acquire waits for a ready session by default before raising TimeoutError (None: wait forever).
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int,
+        user_data_dir: str | None = None,
+        web_browser: Literal['chrome', 'firefox'] = 'chrome',
+        headless: bool = False,
+        scrape_profile: bool = False,
+        max_uses: int | None = None,
+        max_start_retries: int = 3,
+        acquire_timeout: float | None = 300,
+    ) -> None:
+        self.size = size
+        self.user_data_dir = user_data_dir
+        self.web_browser = web_browser
+        self.headless = headless
+        self.scrape_profile = scrape_profile
+        self.max_uses = max_uses
+        self.max_start_retries = max_start_retries
+        self.acquire_timeout = acquire_timeout
+
+        self.ready = queue.Queue()
+        self.slots = {}
+        self.uses = {}
+        self.start_failures = dict.fromkeys(range(size), 0)
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='webdriver-pool')
+        self.closed = False
+
+        # Statistics
+        self.starts = 0
+        self.time_starting = 0.0
+        self.acquisitions = 0
+        self.time_acquiring = 0.0
+        self.recycles = 0
+
+        self.lock = threading.Lock()
+
+        # Pre-warm all slots
+        for slot in range(size):
+            self.executor.submit(self.start_slot, slot=slot)
+
+    def __enter__(self) -> 'WebDriverPool':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start_slot(self, *, slot: int) -> None:
+        """Start a WebDriver session for a slot and add it to the ready sessions (or the exception of a failed start, handled by acquire)."""
+        start = time.monotonic()
+
+        try:
+            driver = selenium_webdriver(
+                web_browser=self.web_browser,
+                headless=self.headless,
+                scrape_profile=self.scrape_profile,
+                user_data_dir=None if self.user_data_dir is None else os.path.join(self.user_data_dir, f'slot_{slot}'),
+            )
+
+        except Exception as exception:
+            logger.exception('WebDriver pool slot %s failed to start', slot)
+            self.ready.put((slot, exception))
+            return
+
+        elapsed = time.monotonic() - start
+        logger.debug('WebDriver pool slot %s started in %.2fs', slot, elapsed)
+
+        with self.lock:
+            self.starts += 1
+            self.time_starting += elapsed
+            self.start_failures[slot] = 0
+            self.slots[id(driver)] = slot
+            self.uses[id(driver)] = 0
+
+            if self.closed:
+                driver.quit()
+                return
+
+        self.ready.put((slot, driver))
+
+    def acquire(self, *, timeout: float | None = None) -> WebDriver:
+        """Get a ready WebDriver session, waiting for one to be started or released if needed (at most timeout seconds, default: acquire_timeout, then TimeoutError is raised)."""
+        start = time.monotonic()
+
+        if timeout is None:
+            timeout = self.acquire_timeout
+
+        while True:
+            try:
+                slot, driver = self.ready.get(timeout=None if timeout is None else max(0.0, timeout - (time.monotonic() - start)))
+
+            except queue.Empty:
+                raise TimeoutError(f'No WebDriver session of the pool (size {self.size}) released within {timeout}s') from None
+
+            # Failed start: retry the slot (up to max_start_retries consecutive times, then the slot stays failed and raises its exception)
+            if isinstance(driver, Exception):
+                with self.lock:
+                    self.start_failures[slot] += 1
+                    retry = self.start_failures[slot] <= self.max_start_retries
+
+                if retry:
+                    self.executor.submit(self.start_slot, slot=slot)
+                    continue
+
+                self.ready.put((slot, driver))
+                raise driver
+
+            try:
+                driver.current_url
+                break
+
+            except WebDriverException:
+                self.recycle(driver=driver)
+
+        with self.lock:
+            self.acquisitions += 1
+            self.time_acquiring += time.monotonic() - start
+            self.uses[id(driver)] += 1
+
+        # Return objects
+        return driver
+
+    def release(self, *, driver: WebDriver) -> None:
+        """Give a WebDriver session back to the pool (recycled if it reached max_uses)."""
+        with self.lock:
+            slot = self.slots[id(driver)]
+            worn_out = self.max_uses is not None and self.uses[id(driver)] >= self.max_uses
+
+        if self.closed:
+            driver.quit()
+
+        elif worn_out:
+            self.recycle(driver=driver)
+
+        else:
+            self.ready.put((slot, driver))
+
+    def recycle(self, *, driver: WebDriver) -> None:
+        """Quit a WebDriver session and start a new one for its slot in the background."""
+        with self.lock:
+            slot = self.slots.pop(id(driver))
+            self.uses.pop(id(driver))
+            self.recycles += 1
+
+        try:
+            driver.quit()
+
+        except WebDriverException:
+            pass
+
+        if not self.closed:
+            self.executor.submit(self.start_slot, slot=slot)
+
+    def report(self) -> dict[str, float]:
+        """Get the statistics of the pool: average cold start time versus average pooled acquisition time (seconds)."""
+        with self.lock:
+            report = {
+                'starts': self.starts,
+                'start_time_average': round(self.time_starting / self.starts, 3) if self.starts else None,
+                'acquisitions': self.acquisitions,
+                'acquire_time_average': round(self.time_acquiring / self.acquisitions, 3) if self.acquisitions else None,
+                'recycles': self.recycles,
+            }
+
+        # Return objects
+        return report
+
+    def close(self) -> None:
+        """Quit all WebDriver sessions of the pool (sessions still acquired are quit by their users)."""
+        with self.lock:
+            self.closed = True
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+        while not self.ready.empty():
+            _, driver = self.ready.get_nowait()
+
+            if not isinstance(driver, Exception):
+                driver.quit()
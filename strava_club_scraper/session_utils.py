@@ -0,0 +1,227 @@
+"""About: Strava browser session shared by all scrapers of a process, with on-disk cookie persistence."""
+
+# Import packages
+
+import http.client
+import json
+import logging
+import os
+import time
+from typing import Literal
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .http_utils import http_get, webdriver_http_headers
+from .selenium_utils import WebDriverPool, selenium_webdriver
+
+
+# Settings and variables
+
+logger = logging.getLogger(name=__name__)
+
+
+# Functions
+
+
+def displayed_element(*, driver: WebDriver, xpath: str) -> WebElement | bool:
+    """Get the first displayed element matching xpath, False if there is none (WebDriverWait condition)."""
+    return next((element for element in driver.find_elements(by=By.XPATH, value=xpath) if element.is_displayed()), False)
+
+
+# Classes
+
+
+class StravaSession:
+    """
+    Authenticated Strava browser session, reused by all scrapers of a process (also usable as a context manager, quitting the browser on exit).
+
+    cookies_path: JSON file where the session cookies are persisted; later runs restore them and skip the login entirely while they are valid.
+    validate_interval: seconds during which a validated session is reused without checking it again.
+    login_timeout: seconds to wait for each login step (including an email code or a login entered manually in the browser).
+    scrape_profile: start the browsers with the scrape profile of selenium_webdriver (no images, media, fonts, maps and trackers).
+    webdriver_pool: pre-warmed pool the browsers are acquired from (and released to) instead of being started and quit (the browser settings of the pool are used).
+    """
+
+    def __init__(
+        self,
+        *,
+        cookies_path: str | None = None,
+        web_browser: Literal['chrome', 'firefox'] = 'chrome',
+        headless: bool = False,
+        scrape_profile: bool = False,
+        validate_interval: float = 300,
+        login_timeout: float = 300,
+        webdriver_pool: WebDriverPool | None = None,
+    ) -> None:
+        self.cookies_path = cookies_path
+        self.web_browser = web_browser
+        self.headless = headless
+        self.scrape_profile = scrape_profile
+        self.validate_interval = validate_interval
+        self.login_timeout = login_timeout
+        self.webdriver_pool = webdriver_pool
+
+        self.driver = None
+        self.validated_at = None
+
+    def __enter__(self) -> 'StravaSession':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def new_webdriver(self) -> WebDriver:
+        """Start (or acquire from the WebDriver pool) a WebDriver session with the browser settings of the session (not logged in)."""
+        if self.webdriver_pool is not None:
+            return self.webdriver_pool.acquire()
+
+        # Return objects
+        return selenium_webdriver(web_browser=self.web_browser, headless=self.headless, scrape_profile=self.scrape_profile)
+
+    def release_webdriver(self, *, driver: WebDriver) -> None:
+        """Quit (or release to the WebDriver pool) a WebDriver session started with new_webdriver."""
+        if self.webdriver_pool is not None:
+            self.webdriver_pool.release(driver=driver)
+
+        else:
+            driver.quit()
+
+    def is_alive(self) -> bool:
+        """Check if the browser is still running."""
+        try:
+            self.driver.current_url
+
+        except WebDriverException:
+            return False
+
+        # Return objects
+        return True
+
+    def is_authenticated(self) -> bool:
+        """Check if the session cookies are logged in, with a single HTTP request (the dashboard redirects to the login page otherwise)."""
+        connection = http.client.HTTPSConnection(host='www.strava.com', timeout=30)
+
+        try:
+            status, _ = http_get(connection=connection, path='/dashboard', headers=webdriver_http_headers(driver=self.driver))
+
+        finally:
+            connection.close()
+
+        # Return objects
+        return status == 200
+
+    def invalidate(self) -> None:
+        """Check the session cookies again (logging in if they expired) on the next start, even within validate_interval."""
+        self.validated_at = None
+
+    def restore_cookies(self) -> int:
+        """Add the persisted, unexpired cookies to the browser. Returns the number of restored cookies."""
+        if self.cookies_path is None or not os.path.exists(self.cookies_path):
+            return 0
+
+        with open(self.cookies_path, encoding='utf-8') as file:
+            cookies = json.load(file)
+
+        # Cookies can only be added for the domain currently loaded
+        self.driver.get(url='https://www.strava.com/robots.txt')
+
+        restored = 0
+
+        for cookie in cookies:
+            if 'expiry' in cookie and cookie['expiry'] < time.time():
+                continue
+
+            self.driver.add_cookie(cookie_dict=cookie)
+            restored += 1
+
+        # Return objects
+        return restored
+
+    def save_cookies(self) -> None:
+        """Persist the browser cookies (readable by the current user only)."""
+        if self.cookies_path is None:
+            return
+
+        if os.path.dirname(self.cookies_path):
+            os.makedirs(os.path.dirname(self.cookies_path), exist_ok=True)
+
+        with open(os.open(self.cookies_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), mode='w', encoding='utf-8') as file:
+            json.dump(self.driver.get_cookies(), file)
+
+    def login(self, *, strava_login: str | None = None, strava_password: str | None = None, login_mode: str = 'user') -> None:
+        """Log in to Strava, with the credentials (login_mode='credentials') or manually in the browser (login_mode='user'), and wait for the dashboard."""
+        wait = WebDriverWait(driver=self.driver, timeout=self.login_timeout)
+
+        # Open website
+        self.driver.get(url='https://www.strava.com/login')
+        wait.until(method=EC.presence_of_element_located(locator=(By.ID, 'desktop-email')))
+
+        # Reject cookies
+        for button in self.driver.find_elements(by=By.XPATH, value='.//button[@data-cy="deny-cookies"]'):
+            button.click()
+
+        if login_mode == 'credentials' and strava_login is not None and strava_password is not None:
+            # Login
+            field_login = wait.until(method=lambda driver: displayed_element(driver=driver, xpath='.//*[@data-cy="email"]'))
+            field_login.send_keys(strava_login)
+            field_login.send_keys(Keys.ENTER)
+
+            # Password
+            wait.until(method=lambda driver: displayed_element(driver=driver, xpath='.//button[text()="Use password instead"]')).click()
+            field_password = wait.until(method=lambda driver: displayed_element(driver=driver, xpath='.//*[@data-cy="password"]'))
+            field_password.send_keys(strava_password)
+            field_password.send_keys(Keys.ENTER)
+
+        # Logged in (an email code, if requested, is entered in the browser)
+        wait.until(method=EC.url_contains(url='https://www.strava.com/dashboard'))
+
+    def start(self, *, strava_login: str | None = None, strava_password: str | None = None, login_mode: str = 'user') -> WebDriver:
+        """Get the authenticated WebDriver, starting the browser (restoring the persisted cookies) and logging in only if needed."""
+        if self.driver is not None and not self.is_alive():
+            logger.info('Strava session browser is not running anymore, restarting it')
+
+            try:
+                self.release_webdriver(driver=self.driver)
+
+            except WebDriverException:
+                pass
+
+            self.driver = None
+
+        if self.driver is None:
+            self.driver = self.new_webdriver()
+            self.validated_at = None
+
+            restored = self.restore_cookies()
+            logger.info('Strava session started (%s cookies restored)', restored)
+
+        if self.validated_at is None or time.monotonic() - self.validated_at > self.validate_interval:
+            if not self.is_authenticated():
+                logger.info('Strava session cookies missing or expired, logging in')
+                self.login(strava_login=strava_login, strava_password=strava_password, login_mode=login_mode)
+
+            self.save_cookies()
+            self.validated_at = time.monotonic()
+
+        # Return objects
+        return self.driver
+
+    def close(self) -> None:
+        """Persist the cookies and quit (or release to the WebDriver pool) the browser."""
+        if self.driver is None:
+            return
+
+        try:
+            if self.is_alive():
+                self.save_cookies()
+
+        finally:
+            self.release_webdriver(driver=self.driver)
+            self.driver = None
+            self.validated_at = None
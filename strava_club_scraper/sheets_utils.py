@@ -0,0 +1,571 @@
+"""About: Google Sheets typed reader and differential sync, writing only the rows that changed since the last upload."""
+
+# Import packages
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+import functools
+import json
+import logging
+import math
+import re
+import threading
+import time
+from typing import Any
+
+from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import Resource, build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+import httplib2
+import pandas as pd
+
+from .rate_limit_utils import AdaptiveRateLimiter
+from .sink_utils import DATASET_SCHEMAS, club_dataset
+
+
+# Settings and variables
+
+logger = logging.getLogger(name=__name__)
+
+# Dates entered as dates by valueInputOption='USER_ENTERED'
+DATE_PATTERN = re.compile(pattern=r'^(?P<year>[0-9]{4})-(?P<month>[0-9]{2})-(?P<day>[0-9]{2})$', flags=0)
+
+# Google Sheets API responses retried after a backoff (Too Many Requests and server errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Every n-th row of a write serialized to estimate the size of its request
+SIZE_SAMPLE_STEP = 10
+
+# Google Sheets API services of the current thread, by service account key file (httplib2 connections are not thread-safe)
+sheets_services = threading.local()
+
+
+# Functions
+
+
+@functools.cache
+def google_api_service_account(*, key_file: str) -> Credentials:
+    """Load the service account credentials of a key file once per process (the access token is reused until it expires, then refreshed)."""
+    return Credentials.from_service_account_file(filename=key_file, scopes=['https://www.googleapis.com/auth/spreadsheets'])
+
+
+def google_sheets_service(*, key_file: str, timeout: float = 60) -> Resource:
+    """Get the Google Sheets API service of the current thread, built once from the static discovery document bundled with google-api-python-client (no discovery request) on a keep-alive HTTP connection authorized with the process-wide credentials."""
+    if not hasattr(sheets_services, 'services'):
+        sheets_services.services = {}
+
+    if key_file not in sheets_services.services:
+        http = AuthorizedHttp(credentials=google_api_service_account(key_file=key_file), http=httplib2.Http(timeout=timeout))
+        sheets_services.services[key_file] = build(serviceName='sheets', version='v4', http=http, static_discovery=True, cache_discovery=False)
+
+    # Return objects
+    return sheets_services.services[key_file]
+
+
+def google_sheets_values(*, service: Resource, sheet_id: str, sheet_name: str) -> list[list[Any]]:
+    """Get the values of a sheet (header and rows): numbers as numbers (valueRenderOption='UNFORMATTED_VALUE', independent of the cells number format) and dates as displayed."""
+    result = service.spreadsheets().values().get(spreadsheetId=sheet_id, range=sheet_name, valueRenderOption='UNFORMATTED_VALUE', dateTimeRenderOption='FORMATTED_STRING').execute()
+
+    # Return objects
+    return result.get('values', [])
+
+
+def sheet_column(*, cells: tuple[Any, ...], dtype: str) -> pd.Series:
+    """Convert the cells of a sheet column (as read by google_sheets_values, empty cells being '') to a dtype of DATASET_SCHEMAS, in a single vectorized step."""
+    series = pd.Series(data=cells, dtype='object')
+
+    if dtype == 'float':
+        return pd.to_numeric(arg=series, errors='coerce').astype(dtype='float')
+
+    if dtype == 'int':
+        return pd.to_numeric(arg=series, errors='coerce').astype(dtype='int')
+
+    if dtype == 'bool':
+        return series.where(cond=series.map(lambda value: isinstance(value, bool)), other=None)
+
+    series = series.astype(dtype='str')
+    series = series.mask(cond=series.str.strip() == '')
+
+    if dtype == 'date':
+        # Dates written as 'YYYY-MM-DD' (other date formats set in the sheet are parsed as well, slower)
+        try:
+            return pd.to_datetime(arg=series, format='%Y-%m-%d')
+
+        except ValueError:
+            return pd.to_datetime(arg=series, format='mixed')
+
+    # Return objects
+    return series
+
+
+def google_sheets_df(*, values: list[list[Any]]) -> pd.DataFrame:
+    """Build the DataFrame of the values of a sheet (header and rows, see google_sheets_values), converting each column once to the dtype declared in the schema of its dataset (DATASET_SCHEMAS)."""
+    if len(values) < 2:
+        return pd.DataFrame(data=None, index=None, columns=None, dtype=None)
+
+    header = [str(column) for column in values[0]]
+    schema = DATASET_SCHEMAS[club_dataset(columns=header)]
+
+    # Columns of the rows (trailing empty cells are not returned by the API)
+    columns = zip(*(row[: len(header)] + [''] * (len(header) - len(row)) for row in values[1:]), strict=True)
+
+    df_import = pd.DataFrame(data={column: sheet_column(cells=cells, dtype=schema.get(column, 'str')) for column, cells in zip(header, columns, strict=True)}, index=None)
+
+    # Return objects
+    return df_import
+
+
+def sheet_range(*, sheet_name: str, start_row: int | None = None, end_row: int | None = None) -> str:
+    """A1 notation of a whole sheet, of the cells from a row or of whole rows of a sheet (e.g. "'Activities'", "'Activities'!A5" or "'Activities'!5:10")."""
+    sheet_name = "'" + sheet_name.replace("'", "''") + "'"
+
+    if start_row is None:
+        return sheet_name
+
+    # Return objects
+    return f'{sheet_name}!A{start_row}' if end_row is None else f'{sheet_name}!{start_row}:{end_row}'
+
+
+def user_entered_cell(*, value: Any) -> dict[str, Any]:
+    """CellData of a value, entered as valueInputOption='USER_ENTERED' would (numbers, numeric strings, booleans, 'YYYY-MM-DD' dates with a date format, formulas and text; empty for None or '')."""
+    if value is None or value == '':
+        return {}
+
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+
+    if isinstance(value, int | float):
+        return {'userEnteredValue': {'numberValue': value}} if math.isfinite(value) else {'userEnteredValue': {'stringValue': str(value)}}
+
+    value = str(value)
+    match = DATE_PATTERN.match(value)
+
+    if match is not None:
+        # Sheets date serial number (days since 1899-12-30)
+        serial = (date(year=int(match['year']), month=int(match['month']), day=int(match['day'])) - date(year=1899, month=12, day=30)).days
+
+        return {'userEnteredValue': {'numberValue': serial}, 'userEnteredFormat': {'numberFormat': {'type': 'DATE', 'pattern': 'yyyy-mm-dd'}}}
+
+    try:
+        number = float(value)
+
+        if math.isfinite(number):
+            return {'userEnteredValue': {'numberValue': number}}
+
+    except ValueError:
+        pass
+
+    if value.upper() in {'TRUE', 'FALSE'}:
+        return {'userEnteredValue': {'boolValue': value.upper() == 'TRUE'}}
+
+    if value.startswith('='):
+        return {'userEnteredValue': {'formulaValue': value}}
+
+    # Return objects
+    return {'userEnteredValue': {'stringValue': value}}
+
+
+def sheet_cell(*, value: Any) -> Any:
+    """Normalize a cell value for comparison: numbers (and numeric strings, stored as numbers with valueInputOption='USER_ENTERED') to float, empty cells to ''."""
+    if value is None or isinstance(value, bool):
+        return '' if value is None else value
+
+    if isinstance(value, int | float):
+        return float(value)
+
+    try:
+        return float(value)
+
+    except ValueError:
+        return str(value)
+
+
+def sheet_row_equal(*, old_row: list[Any], row: list[Any]) -> bool:
+    """Check if a sheet row holds the values of a row (cells are normalized only if they differ, most of them being equal as is)."""
+    return all(old_value == value or sheet_cell(value=old_value) == sheet_cell(value=value) for old_value, value in zip(old_row, row, strict=False))
+
+
+def sheet_diff(*, values: list[list[Any]], header: list[str], rows: Iterable[Sequence[Any]], rows_count: int, keys: list[str]) -> dict[str, Any] | None:
+    """
+    Compute the row writes turning the sheet values (header and rows, as read with valueRenderOption='UNFORMATTED_VALUE') into header and rows_count rows (iterated once, only the rows to write are kept), rows being matched by their keys columns.
+
+    Changed rows are overwritten in place, new rows fill the rows of deleted ones and are then appended after the last row; if rows were deleted, the last rows are moved up so that the sheet has no empty rows in between. Returns the rows to write and the first row to clear (by position below the header, None if the sheet does not shrink) and the rows inserted, updated, unchanged, moved and deleted counts, None if the sheet has to be rewritten (different header, keys columns missing from the header or duplicated keys).
+    """
+    if not values or [str(column) for column in values[0]] != header or not set(keys) <= set(header):
+        return None
+
+    key_columns = [header.index(key) for key in keys]
+
+    # Existing rows (trailing empty cells are not returned by the API), by key
+    old_rows = [row + [''] * (len(header) - len(row)) for row in values[1:]]
+    old_positions = {}
+
+    for position, row in enumerate(old_rows):
+        key = tuple(sheet_cell(value=row[column]) for column in key_columns)
+
+        if key in old_positions:
+            return None
+
+        old_positions[key] = position
+
+    writes = {}
+    kept = {}
+    tail = {}
+    inserts = []
+    report = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'moved': 0, 'deleted': 0}
+
+    for row in rows:
+        key = tuple(sheet_cell(value=row[column]) for column in key_columns)
+
+        if key in kept:
+            return None
+
+        position = kept[key] = old_positions.get(key)
+
+        if position is None:
+            inserts.append(row)
+            report['inserted'] += 1
+            continue
+
+        changed = not sheet_row_equal(old_row=old_rows[position], row=row)
+
+        if changed:
+            report['updated'] += 1
+
+        else:
+            report['unchanged'] += 1
+
+        # Rows beyond the new last row are moved up (written even if unchanged)
+        if position >= rows_count:
+            tail[position] = row
+            report['moved'] += 1
+
+        elif changed:
+            writes[position] = row
+
+    deleted = sorted(position for key, position in old_positions.items() if key not in kept)
+    report['deleted'] = len(deleted)
+
+    # Moved and new rows fill the rows of deleted ones, then the rows after the last existing one
+    free = [position for position in deleted if position < rows_count] + list(range(len(old_rows), rows_count))
+
+    for position, row in zip(free, [tail[position] for position in sorted(tail)] + inserts, strict=True):
+        writes[position] = row
+
+    # Return objects
+    return {'writes': writes, 'clear_from': rows_count if rows_count < len(old_rows) else None, 'report': report}
+
+
+def google_sheets_sync(*, publisher: 'GoogleSheetsPublisher', sheet_name: str, values: list[list[Any]], df: pd.DataFrame, keys: list[str]) -> dict[str, int | bool]:
+    """
+    Queue in publisher the writes updating a sheet holding values (as read with valueRenderOption='UNFORMATTED_VALUE') to df (columns as header): only the changed, new and moved rows (consecutive rows in one range), and the clear of the rows left after the last one.
+
+    The sheet is cleared and fully rewritten only if the rows cannot be matched (different header, keys columns missing from the header or duplicated keys), df being then uploaded by chunks of rows (see GoogleSheetsPublisher.update). Returns the rows inserted, updated, unchanged, moved and deleted counts.
+    """
+    header = [str(column) for column in df.columns]
+    diff = sheet_diff(values=values, header=header, rows=df.itertuples(index=False, name=None), rows_count=len(df), keys=keys)
+
+    if diff is None:
+        logger.info('Google Sheets %r: header changed, keys columns missing or duplicated keys, rewriting the sheet', sheet_name)
+
+        publisher.clear(sheet_name=sheet_name)
+        publisher.update(sheet_name=sheet_name, start_row=1, values=[header])
+        publisher.update(sheet_name=sheet_name, start_row=2, values=df)
+
+        # Return objects
+        return {'inserted': len(df), 'updated': 0, 'unchanged': 0, 'moved': 0, 'deleted': max(len(values) - 1, 0), 'rewritten': True}
+
+    # Consecutive rows written as one range (sheet row number: data position + 2, below the header)
+    ranges = []
+
+    for position in sorted(diff['writes']):
+        if ranges and ranges[-1]['end'] == position:
+            ranges[-1]['values'].append(diff['writes'][position])
+            ranges[-1]['end'] += 1
+
+        else:
+            ranges.append({'start': position, 'end': position + 1, 'values': [diff['writes'][position]]})
+
+    for block in ranges:
+        publisher.update(sheet_name=sheet_name, start_row=block['start'] + 2, values=block['values'])
+
+    if diff['clear_from'] is not None:
+        publisher.clear(sheet_name=sheet_name, start_row=diff['clear_from'] + 2, end_row=len(values))
+
+    report = {**diff['report'], 'rewritten': False}
+
+    logger.info('Google Sheets %r synced: %s', sheet_name, report)
+
+    # Return objects
+    return report
+
+
+# Classes
+
+
+class GoogleSheetsPublisher:
+    """
+    Collect the clears and writes of the sheets of a spreadsheet and send them in as few requests as possible: all clears in one values.batchClear request, then all writes in values.batchUpdate requests of at most chunk_rows rows and max_request_bytes (writes larger than that are split into several ranges). Requests are paced by rate_limiter (the Sheets API write quota is 60 requests per minute per user) and each one is retried after a backoff on "Too Many Requests", server and connection errors.
+
+    Writes of DataFrames are converted to rows chunk by chunk while they are sent, so that large sheets are never held as a single list of rows (nor a single request payload) in memory.
+
+    workers: number of write requests sent concurrently (within the rate limiter quota). Requests of the workers are sent with the services returned by service_factory (e.g. google_api_credentials), called in each worker thread, as a service cannot be shared between threads.
+    atomic: send the clears and writes in a single spreadsheets.batchUpdate request instead (updateCells requests, applied all or none), so that readers never see a sheet cleared and not yet rewritten. Values are entered as valueInputOption='USER_ENTERED' would (see user_entered_cell). If the request would exceed max_request_bytes, the writes are sent as in the non-atomic mode.
+
+    Also usable as a context manager, flushing the queued clears and writes on exit.
+    """
+
+    def __init__(
+        self,
+        *,
+        service: Resource,
+        sheet_id: str,
+        atomic: bool = False,
+        chunk_rows: int = 5000,
+        max_request_bytes: int = 2_000_000,
+        workers: int = 1,
+        service_factory: Callable[[], Resource] | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        max_retries: int = 5,
+    ) -> None:
+        if workers > 1 and service_factory is None:
+            raise ValueError('service_factory is required to send requests with multiple workers')
+
+        self.service = service
+        self.sheet_id = sheet_id
+        self.atomic = atomic
+        self.chunk_rows = chunk_rows
+        self.max_request_bytes = max_request_bytes
+        self.workers = workers
+        self.service_factory = service_factory
+        self.rate_limiter = AdaptiveRateLimiter(rate=1.0, burst=5, rate_max=1.0) if rate_limiter is None else rate_limiter
+        self.max_retries = max_retries
+
+        # Queued clears (sheet_name, start_row, end_row) and writes (sheet_name, start_row, rows or DataFrame)
+        self.clears = []
+        self.updates = []
+
+        # Statistics
+        self.requests = 0
+        self.requests_retried = 0
+        self.request_bytes = 0
+        self.ranges_cleared = 0
+        self.ranges_written = 0
+        self.rows_written = 0
+
+        self.lock = threading.Lock()
+
+    def __enter__(self) -> 'GoogleSheetsPublisher':
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc_info: object) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def clear(self, *, sheet_name: str, start_row: int | None = None, end_row: int | None = None) -> None:
+        """Queue the clear of a sheet (default: all of it) or of its rows from start_row to end_row."""
+        self.clears.append((sheet_name, start_row, end_row))
+
+    def update(self, *, sheet_name: str, start_row: int, values: Sequence[Sequence[Any]] | pd.DataFrame) -> None:
+        """Queue the write of rows (or of the rows of a DataFrame, without its header) starting at start_row (first column). Clears are always sent before writes."""
+        if len(values):
+            self.updates.append((sheet_name, start_row, values))
+
+    def execute(self, *, request: HttpRequest) -> dict[str, Any]:
+        """Execute a request, paced by the rate limiter and retried on "Too Many Requests", server and connection errors."""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            start = time.monotonic()
+
+            try:
+                response = request.execute()
+
+            except (HttpError, httplib2.HttpLib2Error, OSError) as error:
+                status = error.resp.status if isinstance(error, HttpError) else None
+
+                if isinstance(error, HttpError) and status not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise
+
+                backoff = self.rate_limiter.record_rate_limited(elapsed=time.monotonic() - start)
+                logger.warning('Google Sheets API request failed (%s), retrying in %.1f seconds', status or error, backoff)
+
+                with self.lock:
+                    self.requests_retried += 1
+
+                continue
+
+            self.rate_limiter.record_success(elapsed=time.monotonic() - start)
+
+            with self.lock:
+                self.requests += 1
+                self.request_bytes += len(request.body or b'')
+
+            # Return objects
+            return response
+
+    def chunks(self) -> Iterator[tuple[str, int, list[Sequence[Any]]]]:
+        """Iterate over the queued writes by chunks of at most chunk_rows rows (sheet_name, start_row and rows), DataFrame rows being converted one chunk at a time."""
+        for sheet_name, start_row, values in self.updates:
+            for chunk_start in range(0, len(values), self.chunk_rows):
+                if isinstance(values, pd.DataFrame):
+                    rows = values.iloc[chunk_start : chunk_start + self.chunk_rows].values.tolist()
+
+                else:
+                    rows = values[chunk_start : chunk_start + self.chunk_rows]
+
+                yield sheet_name, start_row + chunk_start, rows
+
+    def batches(self) -> Iterator[list[dict[str, Any]]]:
+        """Iterate over the values.batchUpdate data of the queued writes, of at most chunk_rows rows and (estimated) max_request_bytes each (chunks exceeding the size are halved until they fit)."""
+        batch = []
+        batch_rows = 0
+        batch_bytes = 0
+
+        for chunk in self.chunks():
+            pieces = [chunk]
+
+            while pieces:
+                sheet_name, start_row, rows = pieces.pop()
+
+                # Request size estimated from a sample of the rows (serializing all rows twice would double the upload CPU time)
+                sample = rows[::SIZE_SAMPLE_STEP]
+                rows_bytes = int(len(json.dumps(sample, default=str)) * len(rows) / len(sample))
+
+                if rows_bytes > self.max_request_bytes and len(rows) > 1:
+                    half = len(rows) // 2
+                    pieces.extend([(sheet_name, start_row + half, rows[half:]), (sheet_name, start_row, rows[:half])])
+                    continue
+
+                if batch and (batch_bytes + rows_bytes > self.max_request_bytes or batch_rows + len(rows) > self.chunk_rows):
+                    yield batch
+
+                    batch = []
+                    batch_rows = 0
+                    batch_bytes = 0
+
+                batch.append({'range': sheet_range(sheet_name=sheet_name, start_row=start_row), 'values': rows})
+                batch_rows += len(rows)
+                batch_bytes += rows_bytes
+
+        if batch:
+            yield batch
+
+    def send_batch(self, *, batch: list[dict[str, Any]]) -> None:
+        """Send a values.batchUpdate request (with the service of the current thread, if there are several workers)."""
+        service = self.service if self.service_factory is None else self.service_factory()
+
+        self.execute(request=service.spreadsheets().values().batchUpdate(spreadsheetId=self.sheet_id, body={'valueInputOption': 'USER_ENTERED', 'data': batch}))
+
+    def atomic_requests(self) -> list[dict[str, Any]]:
+        """Build the spreadsheets.batchUpdate requests of the queued clears and writes (grids expanded to fit the written rows and columns first)."""
+        result = self.execute(request=self.service.spreadsheets().get(spreadsheetId=self.sheet_id, fields='sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))'))
+        properties = {sheet['properties']['title']: sheet['properties'] for sheet in result.get('sheets', [])}
+
+        requests = []
+
+        # Expand grids
+        for sheet_name in dict.fromkeys(sheet_name for sheet_name, _, _ in self.updates):
+            sheet_properties = properties[sheet_name]
+            rows = max(start_row - 1 + len(values) for name, start_row, values in self.updates if name == sheet_name)
+            columns = max(len(values.columns) if isinstance(values, pd.DataFrame) else max(len(row) for row in values) for name, _, values in self.updates if name == sheet_name)
+
+            for dimension, size, grid_size in (('ROWS', rows, sheet_properties['gridProperties']['rowCount']), ('COLUMNS', columns, sheet_properties['gridProperties']['columnCount'])):
+                if size > grid_size:
+                    requests.append({'appendDimension': {'sheetId': sheet_properties['sheetId'], 'dimension': dimension, 'length': size - grid_size}})
+
+        # Clears
+        for sheet_name, start_row, end_row in self.clears:
+            grid_range = {'sheetId': properties[sheet_name]['sheetId']}
+
+            if start_row is not None:
+                grid_range.update({'startRowIndex': start_row - 1, 'endRowIndex': end_row})
+
+            requests.append({'updateCells': {'range': grid_range, 'fields': 'userEnteredValue'}})
+
+        # Writes
+        for sheet_name, start_row, rows in self.chunks():
+            requests.append(
+                {
+                    'updateCells': {
+                        'start': {'sheetId': properties[sheet_name]['sheetId'], 'rowIndex': start_row - 1, 'columnIndex': 0},
+                        'rows': [{'values': [user_entered_cell(value=value) for value in row]} for row in rows],
+                        'fields': 'userEnteredValue,userEnteredFormat.numberFormat',
+                    },
+                },
+            )
+
+        # Return objects
+        return requests
+
+    def flush(self) -> None:
+        """Send the queued clears and writes (write requests by workers, at most 2 requests per worker being prepared in advance)."""
+        if not self.clears and not self.updates:
+            return
+
+        if self.atomic:
+            requests = self.atomic_requests()
+
+            if len(json.dumps(requests)) <= self.max_request_bytes:
+                self.execute(request=self.service.spreadsheets().batchUpdate(spreadsheetId=self.sheet_id, body={'requests': requests}))
+                self.record_flush()
+                return
+
+            logger.warning('Google Sheets atomic update exceeds %s bytes, sending it in several requests', self.max_request_bytes)
+
+        if self.clears:
+            self.execute(
+                request=self.service.spreadsheets().values().batchClear(
+                    spreadsheetId=self.sheet_id,
+                    body={'ranges': [sheet_range(sheet_name=sheet_name, start_row=start_row, end_row=end_row) for sheet_name, start_row, end_row in self.clears]},
+                ),
+            )
+
+        if self.workers == 1:
+            for batch in self.batches():
+                self.send_batch(batch=batch)
+
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='google-sheets-publisher') as executor:
+                futures = set()
+
+                for batch in self.batches():
+                    if len(futures) >= 2 * self.workers:
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+
+                        for future in done:
+                            future.result()
+
+                    futures.add(executor.submit(self.send_batch, batch=batch))
+
+                for future in futures:
+                    future.result()
+
+        self.record_flush()
+
+    def record_flush(self) -> None:
+        """Count the sent clears and writes and empty the queues."""
+        with self.lock:
+            self.ranges_cleared += len(self.clears)
+            self.ranges_written += len(self.updates)
+            self.rows_written += sum(len(values) for _, _, values in self.updates)
+
+        self.clears = []
+        self.updates = []
+
+    def report(self) -> dict[str, int]:
+        """Get the statistics of the publisher."""
+        with self.lock:
+            report = {
+                'requests': self.requests,
+                'requests_retried': self.requests_retried,
+                'request_bytes': self.request_bytes,
+                'ranges_cleared': self.ranges_cleared,
+                'ranges_written': self.ranges_written,
+                'rows_written': self.rows_written,
+            }
+
+        # Return objects
+        return report
@@ -0,0 +1,286 @@
+"""About: Storage backends (sinks) of the scraped club datasets, with the merge semantics of strava_club_to_google_sheets."""
+
+# Import packages
+
+from collections.abc import Iterable
+import glob
+import os
+import threading
+from typing import Literal
+import uuid
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+except ImportError:
+    pa = None
+    pq = None
+
+
+# Settings and variables
+
+# Columns matching scraped rows with stored ones when merging each dataset (a leaderboard week is replaced as a whole)
+DATASET_MERGE_KEYS = {
+    'activities': ['club_id', 'activity_id'],
+    'members': ['club_id', 'athlete_id'],
+    'leaderboard': ['club_id', 'leaderboard_week'],
+}
+
+# Columns identifying a row of each dataset
+DATASET_ROW_KEYS = {
+    'activities': ['club_id', 'activity_id'],
+    'members': ['club_id', 'athlete_id'],
+    'leaderboard': ['club_id', 'leaderboard_week', 'athlete_id'],
+}
+
+# Column partitioning each dataset by month
+DATASET_DATE_COLUMNS = {
+    'activities': 'activity_date',
+    'members': 'join_date',
+    'leaderboard': 'leaderboard_date_start',
+}
+
+# Column dtypes of each dataset ('date', 'float', 'int' and 'bool' columns, all other columns are 'str', e.g. the leaderboard pace, kept as scraped: '5:12 /km')
+DATASET_SCHEMAS = {
+    'activities': {
+        'activity_date': 'date',
+        'commute': 'bool',
+        'elapsed_time': 'float',
+        'moving_time': 'float',
+        'distance': 'float',
+        'max_speed': 'float',
+        'average_speed': 'float',
+        'relative_effort': 'float',
+        'tough_relative_effort': 'float',
+        'historic_relative_effort': 'float',
+        'massive_relative_effort': 'float',
+        'steps': 'float',
+        'elevation_gain': 'float',
+        'max_heart_rate': 'float',
+        'average_heart_rate': 'float',
+        'max_cadence': 'float',
+        'average_cadence': 'float',
+        'max_watts': 'float',
+        'average_watts': 'float',
+        'calories': 'float',
+        'average_temperature': 'float',
+        'activity_kudos': 'int',
+    },
+    'members': {
+        'join_date': 'date',
+    },
+    'leaderboard': {
+        'leaderboard_date_start': 'date',
+        'leaderboard_date_end': 'date',
+        'rank': 'int',
+        'activities': 'int',
+        'moving_time': 'float',
+        'distance': 'float',
+        'distance_longest': 'float',
+        'average_speed': 'float',
+        'elevation_gain': 'float',
+    },
+}
+
+# Columns of the stored leaderboard rows refreshed from the club members dataset when published
+LEADERBOARD_MEMBER_COLUMNS = ['athlete_location', 'athlete_location_country_code', 'athlete_location_country', 'athlete_team', 'athlete_picture']
+
+
+# Functions
+
+
+def club_dataset(*, columns: Iterable[str]) -> Literal['activities', 'members', 'leaderboard']:
+    """Get the dataset of the columns of a DataFrame returned by strava_club_activities, strava_club_members or strava_club_leaderboard."""
+    columns = set(columns)
+
+    if 'activity_id' in columns:
+        return 'activities'
+
+    if 'leaderboard_week' in columns:
+        return 'leaderboard'
+
+    # Return objects
+    return 'members'
+
+
+def key_hashes(*, df: pd.DataFrame, keys: list[str]) -> pd.Series:
+    """Get the 64-bit hashes of the keys columns of the rows (keys compared as text, as ids stored in Google Sheets or scraped)."""
+    return pd.util.hash_pandas_object(obj=df[keys].astype(dtype='str'), index=False)
+
+
+def anti_join(*, df: pd.DataFrame, other: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Get the rows of df whose keys are not in other, looking up the hashed keys of df in the hashed key set of other (no outer join of the DataFrames)."""
+    if df.empty or other.empty:
+        return df
+
+    # Return objects
+    return df[~key_hashes(df=df, keys=keys).isin(values=key_hashes(df=other, keys=keys)).to_numpy()]
+
+
+def merge_club_datasets(*, df: pd.DataFrame, df_import: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge (upsert) a scraped dataset df into the stored rows df_import, rows being matched by the DATASET_MERGE_KEYS of the dataset (see anti_join).
+
+    activities: stored activities scraped again (same club_id and activity_id) are replaced.
+    members: stored members are kept, only new members (club_id and athlete_id) are added.
+    leaderboard: stored leaderboard weeks scraped again (same club_id and leaderboard_week) are replaced.
+    """
+    if not df_import.empty:
+        dataset = club_dataset(columns=df.columns)
+        keys = DATASET_MERGE_KEYS[dataset]
+
+        # club_activities, club_leaderboard: delete stored rows present in df, completely overwriting them
+        if dataset in {'activities', 'leaderboard'}:
+            df_import = anti_join(df=df_import, other=df, keys=keys)
+
+        # club_leaderboard: member columns are refreshed from the club members dataset when published
+        if dataset == 'leaderboard':
+            df_import = df_import.drop(columns=LEADERBOARD_MEMBER_COLUMNS, errors='ignore')
+
+        # club_members: keep stored rows, increment with new club members
+        if dataset == 'members':
+            df = anti_join(df=df, other=df_import, keys=keys)
+
+    # Concatenate DataFrames
+    df_updated = pd.concat(objs=[df, df_import], axis=0, ignore_index=True, sort=False)
+
+    # Return objects
+    return df_updated
+
+
+# Classes
+
+
+class Sink:
+    """Storage backend of the scraped club datasets ('activities', 'members' and 'leaderboard', see club_dataset)."""
+
+    def is_empty(self, *, dataset: str) -> bool:
+        """Check if no row of a dataset is stored."""
+        raise NotImplementedError
+
+    def read(self, *, dataset: str, club_ids: list[str] | None = None) -> pd.DataFrame:
+        """Get the stored rows of a dataset (of club_ids only, default: all clubs)."""
+        raise NotImplementedError
+
+    def append(self, *, dataset: str, df: pd.DataFrame) -> None:
+        """Store rows of a dataset, without checking if they are already stored."""
+        raise NotImplementedError
+
+    def upsert(self, *, dataset: str, df: pd.DataFrame) -> None:
+        """Merge rows of a dataset into the stored ones, with the merge_club_datasets semantics."""
+        raise NotImplementedError
+
+
+class ParquetSink(Sink):
+    """
+    Local Parquet store of the scraped club datasets, partitioned by dataset, club_id and month (Hive layout, e.g. 'path/dataset=activities/club_id=123/month=2023-07/part-<uuid>.parquet'). Requires the optional pyarrow dependency (parquet extra: pip install strava-club-scraper[parquet]).
+
+    Appends add a file to each partition of the rows. Upserts only read and rewrite the partitions of the rows (for members: all partitions of their clubs, as members are matched regardless of their join_date), a partition being replaced atomically (new file moved in place before the old ones are deleted).
+
+    path: root directory of the store.
+    """
+
+    def __init__(self, *, path: str) -> None:
+        if pq is None:
+            raise ImportError('ParquetSink requires pyarrow (parquet extra: pip install strava-club-scraper[parquet])')
+
+        self.path = path
+
+        os.makedirs(path, exist_ok=True)
+
+        # Statistics
+        self.rows_read = 0
+        self.rows_written = 0
+        self.partitions_written = 0
+
+        self.lock = threading.Lock()
+
+    def partition_path(self, *, dataset: str, club_id: str = '*', month: str = '*') -> str:
+        """Directory of a partition (club_id and month default to a glob pattern matching all of them)."""
+        return os.path.join(self.path, f'dataset={dataset}', f'club_id={club_id}', f'month={month}')
+
+    def partitions(self, *, dataset: str, df: pd.DataFrame) -> dict[tuple[str, str], pd.DataFrame]:
+        """Split rows of a dataset by partition (club_id and month, 'unknown' for rows without a date)."""
+        months = pd.to_datetime(df[DATASET_DATE_COLUMNS[dataset]]).dt.strftime(date_format='%Y-%m').fillna(value='unknown')
+
+        # Return objects
+        return {(str(club_id), month): partition_df for (club_id, month), partition_df in df.groupby(by=[df['club_id'], months], sort=False)}
+
+    def read_files(self, *, files: list[str]) -> pd.DataFrame:
+        """Read Parquet files into a single DataFrame."""
+        if not files:
+            return pd.DataFrame(data=None, index=None, columns=None, dtype=None)
+
+        df = pa.concat_tables([pq.read_table(source=file) for file in files], promote_options='permissive').to_pandas()
+
+        with self.lock:
+            self.rows_read += len(df)
+
+        # Return objects
+        return df
+
+    def is_empty(self, *, dataset: str) -> bool:
+        return not glob.glob(os.path.join(self.partition_path(dataset=dataset), '*.parquet'))
+
+    def read(self, *, dataset: str, club_ids: list[str] | None = None) -> pd.DataFrame:
+        files = []
+
+        for club_id in ['*'] if club_ids is None else [glob.escape(str(club_id)) for club_id in club_ids]:
+            files.extend(sorted(glob.glob(os.path.join(self.partition_path(dataset=dataset, club_id=club_id), '*.parquet'))))
+
+        # Return objects
+        return self.read_files(files=files)
+
+    def write_partition(self, *, directory: str, df: pd.DataFrame, replace: bool) -> None:
+        """Write rows to a new file of a partition, deleting the other files of the partition if replace."""
+        os.makedirs(directory, exist_ok=True)
+
+        old_files = glob.glob(os.path.join(glob.escape(directory), '*.parquet')) if replace else []
+        file = os.path.join(directory, f'part-{uuid.uuid4().hex}.parquet')
+
+        pq.write_table(table=pa.Table.from_pandas(df=df.reset_index(drop=True), preserve_index=False), where=file + '.tmp')
+        os.replace(file + '.tmp', file)
+
+        for old_file in old_files:
+            os.remove(old_file)
+
+        with self.lock:
+            self.rows_written += len(df)
+            self.partitions_written += 1
+
+    def append(self, *, dataset: str, df: pd.DataFrame) -> None:
+        for (club_id, month), partition_df in self.partitions(dataset=dataset, df=df).items():
+            self.write_partition(directory=self.partition_path(dataset=dataset, club_id=club_id, month=month), df=partition_df, replace=False)
+
+    def upsert(self, *, dataset: str, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+
+        # Stored partitions the rows can be merged with
+        if dataset == 'members':
+            directories = [directory for club_id in df['club_id'].astype(dtype='str').unique() for directory in glob.glob(self.partition_path(dataset=dataset, club_id=glob.escape(club_id)))]
+
+        else:
+            directories = [self.partition_path(dataset=dataset, club_id=club_id, month=month) for club_id, month in self.partitions(dataset=dataset, df=df)]
+
+        df_import = self.read_files(files=[file for directory in directories for file in glob.glob(os.path.join(glob.escape(directory), '*.parquet'))])
+        df_updated = merge_club_datasets(df=df, df_import=df_import)
+
+        # Rewrite the merged partitions (partitions of the rows, the merge never empties a stored partition)
+        for (club_id, month), partition_df in self.partitions(dataset=dataset, df=df_updated).items():
+            self.write_partition(directory=self.partition_path(dataset=dataset, club_id=club_id, month=month), df=partition_df, replace=True)
+
+    def report(self) -> dict[str, int]:
+        """Get the statistics of the store."""
+        with self.lock:
+            report = {
+                'rows_read': self.rows_read,
+                'rows_written': self.rows_written,
+                'partitions_written': self.partitions_written,
+            }
+
+        # Return objects
+        return report
@@ -2,47 +2,123 @@
 
 # Import packages
 
-from datetime import timedelta
+from collections import Counter, deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 # import glob
-from io import StringIO
-import json
-import html
+import logging
+import queue
 import re
+import threading
 import time
-from typing import Any
+from typing import Any, Literal
 
 from dateutil import parser, relativedelta
-from geopy.extra.rate_limiter import RateLimiter
-from geopy.geocoders import Nominatim
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.discovery import Resource
 from janitor import clean_names
-import lxml.html as lh
 from natsort import natsorted, ns
 
 # import numpy as np
 import pandas as pd
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.keys import Keys
-from .selenium_utils import selenium_webdriver
+from .cache_utils import ActivityCache, GeocodeCache
+from .checkpoint_utils import RunJournal
+from .geocode_utils import LocationCountryResolver
+from .http_utils import HTTP_ERROR_STATUS, HttpPageFetcher, webdriver_http_headers
+from .parser_utils import convert_list_to_dictionary, is_too_many_requests, parse_activity_overview, parse_club_leaderboard, parse_club_members_page  # noqa: F401 (convert_list_to_dictionary defined once in parser_utils, kept importable from this module)
+from .rate_limit_utils import AdaptiveRateLimiter
+from .selenium_utils import page_load_metrics
+from .session_utils import StravaSession
+from .sheets_utils import GoogleSheetsPublisher, google_sheets_df, google_sheets_service, google_sheets_sync, google_sheets_values
+from .sink_utils import DATASET_ROW_KEYS, LEADERBOARD_MEMBER_COLUMNS, Sink, club_dataset, merge_club_datasets
+from .transform_utils import durations_to_seconds, infer_numeric_columns, units_to_float
+
+
+# Settings and variables
+
+logger = logging.getLogger(name=__name__)
+
+# Rate limiter shared by all Strava page fetches of the process (1 request/second per worker initially, scaled up or down to the workers of each scraper run, then adapted to Strava's responses)
+strava_rate_limiter = AdaptiveRateLimiter()
+
+# Browser session shared by all scrapers of the process
+strava_session = StravaSession()
+
+# Strava activity fields renamed in the activities dataset
+ACTIVITY_FIELDS_RENAME = {'elevation': 'elevation_gain', 'max_power': 'max_watts', 'average_power': 'average_watts', 'temperature': 'average_temperature'}
+
+# Activities dataset columns
+CLUB_ACTIVITIES_COLUMNS = [
+    'club_id',
+    'activity_date',
+    'athlete_id',
+    'athlete_name',
+    'activity_type',
+    'activity_id',
+    'activity_name',
+    'activity_description',
+    'activity_location',
+    'commute',
+    'elapsed_time',
+    'moving_time',
+    'distance',
+    'max_speed',
+    'average_speed',
+    'pace',
+    'relative_effort',
+    'tough_relative_effort',
+    'historic_relative_effort',
+    'massive_relative_effort',
+    'steps',
+    'elevation_gain',
+    'max_heart_rate',
+    'average_heart_rate',
+    'max_cadence',
+    'average_cadence',
+    'max_watts',
+    'average_watts',
+    'calories',
+    'activity_device',
+    'average_temperature',
+    'carbon_saved',
+    'activity_kudos',
+]
+
+# Strava Club leaderboard content, to detect the switch to another week
+LEADERBOARD_STATE_SCRIPT = """
+const leaderboard = document.querySelector('div.leaderboard');
+return leaderboard === null ? null : leaderboard.innerHTML;
+"""
+
+# Strava Club activities feed scripts (one WebDriver round trip each)
+FEED_STATE_SCRIPT = """
+return [
+    document.querySelectorAll('[data-testid="web-feed-entry"]').length,
+    document.evaluate('//div[text()="No more recent activity available."]', document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null,
+];
+"""
+
+FEED_ENTRIES_SCRIPT = """
+return Array.from(document.querySelectorAll('[data-testid="web-feed-entry"]')).slice(arguments[0]).map((entry) => {
+    const date = entry.querySelector('time[data-testid="date_at_time"]');
+    return [date === null ? null : date.innerText, Array.from(entry.querySelectorAll('[data-testid="activity_entry_container"] h3 a')).map((link) => link.href)];
+});
+"""
+
+FEED_SCROLL_SCRIPT = """
+const entries = document.querySelectorAll('[data-testid="web-feed-entry"]');
+entries[entries.length - 1].scrollIntoView({block: 'start'});
+"""
 
 
 # Functions
 
 
-def convert_list_to_dictionary(*, to_convert: list[str]) -> dict[str, str]:
-    to_convert = iter(to_convert)
-    dictionary = dict(zip(to_convert, to_convert))
-
-    # Return objects
-    return dictionary
-
-
 def get_seconds(*, time_str: str) -> int:
     """Get seconds from time."""
     h, m, s = time_str.split(sep=':')
@@ -51,515 +127,643 @@ def get_seconds(*, time_str: str) -> int:
     return int(h) * 3600 + int(m) * 60 + int(s)
 
 
-def strava_authentication(*, strava_login: str | None = None, strava_password: str | None = None, login_mode: str = 'user') -> Any:
-    # Load Selenium WebDriver
-    if 'driver' in vars():
-        if driver.service.is_connectable() is True:
-            pass
+def strava_authentication(*, strava_login: str | None = None, strava_password: str | None = None, login_mode: str = 'user', session: StravaSession | None = None) -> WebDriver:
+    """Get the authenticated WebDriver of a Strava session (defaults to the process-wide strava_session shared by all scrapers), logging in only if its cookies are missing or expired."""
+    if session is None:
+        session = strava_session
 
-    else:
-        driver = selenium_webdriver()
+    # Return objects
+    return session.start(strava_login=strava_login, strava_password=strava_password, login_mode=login_mode)
 
-        # Open website
-        driver.get(url='https://www.strava.com/login')
-        time.sleep(3)
 
-        try:
-            if driver.find_element(by=By.ID, value='desktop-email'):
-                pass
+def strava_feed_date(*, text: str, timezone: str = 'UTC') -> datetime:
+    """Parse an activities feed date (e.g. 'Today at 7:05 AM', 'Yesterday', 'June 5, 2023 at 7:05 AM')."""
+    activity_date = re.sub(pattern=r'^(Today at |Today)(.*)$', repl=str(pd.Timestamp.now(tz=timezone).date()) + r' \2', string=text, flags=0)
+    activity_date = re.sub(pattern=r'^(Yesterday at |Yesterday)(.*)$', repl=str(pd.Timestamp.now(tz=timezone).date() - timedelta(days=1)) + r' \2', string=activity_date, flags=0)
+    activity_date = parser.parse(activity_date)
+
+    # Return objects
+    return activity_date
+
+
+def strava_feed_loaded(*, driver: WebDriver, entries_count: int) -> bool:
+    """Check if the activities feed has more than entries_count entries or reached its end."""
+    entries_total, feed_end = driver.execute_script(FEED_STATE_SCRIPT)
+
+    # Return objects
+    return entries_total > entries_count or feed_end
+
+
+def strava_club_feed_activities_id(
+    *,
+    driver: WebDriver,
+    club_id: str,
+    filter_date_min: datetime,
+    filter_date_max: datetime,
+    timezone: str = 'UTC',
+    rate_limiter: AdaptiveRateLimiter | None = None,
+    scroll_timeout: float = 20,
+) -> list[str]:
+    """
+    Scroll a Strava Club activities feed and get the activities_id between filter_date_min and filter_date_max.
+
+    Feed entries are harvested incrementally (only the entries added by each scroll are read). Each scroll waits until new feed entries are loaded or the end of the feed is reached (up to scroll_timeout seconds), and scrolling stops as soon as the feed passes filter_date_min.
+    Note: activity_type filter does not work for group activities - thus all group activities are kept and verified on a case-by-case base.
+    """
+    # Open Strava Club activities feed page
+    if rate_limiter is not None:
+        rate_limiter.acquire()
 
-        except NoSuchElementException:
-            while True:
-                try:
-                    driver.find_element(by=By.ID, value='desktop-email')
-                    break
+    driver.get(url=('https://www.strava.com/dashboard?club_id=' + club_id + '&feed_type=club&num_entries=100'))
+    try:
+        WebDriverWait(driver=driver, timeout=scroll_timeout, poll_frequency=0.25).until(method=lambda driver: strava_feed_loaded(driver=driver, entries_count=0))
 
-                except NoSuchElementException:
-                    time.sleep(2)
+    except TimeoutException:
+        logger.warning('club_id %s: activities feed not loaded after %s seconds', club_id, scroll_timeout)
+        return []
+
+    activities_id = []
+    entries_count = 0
+    scrolls_duration = []
+
+    while True:
+        # Harvest feed entries added since the last scroll
+        entries = driver.execute_script(FEED_ENTRIES_SCRIPT, entries_count)
+        entries_count += len(entries)
+
+        activity_date = None
+
+        for date_text, activity_urls in entries:
+            if date_text is None:
+                continue
+
+            activity_date = strava_feed_date(text=date_text, timezone=timezone)
+
+            if filter_date_min <= activity_date < (filter_date_max + timedelta(days=1)):
+                for activity_id in activity_urls:
+                    activity_id = re.sub(pattern=r'^.*/activities/(.*)$', repl=r'\1', string=activity_id, flags=0)
+                    activity_id = re.sub(pattern=r'^([0-9]+)(\?|/|#).*$', repl=r'\1', string=activity_id, flags=0)
+                    activities_id.append(activity_id)
+
+        # Stop once the feed passed filter_date_min or reached its end ("No more recent activity available.")
+        if activity_date is not None and activity_date < filter_date_min:
+            break
+
+        if driver.execute_script(FEED_STATE_SCRIPT)[1]:
+            break
+
+        # Scroll to the last feed entry and wait until new entries are loaded
+        start = time.monotonic()
+        driver.execute_script(FEED_SCROLL_SCRIPT)
 
-        # Reject cookies
         try:
-            driver.find_element(by=By.XPATH, value='.//button[@data-cy="deny-cookies"]').click()
+            WebDriverWait(driver=driver, timeout=scroll_timeout, poll_frequency=0.25).until(method=lambda driver: strava_feed_loaded(driver=driver, entries_count=entries_count))
 
-        except NoSuchElementException:
-            pass
+        except TimeoutException:
+            logger.warning('club_id %s: no new feed entries after %s seconds, stopping the feed scroll', club_id, scroll_timeout)
+            break
 
-        if login_mode == 'credentials' and strava_login is not None and strava_password is not None:
-            # Login
-            field_login = next(element for element in driver.find_elements(by=By.XPATH, value='.//*[@data-cy="email"]') if element.is_displayed())
-            field_login.send_keys(strava_login)
-            time.sleep(2)
-            field_login.send_keys(Keys.ENTER)
+        scrolls_duration.append(time.monotonic() - start)
+        logger.debug('club_id %s: scroll %s took %.2f seconds (%s feed entries)', club_id, len(scrolls_duration), scrolls_duration[-1], entries_count)
 
-            time.sleep(2)
+    logger.info('club_id %s: %s feed entries in %s scrolls (%.1f seconds scrolling)', club_id, entries_count, len(scrolls_duration), sum(scrolls_duration))
 
-            # Password
-            next(element for element in driver.find_elements(by=By.XPATH, value='.//button[text()="Use password instead"]') if element.is_displayed()).click()
-            field_password = next(element for element in driver.find_elements(by=By.XPATH, value='.//*[@data-cy="password"]') if element.is_displayed())
-            field_password.send_keys(strava_password)
-            time.sleep(2)
-            field_password.send_keys(Keys.ENTER)
+    activities_id = natsorted(seq=set(activities_id), alg=ns.IGNORECASE)
 
-            # Delete objects
-            del field_login, field_password
+    # Return objects
+    return activities_id
 
-        else:
-            WebDriverWait(driver=driver, timeout=300).until(method=EC.url_contains(url='https://www.strava.com/dashboard'))
 
-        # Return objects
-        return driver
+def strava_webdriver_pool(*, session: StravaSession, workers: int) -> list[WebDriver]:
+    """Start additional WebDriver sessions sharing the cookies of an authenticated session (the authenticated driver is the first element of the pool)."""
+    # The session WebDriver pool must hold the authenticated driver and the additional sessions
+    if session.webdriver_pool is not None and workers > session.webdriver_pool.size:
+        raise ValueError(f'workers ({workers}) exceeds the size of the session WebDriver pool ({session.webdriver_pool.size}), which also holds the authenticated driver')
+
+    # Strava session cookies
+    cookies = session.driver.get_cookies()
+
+    drivers = [session.driver]
+
+    try:
+        for _ in range(workers - 1):
+            worker_driver = session.new_webdriver()
+            drivers.append(worker_driver)
+
+            # Cookies can only be added for the domain currently loaded
+            worker_driver.get(url='https://www.strava.com')
+
+            for cookie in cookies:
+                worker_driver.add_cookie(cookie_dict=cookie)
 
+    except Exception:
+        # A WebDriver session failed to start: terminate (or release) the ones already started
+        strava_webdriver_pool_quit(session=session, drivers=drivers)
+        raise
 
-def strava_club_activities(*, strava_login: str, strava_password: str, club_ids: list[str], filter_activities_type: str, filter_date_min: str, filter_date_max: str, timezone: str = 'UTC') -> list[dict[str, Any]]:
+    # Return objects
+    return drivers
+
+
+def strava_webdriver_pool_quit(*, session: StravaSession, drivers: list[WebDriver]) -> None:
+    """Terminate (or release to the session WebDriver pool) the additional WebDriver sessions of a pool, keeping the authenticated driver."""
+    for worker_driver in drivers[1:]:
+        session.release_webdriver(driver=worker_driver)
+
+
+def strava_activities_overview_worker(
+    *,
+    driver: WebDriver,
+    activities_queue: queue.SimpleQueue,
+    results_queue: queue.SimpleQueue,
+    rate_limiter: AdaptiveRateLimiter,
+    stop: threading.Event,
+    max_retries: int = 5,
+    unknown_labels: Counter | None = None,
+) -> None:
     """
-    Scraps and imports activities belonging to one or multiple Strava Club(s) (public activities or activities that the account that is scraping the data has access to) to a dataset.
+    Consume (position, activity_id, attempt) items from activities_queue until it is empty, putting (position, activity) items on results_queue.
 
-    elapsed_time, moving_time: seconds
-    distance, elevation_gain: meters
-    max_speed, average_speed: meters/second
-    heart_rate: bpm
-    power: W
-    temperature: degree Celsius
+    Activities answered with "Too Many Requests" are put back on the queue (up to max_retries times, then their result is None). Exceptions are put on results_queue in place of the activity. Unknown stat labels are counted in unknown_labels (a counter of the worker only, Counter updates not being thread-safe).
     """
-    # Settings and variables
-    filter_date_min = parser.parse(filter_date_min)
-    filter_date_max = parser.parse(filter_date_max)
+    while not stop.is_set():
+        try:
+            position, activity_id, attempt = activities_queue.get_nowait()
 
-    # Strava login
-    driver = strava_authentication(strava_login=strava_login, strava_password=strava_password)
+        except queue.Empty:
+            break
 
-    data = []
+        try:
+            rate_limiter.acquire()
 
-    for club_id in club_ids:
-        # Open Strava Club activities feed page
-        driver.get(url=('https://www.strava.com/dashboard?club_id=' + club_id + '&feed_type=club&num_entries=100'))
-        time.sleep(3)
+            start = time.monotonic()
+            driver.get(url=('https://www.strava.com/activities/' + activity_id + '/overview'))
 
-        # Scroll to the end of the webpage
-        while True:
-            try:
-                driver.find_element(by=By.XPATH, value='//div[text()="No more recent activity available."]')
-                break
+            # Measurement mode: bytes transferred and load time per page
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Page load metrics: %s', page_load_metrics(driver=driver))
 
-            except NoSuchElementException:
-                activities = driver.find_elements(by=By.XPATH, value='//div[@data-testid="activity_entry_container"]')
-                activity_date = activities[-1].find_element(by=By.XPATH, value='.//..//..//..//..//..//time').text
-                activity_date = re.sub(pattern=r'^(Today at |Today)(.*)$', repl=str(pd.Timestamp.now(tz=timezone).date()) + r' \2', string=activity_date, flags=0)
-                activity_date = re.sub(pattern=r'^(Yesterday at |Yesterday)(.*)$', repl=str(pd.Timestamp.now(tz=timezone).date() - timedelta(days=1)) + r' \2', string=activity_date, flags=0)
-                activity_date = parser.parse(activity_date)
+            # Single page source snapshot, parsed with lxml (avoids one WebDriver round trip per field)
+            page_source = driver.page_source
 
-                if activity_date >= filter_date_min:
-                    # driver.execute_script(script='window.scrollTo(0, document.body.scrollHeight);')
-                    driver.execute_script('arguments[0].scrollIntoView({block: "start"});', driver.find_elements(by=By.XPATH, value='//*[@data-testid="web-feed-entry"]')[-1])
-                    time.sleep(6)
+            if is_too_many_requests(html=page_source):
+                rate_limiter.record_rate_limited(elapsed=time.monotonic() - start)
+
+                if attempt < max_retries:
+                    activities_queue.put((position, activity_id, attempt + 1))
 
                 else:
-                    break
+                    logger.warning('activity_id %s skipped after %s "Too Many Requests" responses', activity_id, attempt + 1)
+                    results_queue.put((position, None))
 
-        # Get all displayed activities_id, filtering filter_date_min and activity_type (note: activity_type filter does not work for group activities - thus all group activities are kept and verified on a case-by-case base)
-        activities_id = []
+                continue
 
-        activities = driver.find_elements(by=By.XPATH, value='//div[@data-testid="web-feed-entry"]')
+            rate_limiter.record_success(elapsed=time.monotonic() - start)
 
-        for activity in activities:
-            activity_date = activity.find_element(by=By.XPATH, value='.//time[@data-testid="date_at_time"]').text
-            activity_date = re.sub(pattern=r'^(Today at |Today)(.*)$', repl=str(pd.Timestamp.now(tz=timezone).date()) + r' \2', string=activity_date, flags=0)
-            activity_date = re.sub(pattern=r'^(Yesterday at |Yesterday)(.*)$', repl=str(pd.Timestamp.now(tz=timezone).date() - timedelta(days=1)) + r' \2', string=activity_date, flags=0)
-            activity_date = parser.parse(activity_date)
+            d = {}
 
-            if filter_date_min <= activity_date < (filter_date_max + timedelta(days=1)):
-                activity_ids = activity.find_elements(by=By.XPATH, value='.//div[@data-testid="activity_entry_container"]//h3//a')
+            # activity_id
+            d['activity_id'] = activity_id
 
-                for activity_id in activity_ids:
-                    activity_id = activity_id.get_attribute(name='href')
-                    activity_id = re.sub(pattern=r'^.*/activities/(.*)$', repl=r'\1', string=activity_id, flags=0)
-                    activity_id = re.sub(pattern=r'^([0-9]+)(\?|/|#).*$', repl=r'\1', string=activity_id, flags=0)
-                    activities_id.append(activity_id)
+            d.update(parse_activity_overview(html=page_source, unknown_labels=unknown_labels))
 
-        activities_id = natsorted(seq=set(activities_id), alg=ns.IGNORECASE)
+            results_queue.put((position, d))
 
-        for activity in activities_id:
-            d = {}
+        except Exception as exception:
+            results_queue.put((position, exception))
+            break
 
-            driver.get(url=('https://www.strava.com/activities/' + activity + '/overview'))
 
-            try:
-                driver.find_element(by=By.XPATH, value='//pre[text()="Too Many Requests"]')
-                break
+def strava_activities_overview(*, drivers: list[WebDriver], activities_id: list[str], rate_limiter: AdaptiveRateLimiter, max_retries: int = 5, unknown_labels: Counter | None = None) -> Iterator[dict[str, Any]]:
+    """Fetch and parse activity overview pages, splitting activities_id across the drivers pool. Activities are yielded as soon as they are parsed, in the order of activities_id. Unknown stat labels are counted in unknown_labels (once the workers stopped)."""
+    activities_queue = queue.SimpleQueue()
 
-            except NoSuchElementException:
-                # club_id
-                d['club_id'] = club_id
-
-                # activity_id
-                d['activity_id'] = activity
-
-                # athlete_name, activity_type
-                d['athlete_name'], d['activity_type'] = driver.find_element(by=By.XPATH, value='.//span[@class="title"]').text.split(sep=' – ')[0:2]
-
-                try:
-                    d['commute'] = driver.find_element(by=By.XPATH, value='.//span[@class="title"]').text.split(sep=' – ')[2]
-                    d['commute'] = re.sub(pattern=r'^Commute$', repl=r'True', string=d['commute'], flags=0)
-                    d['commute'] = bool(d['commute'])
-
-                except Exception:
-                    pass
-
-                # activity_date
-                d['activity_date'] = driver.find_element(by=By.XPATH, value='.//div[@class="details-container"]//time').text
-                d['activity_date'] = re.sub(pattern=r'^(.*) on (.*)$', repl=r'\2 \1', string=d['activity_date'], flags=0)
-                d['activity_date'] = parser.parse(d['activity_date'])
-
-                # Activity stats
-
-                # Click on "Show More" button (if available)
-                try:
-                    driver.find_element(by=By.XPATH, value='.//button[@class="minimal compact"][text()="Show More"]').click()
-
-                except Exception:
-                    pass
-
-                # athlete_id
-                d['athlete_id'] = driver.find_element(by=By.XPATH, value='.//div[@class="details-container"]//a').get_attribute(name='href')
-                d['athlete_id'] = re.sub(pattern=r'^.*/athletes/(.*)$', repl=r'\1', string=d['athlete_id'], flags=0)
-
-                # activity_name
-                d['activity_name'] = driver.find_element(by=By.XPATH, value='.//div[@class="details-container"]//h1').text
-
-                # activity_description
-                try:
-                    d['activity_description'] = driver.find_element(by=By.XPATH, value='.//div[@class="details-container"]//div[@class="content"]').text
-
-                except Exception:
-                    pass
-
-                # activity_location
-                try:
-                    d['activity_location'] = driver.find_element(by=By.XPATH, value='.//div[@class="details-container"]//span[@class="location"]').text
-
-                except Exception:
-                    pass
-
-                # Inline stats
-                inline_stats = driver.find_element(by=By.XPATH, value='.//ul[@class="inline-stats section"]').text.split(sep='\n')
-                inline_stats = convert_list_to_dictionary(to_convert=inline_stats)
-                inline_stats = {value: name for name, value in inline_stats.items()}
-
-                for item, value in inline_stats.items():
-                    d[item] = value
-
-                    # distance
-                    try:
-                        d['Distance'] = re.sub(pattern=r',', repl=r'', string=d['Distance'], flags=0)
-                        d['Distance'] = re.sub(pattern=r'km$', repl=r'', string=d['Distance'], flags=0)
-                        d['Distance'] = re.sub(pattern=r'm$', repl=r'', string=d['Distance'], flags=0)  # For activity_type = 'Swim'
-                        d['Distance'] = float(d['Distance'])
-                        d['Distance'] = d['Distance'] * 1000
-
-                    except Exception:
-                        pass
-
-                    # elevation_gain
-                    try:
-                        d['Elevation'] = re.sub(pattern=r',', repl=r'', string=d['Elevation'], flags=0)
-                        d['Elevation'] = re.sub(pattern=r'm$', repl=r'', string=d['Elevation'], flags=0)
-
-                    except Exception:
-                        pass
-
-                    # pace
-                    # try:
-                    #     d['Pace'] = re.sub(pattern=r' /km', repl=r'', string=d['Pace'], flags=0)
-                    #
-                    #     if len(d['Pace'].split(sep=':')) == 1:
-                    #
-                    #         if len(d['Pace'].split(sep=':')[0]) == 1:
-                    #             d['Pace'] = re.sub(pattern=r'^([0-9]+)$', repl=r'00:00:0\1', string=d['Pace'], flags=0)
-                    #
-                    #         elif len(d['Pace'].split(sep=':')[0]) == 2:
-                    #             d['Pace'] = re.sub(pattern=r'^([0-9]+)$', repl=r'00:00:\1', string=d['Pace'], flags=0)
-                    #
-                    #
-                    #     if len(d['Pace'].split(sep=':')) == 2:
-                    #
-                    #         if len(d['Pace'].split(sep=':')[0]) == 1:
-                    #             d['Pace'] = re.sub(pattern=r'^(.*)$', repl=r'00:0\1', string=d['Pace'], flags=0)
-                    #
-                    #         elif len(d['Pace'].split(sep=':')[0]) == 2:
-                    #             d['Pace'] = re.sub(pattern=r'^(.*)$', repl=r'00:\1', string=d['Pace'], flags=0)
-                    #
-                    # except Exception:
-                    #     pass
-
-                # More stats
-                try:
-                    more_stats = driver.find_element(by=By.XPATH, value='.//div[@class="section more-stats"]').text
-                    more_stats = re.sub(pattern=r'Show Less\n|Avg Max\n', repl=r'', string=more_stats, flags=0)
-
-                    # Speed
-                    more_stats = re.sub(pattern=r'^Speed ', repl=r'Average Speed\n', string=more_stats, flags=0)
-                    more_stats = re.sub(pattern=r'(km/h*?) ', repl=r'\1\nMax Speed\n', string=more_stats, flags=0)
-
-                    # Heart Rate
-                    more_stats = re.sub(pattern=r'Heart Rate ', repl=r'Average Heart Rate\n', string=more_stats, flags=0)
-                    more_stats = re.sub(pattern=r'(Heart Rate\n[0-9]{1,} bpm) ', repl=r'\1\nMax Heart Rate\n', string=more_stats, flags=0)
-
-                    # Cadence
-                    more_stats = re.sub(pattern=r'Cadence ', repl=r'Average Cadence\n', string=more_stats, flags=0)
-                    more_stats = re.sub(pattern=r'(Average Cadence\n[0-9]{1,}) ([0-9]{1,})', repl=r'\1\nMax Cadence\n\2', string=more_stats, flags=0)
-
-                    # Power
-                    more_stats = re.sub(pattern=r'Power ', repl=r'Average Power\n', string=more_stats, flags=0)
-                    more_stats = re.sub(pattern=r'(Average Power\n[0-9,]{1,} W) ([0-9,]{1,} W)', repl=r'\1\nMax Power\n\2', string=more_stats, flags=0)
-
-                    # Calories/Temperature/Elapsed Time
-                    more_stats = re.sub(pattern=r'(Calories|Temperature|Carbon Saved|Elapsed Time) ', repl=r'\1\n', string=more_stats, flags=0)
-                    more_stats = more_stats.split(sep='\n')
-                    more_stats = convert_list_to_dictionary(to_convert=more_stats)
-
-                    for item, value in more_stats.items():
-                        d[item] = value
-
-                        # max_speed
-                        try:
-                            d['Max Speed'] = re.sub(pattern=r'km/h$', repl=r'', string=d['Max Speed'], flags=0)
-                            d['Max Speed'] = float(d['Max Speed']) / 3.6
-
-                        except Exception:
-                            pass
-
-                        # average_speed
-                        try:
-                            d['Average Speed'] = re.sub(pattern=r'km/h$', repl=r'', string=d['Average Speed'], flags=0)
-                            d['Average Speed'] = float(d['Average Speed']) / 3.6
-
-                        except Exception:
-                            pass
-
-                        # max_heart_rate
-                        try:
-                            d['Max Heart Rate'] = re.sub(pattern=r' bpm', repl=r'', string=d['Max Heart Rate'], flags=0)
-                            d['Max Heart Rate'] = float(d['Max Heart Rate'])
-
-                        except Exception:
-                            pass
-
-                        # average_heart_rate
-                        try:
-                            d['Average Heart Rate'] = re.sub(pattern=r' bpm', repl=r'', string=d['Average Heart Rate'], flags=0)
-                            d['Average Heart Rate'] = float(d['Average Heart Rate'])
-
-                        except Exception:
-                            pass
-
-                        # max_cadence
-                        try:
-                            d['Max Cadence'] = float(d['Max Cadence'])
-
-                        except Exception:
-                            pass
-
-                        # average_cadence
-                        try:
-                            d['Average Cadence'] = float(d['Average Cadence'])
-
-                        except Exception:
-                            pass
-
-                        # max_watts
-                        try:
-                            d['Max Power'] = re.sub(pattern=r',', repl=r'', string=d['Max Power'], flags=0)
-                            d['Max Power'] = re.sub(pattern=r' W', repl=r'', string=d['Max Power'], flags=0)
-                            d['Max Power'] = float(d['Max Power'])
-
-                        except Exception:
-                            pass
-
-                        # average_watts
-                        try:
-                            d['Average Power'] = re.sub(pattern=r',', repl=r'', string=d['Average Power'], flags=0)
-                            d['Average Power'] = re.sub(pattern=r' W', repl=r'', string=d['Average Power'], flags=0)
-                            d['Average Power'] = float(d['Average Power'])
+    for position, activity_id in enumerate(activities_id):
+        activities_queue.put((position, activity_id, 0))
 
-                        except Exception:
-                            pass
+    results_queue = queue.SimpleQueue()
+    stop = threading.Event()
 
-                        # elevation_gain
-                        try:
-                            d['Elevation'] = re.sub(pattern=r',', repl=r'', string=d['Elevation'], flags=0)
-                            d['Elevation'] = re.sub(pattern=r'm$', repl=r'', string=d['Elevation'], flags=0)
-                            d['Elevation'] = float(d['Elevation'])
+    # Unknown stat labels counted by each worker, merged into unknown_labels once the workers stopped
+    workers_unknown_labels = [Counter() for _ in drivers]
 
-                        except Exception:
-                            pass
+    # Activities parsed ahead of the next position to be yielded
+    results = {}
+    next_position = 0
 
-                        # calories
-                        try:
-                            d['Calories'] = re.sub(pattern=r',', repl=r'', string=d['Calories'], flags=0)
-                            d['Calories'] = re.sub(pattern='\u2014', repl=r'', string=d['Calories'], flags=0)
-                            d['Calories'] = None if d['Calories'] == '' else float(d['Calories'])
+    with ThreadPoolExecutor(max_workers=max(len(drivers), 1)) as executor:
+        for driver, worker_unknown_labels in zip(drivers, workers_unknown_labels, strict=True):
+            executor.submit(
+                strava_activities_overview_worker,
+                driver=driver,
+                activities_queue=activities_queue,
+                results_queue=results_queue,
+                rate_limiter=rate_limiter,
+                stop=stop,
+                max_retries=max_retries,
+                unknown_labels=worker_unknown_labels,
+            )
 
-                        except Exception:
-                            pass
+        try:
+            while next_position < len(activities_id):
+                position, d = results_queue.get()
 
-                        # steps
-                        try:
-                            d['Steps'] = re.sub(pattern=r',', repl=r'', string=d['Steps'], flags=0)
-                            d['Steps'] = float(d['Steps'])
+                if isinstance(d, Exception):
+                    raise d
 
-                        except Exception:
-                            pass
+                results[position] = d
 
-                        # average_temperature
-                        try:
-                            d['Temperature'] = re.sub(pattern=r'^([0-9]+).*', repl=r'\1', string=d['Temperature'], flags=0)
-                            d['Temperature'] = float(d['Temperature'])
+                # Yield in deterministic order
+                while next_position in results:
+                    d = results.pop(next_position)
+                    next_position += 1
 
-                        except Exception:
-                            pass
+                    if d is not None:
+                        yield d
 
-                except Exception:
-                    pass
+        finally:
+            # Stop the workers if an error occurred or the consumer stopped early
+            stop.set()
+            executor.shutdown(wait=True)
 
-                # relative_effort
-                try:
-                    d['Relative Effort'] = float(d['Relative Effort'])
+            if unknown_labels is not None:
+                for worker_unknown_labels in workers_unknown_labels:
+                    unknown_labels.update(worker_unknown_labels)
 
-                except Exception:
-                    pass
 
-                # tough_relative_effort
-                try:
-                    d['Tough Relative Effort'] = float(d['Tough Relative Effort'])
+def strava_activities_overview_http(
+    *,
+    fetcher: HttpPageFetcher,
+    activities_id: list[str],
+    concurrency: int = 8,
+    max_retries: int = 5,
+    reauthenticate: Callable[[], dict[str, str]] | None = None,
+    unknown_labels: Counter | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Fetch activity overview pages over HTTP (without browser, with the connections pool of fetcher) in batches and parse them, retrying activities answered with "Too Many Requests". Activities are yielded after each batch, in the order of activities_id.
 
-                except Exception:
-                    pass
+    Unknown stat labels are counted in unknown_labels. Activities whose request failed (connection error or timeout) are fetched again, up to max_retries times; activities not answered with their page are logged and skipped. If most pages of a batch are redirected (to the login page, once the session cookies expired), reauthenticate is called to validate the session again (logging in if needed) and get its new HTTP request headers, and the redirected activities are fetched again.
+    """
+    pending = deque((position, activity_id, 0) for position, activity_id in enumerate(activities_id))
+    reauthentications = 0
 
-                # historic_relative_effort
-                try:
-                    d['Historic Relative Effort'] = float(d['Historic Relative Effort'])
+    # Activities parsed ahead of the next position to be yielded
+    results = {}
+    next_position = 0
 
-                except Exception:
-                    pass
+    while pending:
+        batch = [pending.popleft() for _ in range(min(concurrency * 4, len(pending)))]
 
-                # massive_relative_effort
-                try:
-                    d['Massive Relative Effort'] = float(d['Massive Relative Effort'])
+        pages = fetcher.get_pages(urls=['https://www.strava.com/activities/' + activity_id + '/overview' for _, activity_id, _ in batch], concurrency=concurrency)
+        responses = list(zip(batch, pages))
 
-                except Exception:
-                    pass
+        # Most pages redirected: session cookies expired, validate the session again and fetch the redirected activities again
+        redirected = [item for item, (status, _) in responses if 300 <= status < 400]
 
-                # activity_device
-                try:
-                    d['activity_device'] = driver.find_element(by=By.XPATH, value='.//div[@class="section device-section"]//div[@class="device spans8"]').text
+        if reauthenticate is not None and len(redirected) > len(batch) / 2 and reauthentications < max_retries:
+            logger.warning('%s of %s activity pages redirected, validating the Strava session again', len(redirected), len(batch))
+            reauthentications += 1
+            fetcher.headers = reauthenticate()
 
-                except Exception:
-                    pass
+            pending.extend(redirected)
+            responses = [(item, (status, page_source)) for item, (status, page_source) in responses if not 300 <= status < 400]
 
-                # activity_kudos
-                d['activity_kudos'] = driver.find_element(by=By.XPATH, value='.//span[@data-testid="kudos_count"]').text
-                d['activity_kudos'] = int(d['activity_kudos'])
+        for (position, activity_id, attempt), (status, page_source) in responses:
+            # Rate limited activities are put back on the queue (the rate limiter backs off before the next attempt)
+            if status == 429 or is_too_many_requests(html=page_source):
+                if attempt < max_retries:
+                    pending.append((position, activity_id, attempt + 1))
 
-                data.append(d)
+                else:
+                    logger.warning('activity_id %s skipped after %s "Too Many Requests" responses', activity_id, attempt + 1)
+                    results[position] = None
 
-    # Create DataFrame
-    club_activities_df = pd.DataFrame(data=data, index=None, dtype=None)
+                continue
 
-    # Rename columns
-    club_activities_df = clean_names(club_activities_df)
+            # Failed requests (connection error or timeout) are put back on the queue
+            if status == HTTP_ERROR_STATUS and attempt < max_retries:
+                pending.append((position, activity_id, attempt + 1))
+                continue
 
-    club_activities_df = club_activities_df.rename(columns={'elevation': 'elevation_gain', 'max_power': 'max_watts', 'average_power': 'average_watts', 'temperature': 'average_temperature'})
+            # Activities not accessible (e.g. private or deleted) are redirected/not found
+            if status != 200:
+                logger.warning('https://www.strava.com/activities/%s/overview skipped (HTTP status %s)', activity_id, status)
+                results[position] = None
+                continue
 
-    ## Change dtypes
+            d = {}
+
+            # activity_id
+            d['activity_id'] = activity_id
+
+            d.update(parse_activity_overview(html=page_source, unknown_labels=unknown_labels))
+
+            results[position] = d
+
+        # Yield in deterministic order
+        while next_position in results:
+            d = results.pop(next_position)
+            next_position += 1
+
+            if d is not None:
+                yield d
+
+
+def normalize_activity_record(*, record: dict[str, Any]) -> dict[str, Any]:
+    """Normalize a parsed activity (snake_case field names) and select the dataset fields."""
+    # Rename fields
+    record = {re.sub(pattern=r'[^a-z0-9]+', repl=r'_', string=key.lower(), flags=0).strip('_'): value for key, value in record.items()}
+    record = {ACTIVITY_FIELDS_RENAME.get(key, key): value for key, value in record.items()}
 
     # duration
-    if 'duration' in club_activities_df.columns:
-        club_activities_df['elapsed_time'] = club_activities_df['elapsed_time'].fillna(value=club_activities_df['duration'], axis=0)
+    if 'duration' in record:
+        record.setdefault('elapsed_time', record['duration'])
+        record.setdefault('moving_time', record['duration'])
 
-        club_activities_df['moving_time'] = club_activities_df['moving_time'].fillna(value=club_activities_df['duration'], axis=0)
+    # Select fields
+    record = {key: record[key] for key in CLUB_ACTIVITIES_COLUMNS if key in record}
 
-        club_activities_df = club_activities_df.drop(columns=['duration'], errors='ignore')
+    # Return objects
+    return record
 
-    # elapsed_time
-    if 'elapsed_time' in club_activities_df.columns:
-        club_activities_df['elapsed_time'] = club_activities_df['elapsed_time'].apply(
-            lambda row: (
-                re.sub(pattern=r'^([0-9]+)s$', repl=r'00:00:\1', string=row, flags=0)
-                if len(row.split(sep=':')) == 1
-                else (re.sub(pattern=r'^(.*)$', repl=r'00:\1', string=row, flags=0) if len(row.split(sep=':')) == 2 else row)
-            )
-            if not pd.isna(row)
-            else row,
-        )
 
-        club_activities_df['elapsed_time'] = club_activities_df['elapsed_time'].apply(
-            lambda row: get_seconds(time_str=str(row)) if not pd.isna(row) else row,
-        )
+def club_activity_records(*, d: dict[str, Any], club_ids: list[str], filter_activities_type: list[str] | None, filter_date_min: datetime, filter_date_max: datetime) -> list[dict[str, Any]]:
+    """Get the normalized records of a parsed activity, one per club_id, filtering activity types and date interval."""
+    records = []
+
+    for club_id in club_ids:
+        record = normalize_activity_record(record=d | {'club_id': club_id})
+
+        # Filter activity types
+        if filter_activities_type is not None and record['activity_type'] not in filter_activities_type:
+            continue
+
+        # Filter date interval
+        if not filter_date_min <= record['activity_date'] <= filter_date_max:
+            continue
+
+        records.append(record)
+
+    # Return objects
+    return records
+
+
+def iter_club_activities(
+    *,
+    strava_login: str,
+    strava_password: str,
+    club_ids: list[str],
+    filter_activities_type: str,
+    filter_date_min: str,
+    filter_date_max: str,
+    timezone: str = 'UTC',
+    workers: int | dict[str, int] = 1,
+    fetch_mode: Literal['selenium', 'http'] = 'selenium',
+    rate_limiter: AdaptiveRateLimiter | None = None,
+    activity_cache: ActivityCache | None = None,
+    checkpoint_dir: str | None = None,
+    session: StravaSession | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Scraps activities belonging to one or multiple Strava Club(s) (public activities or activities that the account that is scraping the data has access to), yielding each normalized activity record (one per club_id and activity_id) as soon as its page is parsed.
+
+    workers: number of WebDriver sessions ('selenium' fetch_mode) or HTTP connections ('http' fetch_mode) fetching activity pages in parallel, either for all clubs or per club_id (e.g. {'445017': 4, '789955': 2}).
+    fetch_mode: 'selenium' loads activity pages in the browser; 'http' fetches them directly with the login cookies (Selenium is then only used for the login and the activities feed scroll).
+    rate_limiter: rate limiter shared by all page fetches; defaults to the process-wide strava_rate_limiter, its initial rate scaled to the workers.
+    activity_cache: persistent cache of parsed activities; cached activities are not loaded again (unless their refresh fields, e.g. activity_kudos, may have changed).
+    checkpoint_dir: directory of the run progress journal; a run interrupted (e.g. browser crash) and restarted with the same parameters resumes from its last checkpoint, without scrolling the collected feeds or fetching the completed activities again.
+    session: Strava browser session (logged in once, cookies optionally persisted on disk); defaults to the process-wide strava_session shared by all scrapers.
+
+
+    elapsed_time, moving_time: seconds (text for activities cached or journaled by earlier versions, converted by strava_club_activities)
+    distance, elevation_gain: meters
+    max_speed, average_speed: meters/second
+    heart_rate: bpm
+    power: W
+    temperature: degree Celsius
+    """
+    # Settings and variables
+    pool_workers = max(workers.values(), default=1) if isinstance(workers, dict) else workers
 
-    # moving_time
-    if 'moving_time' in club_activities_df.columns:
-        club_activities_df['moving_time'] = club_activities_df['moving_time'].apply(
-            lambda row: (
-                re.sub(pattern=r'^([0-9]+)s$', repl=r'00:00:\1', string=row, flags=0)
-                if len(row.split(sep=':')) == 1
-                else (re.sub(pattern=r'^(.*)$', repl=r'00:\1', string=row, flags=0) if len(row.split(sep=':')) == 2 else row)
+    if rate_limiter is None:
+        rate_limiter = strava_rate_limiter
+        rate_limiter.scale_to_workers(workers=pool_workers)
+
+    if session is None:
+        session = strava_session
+
+    journal = None
+    drivers = []
+    http_fetcher = None
+
+    # Stat labels missing from STAT_SCHEMA in the pages of this scrape, with their number of occurrences
+    unknown_stat_labels = Counter()
+
+    try:
+        # Progress journal (resumes an interrupted run with the same parameters)
+        if checkpoint_dir is not None:
+            journal = RunJournal(
+                directory=checkpoint_dir,
+                parameters={'club_ids': club_ids, 'filter_activities_type': filter_activities_type, 'filter_date_min': filter_date_min, 'filter_date_max': filter_date_max, 'timezone': timezone},
             )
-            if not pd.isna(row)
-            else row,
-        )
 
-        club_activities_df['moving_time'] = club_activities_df['moving_time'].apply(lambda row: get_seconds(time_str=str(row)) if not pd.isna(row) else row)
+        filter_date_min = parser.parse(filter_date_min)
+        filter_date_max = parser.parse(filter_date_max)
 
-    # pace
-    # if 'pace' in club_activities_df.columns:
-    #     club_activities_df['pace'] = pd.to_datetime(arg=club_activities_df['pace'], utc=False, format='%H:%M:%S').dt.time
-    #     club_activities_df['pace'] = pd.to_timedelta(arg=club_activities_df['pace'].astype(dtype='str'), unit='ns').dt.total_seconds()
-
-    club_activities_df = club_activities_df.filter(
-        items=[
-            'club_id',
-            'activity_date',
-            'athlete_id',
-            'athlete_name',
-            'activity_type',
-            'activity_id',
-            'activity_name',
-            'activity_description',
-            'activity_location',
-            'commute',
-            'elapsed_time',
-            'moving_time',
-            'distance',
-            'max_speed',
-            'average_speed',
-            'pace',
-            'relative_effort',
-            'tough_relative_effort',
-            'historic_relative_effort',
-            'massive_relative_effort',
-            'steps',
-            'elevation_gain',
-            'max_heart_rate',
-            'average_heart_rate',
-            'max_cadence',
-            'average_cadence',
-            'max_watts',
-            'average_watts',
-            'calories',
-            'activity_device',
-            'average_temperature',
-            'carbon_saved',
-            'activity_kudos',
-        ],
+        # Strava login
+        driver = strava_authentication(strava_login=strava_login, strava_password=strava_password, session=session)
+
+        # WebDriver sessions pool sharing the login cookies
+        if fetch_mode == 'http':
+            drivers = [driver]
+
+        else:
+            drivers = strava_webdriver_pool(session=session, workers=pool_workers)
+
+        # Get activities_id from the activities feeds of all clubs first (unless already collected by an interrupted run with the same parameters)
+        clubs_activities_id = {}
+
+        for club_id in club_ids:
+            if journal is not None and club_id in journal.feeds:
+                clubs_activities_id[club_id] = journal.feeds[club_id]
+
+            else:
+                clubs_activities_id[club_id] = strava_club_feed_activities_id(
+                    driver=driver,
+                    club_id=club_id,
+                    filter_date_min=filter_date_min,
+                    filter_date_max=filter_date_max,
+                    timezone=timezone,
+                    rate_limiter=rate_limiter,
+                )
+
+                # Checkpoint
+                if journal is not None:
+                    journal.record_feed(club_id=club_id, activities_id=clubs_activities_id[club_id])
+
+        # Clubs of each activity (athletes can be members of multiple clubs, the same activity is then shown in multiple club feeds)
+        activities_clubs = {}
+
+        for club_id, activities_id in clubs_activities_id.items():
+            for activity_id in activities_id:
+                activities_clubs.setdefault(activity_id, []).append(club_id)
+
+        logger.info('%s activities in the club feeds, %s unique activities', sum(len(activities_id) for activities_id in clubs_activities_id.values()), len(activities_clubs))
+
+        activities_id_scraped = set()
+
+        def reauthenticate() -> dict[str, str]:
+            """Validate the Strava session again (logging in if its cookies expired), returning its new HTTP request headers."""
+            session.invalidate()
+
+            # Return objects
+            return webdriver_http_headers(driver=strava_authentication(strava_login=strava_login, strava_password=strava_password, session=session))
+
+        # HTTP connections pool sharing the login cookies, reused by all page batches
+        http_fetcher = HttpPageFetcher(host='www.strava.com', headers=webdriver_http_headers(driver=driver), concurrency=pool_workers, rate_limiter=rate_limiter) if fetch_mode == 'http' else None
+
+        for club_id in club_ids:
+            # Each unique activity is scraped once, with the workers of the first club it belongs to
+            activities_id = [activity_id for activity_id in clubs_activities_id[club_id] if activity_id not in activities_id_scraped]
+            activities_id_scraped.update(activities_id)
+
+            # Activities already scraped (by an interrupted run with the same parameters, or cached)
+            activities_id_fetch = []
+
+            for activity_id in activities_id:
+                d = journal.activities.get(activity_id) if journal is not None else None
+
+                if d is None and activity_cache is not None:
+                    d = activity_cache.get(activity_id=activity_id)
+
+                if d is None:
+                    activities_id_fetch.append(activity_id)
+
+                else:
+                    yield from club_activity_records(
+                        d=d,
+                        club_ids=activities_clubs[activity_id],
+                        filter_activities_type=filter_activities_type,
+                        filter_date_min=filter_date_min,
+                        filter_date_max=filter_date_max,
+                    )
+
+            # Fetch and parse activity overview pages, split across the WebDriver sessions pool (or HTTP connections)
+            club_workers = workers.get(club_id, 1) if isinstance(workers, dict) else workers
+
+            if fetch_mode == 'http':
+                activities = strava_activities_overview_http(fetcher=http_fetcher, activities_id=activities_id_fetch, concurrency=club_workers, reauthenticate=reauthenticate, unknown_labels=unknown_stat_labels)
+
+            else:
+                activities = strava_activities_overview(drivers=drivers[:club_workers], activities_id=activities_id_fetch, rate_limiter=rate_limiter, unknown_labels=unknown_stat_labels)
+
+            for d in activities:
+                if activity_cache is not None:
+                    activity_cache.put(activity_id=d['activity_id'], d=d)
+
+                # Checkpoint
+                if journal is not None:
+                    journal.record_activity(d=d)
+
+                yield from club_activity_records(
+                    d=d,
+                    club_ids=activities_clubs[d['activity_id']],
+                    filter_activities_type=filter_activities_type,
+                    filter_date_min=filter_date_min,
+                    filter_date_max=filter_date_max,
+                )
+
+        # Run completed, delete progress journal
+        if journal is not None:
+            journal.complete()
+
+    finally:
+        # Close progress journal (kept on disk to resume an interrupted run)
+        if journal is not None:
+            journal.close()
+
+        # Quit WebDriver sessions pool (or close HTTP connections)
+        strava_webdriver_pool_quit(session=session, drivers=drivers)
+
+        if http_fetcher is not None:
+            http_fetcher.close()
+
+        # WebDriver cold start versus pooled acquisition times
+        if session.webdriver_pool is not None:
+            logger.info('WebDriver pool report: %s', session.webdriver_pool.report())
+
+        # Time spent fetching pages versus waiting for the rate limiter
+        logger.info('Rate limiter report: %s', rate_limiter.report())
+
+        # Activities cache hits/misses
+        if activity_cache is not None:
+            activity_cache.evict()
+            logger.info('Activity cache report: %s', activity_cache.report())
+
+        # Stat labels without conversion (kept as text)
+        if unknown_stat_labels:
+            logger.warning('Unknown Strava stat labels (add them to STAT_SCHEMA): %s', dict(unknown_stat_labels))
+
+
+def strava_club_activities(
+    *,
+    strava_login: str,
+    strava_password: str,
+    club_ids: list[str],
+    filter_activities_type: str,
+    filter_date_min: str,
+    filter_date_max: str,
+    timezone: str = 'UTC',
+    workers: int | dict[str, int] = 1,
+    fetch_mode: Literal['selenium', 'http'] = 'selenium',
+    rate_limiter: AdaptiveRateLimiter | None = None,
+    activity_cache: ActivityCache | None = None,
+    checkpoint_dir: str | None = None,
+    session: StravaSession | None = None,
+) -> pd.DataFrame:
+    """
+    Scraps and imports activities belonging to one or multiple Strava Club(s) (public activities or activities that the account that is scraping the data has access to) to a dataset.
+
+    See iter_club_activities for the parameters.
+
+    elapsed_time, moving_time: seconds
+    distance, elevation_gain: meters
+    max_speed, average_speed: meters/second
+    heart_rate: bpm
+    power: W
+    temperature: degree Celsius
+    """
+    # Create DataFrame
+    club_activities_df = pd.DataFrame(
+        data=list(
+            iter_club_activities(
+                strava_login=strava_login,
+                strava_password=strava_password,
+                club_ids=club_ids,
+                filter_activities_type=filter_activities_type,
+                filter_date_min=filter_date_min,
+                filter_date_max=filter_date_max,
+                timezone=timezone,
+                workers=workers,
+                fetch_mode=fetch_mode,
+                rate_limiter=rate_limiter,
+                activity_cache=activity_cache,
+                checkpoint_dir=checkpoint_dir,
+                session=session,
+            ),
+        ),
+        index=None,
+        dtype=None,
     )
 
-    # Filter activity types
-    if filter_activities_type is not None:
-        club_activities_df = club_activities_df.query(expr='activity_type.isin(@filter_activities_type)').reset_index(level=None, drop=True, names=None)
+    # Select columns
+    club_activities_df = club_activities_df.filter(items=CLUB_ACTIVITIES_COLUMNS)
 
-    # Filter date interval
-    if filter_date_min is not None and filter_date_max is not None:
-        club_activities_df = club_activities_df.query(expr='activity_date >= @filter_date_min & activity_date <= @filter_date_max').reset_index(level=None, drop=True, names=None)
+    # elapsed_time, moving_time: seconds (durations of activities cached or journaled as text are converted in one vectorized pass per column)
+    for column in ['elapsed_time', 'moving_time']:
+        if column in club_activities_df.columns:
+            club_activities_df[column] = durations_to_seconds(series=club_activities_df[column])
 
     # Rearrange rows
     club_activities_df = club_activities_df.sort_values(by=['club_id', 'activity_date'], ignore_index=True)
@@ -568,10 +772,10 @@ def strava_club_activities(*, strava_login: str, strava_password: str, club_ids:
     return club_activities_df
 
 
-def strava_export_activities(*, strava_login: str, strava_password: str, activities_id: list[int], file_type: str = '.gpx') -> None:
+def strava_export_activities(*, strava_login: str, strava_password: str, activities_id: list[int], file_type: str = '.gpx', session: StravaSession | None = None) -> None:
     """Given a list of activity_id, export it to .gpx."""
     # Strava login
-    driver = strava_authentication(strava_login=strava_login, strava_password=strava_password)
+    driver = strava_authentication(strava_login=strava_login, strava_password=strava_password, session=session)
 
     # Export activity as .gpx
     if file_type == '.gpx':
@@ -598,74 +802,203 @@ def strava_export_activities(*, strava_login: str, strava_password: str, activit
                 pass
 
 
-def strava_club_members(*, strava_login: str, strava_password: str, club_ids: list[str], club_members_teams: dict[str, str] | None = None, timezone: str = 'UTC') -> pd.DataFrame:
-    """Scraps and imports members of one or multiple Strava Club(s) to a dataset."""
+def strava_fetch_pages(
+    *,
+    urls: list[str],
+    driver: WebDriver,
+    fetch_mode: Literal['selenium', 'http'] = 'selenium',
+    http_fetcher: HttpPageFetcher | None = None,
+    rate_limiter: AdaptiveRateLimiter,
+    max_retries: int = 5,
+) -> list[str | None]:
+    """Fetch pages in the browser ('selenium' fetch_mode) or concurrently over HTTP with the connections pool of http_fetcher ('http' fetch_mode), retrying pages answered with "Too Many Requests" or whose request failed. Returns the page sources in the order of urls (None for pages that could not be fetched)."""
+    pages = [None] * len(urls)
+    pending = list(range(len(urls)))
+
+    for attempt in range(max_retries + 1):
+        if not pending:
+            break
+
+        if fetch_mode == 'http':
+            responses = http_fetcher.get_pages(urls=[urls[position] for position in pending])
+
+        else:
+            responses = []
+
+            for position in pending:
+                rate_limiter.acquire()
+
+                start = time.monotonic()
+                driver.get(url=urls[position])
+
+                # Measurement mode: bytes transferred and load time per page
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('Page load metrics: %s', page_load_metrics(driver=driver))
+
+                page_source = driver.page_source
+
+                if is_too_many_requests(html=page_source):
+                    rate_limiter.record_rate_limited(elapsed=time.monotonic() - start)
+                    responses.append((429, page_source))
+
+                else:
+                    rate_limiter.record_success(elapsed=time.monotonic() - start)
+                    responses.append((200, page_source))
+
+        retries = []
+
+        for position, (status, page_source) in zip(pending, responses):
+            # Rate limited pages are fetched again (the rate limiter backs off before the next attempt)
+            if status == 429 or is_too_many_requests(html=page_source):
+                retries.append(position)
+
+            elif status == 200:
+                pages[position] = page_source
+
+            # Failed requests (connection error or timeout) are fetched again
+            elif status == HTTP_ERROR_STATUS and attempt < max_retries:
+                retries.append(position)
+
+            else:
+                logger.warning('%s skipped (HTTP status %s)', urls[position], status)
+
+        pending = retries
+
+    for position in pending:
+        logger.warning('%s skipped after %s "Too Many Requests" responses', urls[position], max_retries + 1)
+
+    # Return objects
+    return pages
+
+
+def strava_club_members_pages(
+    *,
+    driver: WebDriver,
+    club_id: str,
+    fetch_mode: Literal['selenium', 'http'] = 'selenium',
+    http_fetcher: HttpPageFetcher | None = None,
+    rate_limiter: AdaptiveRateLimiter,
+) -> Iterator[dict[str, Any]]:
+    """Fetch and parse the members pages of a Strava Club by page number, yielding each parsed page: the first page, then all pages up to the last page number of its pagination at once (concurrently in 'http' fetch_mode), then any further page one by one."""
+    url = 'https://www.strava.com/clubs/' + club_id + '/members?page='
+
+    page_source = strava_fetch_pages(urls=[url + '1'], driver=driver, fetch_mode=fetch_mode, http_fetcher=http_fetcher, rate_limiter=rate_limiter)[0]
+
+    if page_source is None:
+        return
+
+    page = parse_club_members_page(html=page_source)
+    page_number = 1
+    yield page
+
+    # Pages up to the last page number shown in the pagination
+    if page['last_page'] is not None and page['last_page'] > 1:
+        page_sources = strava_fetch_pages(
+            urls=[url + str(number) for number in range(2, page['last_page'] + 1)],
+            driver=driver,
+            fetch_mode=fetch_mode,
+            http_fetcher=http_fetcher,
+            rate_limiter=rate_limiter,
+        )
+        page_number = page['last_page']
+
+        for page_source in page_sources:
+            if page_source is not None:
+                page = parse_club_members_page(html=page_source)
+                yield page
+
+    # Further pages (if the pagination did not show the last page number)
+    while page['next_page']:
+        page_number += 1
+        page_source = strava_fetch_pages(urls=[url + str(page_number)], driver=driver, fetch_mode=fetch_mode, http_fetcher=http_fetcher, rate_limiter=rate_limiter)[0]
+
+        if page_source is None:
+            break
+
+        page = parse_club_members_page(html=page_source)
+        yield page
+
+
+def strava_club_members(
+    *,
+    strava_login: str,
+    strava_password: str,
+    club_ids: list[str],
+    club_members_teams: dict[str, str] | None = None,
+    timezone: str = 'UTC',
+    workers: int = 1,
+    fetch_mode: Literal['selenium', 'http'] = 'selenium',
+    rate_limiter: AdaptiveRateLimiter | None = None,
+    geocode_cache: GeocodeCache | None = None,
+    session: StravaSession | None = None,
+) -> pd.DataFrame:
+    """
+    Scraps and imports members of one or multiple Strava Club(s) to a dataset.
+
+    Members pages are fetched by page number and parsed from a single page source snapshot each: in the browser ('selenium' fetch_mode) or over HTTP with workers concurrent connections ('http' fetch_mode).
+    geocode_cache: persistent cache of the athlete locations geocoded with Nominatim (locations resolved offline with the bundled gazetteer are not sent to Nominatim).
+    """
     # Settings and variables
-    geolocator = Nominatim(user_agent='strava-club-scraper')
-    geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1)
+    location_resolver = LocationCountryResolver(geocode_cache=geocode_cache)
 
     # Strava login
-    driver = strava_authentication(strava_login=strava_login, strava_password=strava_password)
+    driver = strava_authentication(strava_login=strava_login, strava_password=strava_password, session=session)
 
-    data = []
+    if rate_limiter is None:
+        rate_limiter = strava_rate_limiter
+        rate_limiter.scale_to_workers(workers=workers if fetch_mode == 'http' else 1)
 
-    for club_id in club_ids:
-        # Open Strava Club members page
-        driver.get(url=('https://www.strava.com/clubs/' + club_id + '/members'))
-        time.sleep(3)
+    # HTTP connections pool sharing the login cookies, reused by all members pages
+    http_fetcher = HttpPageFetcher(host='www.strava.com', headers=webdriver_http_headers(driver=driver), concurrency=workers, rate_limiter=rate_limiter) if fetch_mode == 'http' else None
 
-        # Create variables
+    data = []
 
-        # club_name
-        club_name = driver.find_element(by=By.XPATH, value='//h1[@class="mb-sm"]').text.split(sep='\n')[0]
+    try:
+        for club_id in club_ids:
+            start = time.monotonic()
 
-        # club_activity_type
-        club_activity_type = driver.find_element(by=By.XPATH, value='//div[@class="club-meta"]//div[@class="location"]//span[@class="app-icon-wrapper  "]').text
+            club = None
+            pages_count = 0
+            members_count = 0
 
-        # club_location
-        club_location = driver.find_element(by=By.XPATH, value='//div[@class="club-meta"]//div[@class="location"]').text
-        club_location = re.sub(pattern=rf'^{club_activity_type}(.*)$', repl=r'\1', string=club_location, flags=0).strip()
+            # Get Strava Club members list (athlete locations are resolved in the background while the next pages are scraped)
+            for page in strava_club_members_pages(driver=driver, club_id=club_id, fetch_mode=fetch_mode, http_fetcher=http_fetcher, rate_limiter=rate_limiter):
+                if club is None:
+                    club = page
 
-        # Get Strava Club members list
-        while True:
-            try:
-                members = driver.find_elements(by=By.XPATH, value='//ul[@class="list-athletes"]//li')
+                pages_count += 1
 
-                for member in members:
+                for member in page['members']:
                     d = {}
 
                     # club_id
                     d['club_id'] = club_id
 
-                    # club_name
-                    d['club_name'] = club_name
+                    # club_name, club_activity_type, club_location
+                    d['club_name'] = club['club_name']
+                    d['club_activity_type'] = club['club_activity_type']
+                    d['club_location'] = club['club_location']
 
-                    # club_activity_type
-                    d['club_activity_type'] = club_activity_type
+                    # athlete_id, athlete_name, athlete_location, athlete_picture
+                    d.update(member)
 
-                    # club_location
-                    d['club_location'] = club_location
-
-                    # athlete_id
-                    d['athlete_id'] = member.find_element(by=By.XPATH, value='.//div[@class="text-headline"]//a').get_attribute(name='href')
-                    d['athlete_id'] = re.sub(pattern=r'^.*/athletes/(.*)$', repl=r'\1', string=d['athlete_id'], flags=0)
-
-                    # athlete_name
-                    d['athlete_name'] = member.find_element(by=By.XPATH, value='.//div[@class="text-headline"]').text
-
-                    # athlete_location
-                    d['athlete_location'] = member.find_element(by=By.XPATH, value='.//div[@class="location"]').text
-                    d['athlete_location'] = d['athlete_location'].strip()
+                    data.append(d)
+                    members_count += 1
 
-                    # athlete_picture
-                    d['athlete_picture'] = json.loads(html.unescape(member.find_element(by=By.XPATH, value='.//div[contains(@data-react-class, "AvatarWrapper")]').get_attribute(name='data-react-props'))).get('src')
+                    # athlete_location_country_code, athlete_location_country
+                    if member['athlete_location'] != '':
+                        location_resolver.submit(location=member['athlete_location'])
 
-                    data.append(d)
+            if club is None:
+                logger.warning('club_id %s skipped (members page not accessible)', club_id)
+                continue
 
-                driver.find_element(by=By.XPATH, value='.//li[@class="next_page"]').click()
+            elapsed = time.monotonic() - start
+            logger.info('club_id %s: %s members in %s pages, %.2fs (%.1f members/s)', club_id, members_count, pages_count, elapsed, members_count / elapsed if elapsed > 0 else 0)
 
-            except NoSuchElementException:
-                break
+    finally:
+        if http_fetcher is not None:
+            http_fetcher.close()
 
     # Create DataFrame
     club_members_df = (
@@ -676,28 +1009,21 @@ def strava_club_members(*, strava_login: str, strava_password: str, club_ids: li
         .drop_duplicates(subset=None, keep='first', ignore_index=True)
     )
 
-    # Create DataFrame with distinct 'athlete_location' values
-    club_members_geolocation = (
-        club_members_df.filter(items=['athlete_location']).query(expr='athlete_location.notna()').drop_duplicates(subset=None, keep='first', ignore_index=True).sort_values(by=['athlete_location'], ignore_index=True)
-    )
-
-    # Create 'athlete_geolocation' column
-    club_members_geolocation['athlete_geolocation'] = club_members_geolocation.apply(
-        lambda row: (geocode(row['athlete_location'], language='en', exactly_one=True, addressdetails=True, namedetails=True, timeout=None) if pd.notna(row['athlete_location']) else None),
-        axis=1,
-    )
+    # Create DataFrame with distinct 'athlete_location' values and their 'athlete_location_country_code' and 'athlete_location_country' (resolved in the background: offline gazetteer, else geocode cache, else Nominatim)
+    start = time.monotonic()
+    countries = location_resolver.join()
+    logger.info('Geocoding report: %s (%.2fs waited after scraping)', location_resolver.report(), time.monotonic() - start)
 
-    # Create 'athlete_location_country_code' column
-    club_members_geolocation['athlete_location_country_code'] = club_members_geolocation.apply(
-        lambda row: (row['athlete_geolocation'].raw.get('address').get('country_code') if pd.notna(row['athlete_geolocation']) else None),
-        axis=1,
+    club_members_geolocation = pd.DataFrame(
+        data=[{'athlete_location': location, 'athlete_location_country_code': country['country_code'], 'athlete_location_country': country['country']} for location, country in countries.items()],
+        index=None,
+        columns=['athlete_location', 'athlete_location_country_code', 'athlete_location_country'],
+        dtype=None,
     )
 
-    # Create 'athlete_location_country' column
-    club_members_geolocation['athlete_location_country'] = club_members_geolocation.apply(
-        lambda row: (row['athlete_geolocation'].raw.get('address').get('country') if pd.notna(row['athlete_geolocation']) else None),
-        axis=1,
-    )
+    if geocode_cache is not None:
+        geocode_cache.evict()
+        logger.info('Geocode cache report: %s', geocode_cache.report())
 
     # Left join 'club_members_df' with 'club_members_geolocation'
     club_members_df = club_members_df.merge(right=club_members_geolocation, how='left', on=['athlete_location'], indicator=False)
@@ -733,8 +1059,6 @@ def strava_club_members(*, strava_login: str, strava_password: str, club_ids: li
 
     club_members_df = (
         club_members_df
-        # Remove columns
-        .drop(columns=['athlete_geolocation'], errors='ignore')
         # Create 'join_date' column
         .assign(join_date=pd.Timestamp.now(tz=timezone).replace(tzinfo=None).floor(freq='d').to_pydatetime())
         # Select columns
@@ -762,139 +1086,137 @@ def strava_club_members(*, strava_login: str, strava_password: str, club_ids: li
     return club_members_df
 
 
-def strava_club_leaderboard(*, strava_login: str, strava_password: str, club_ids: list[str], filter_date_min: str, filter_date_max: str, timezone: str = 'UTC') -> pd.DataFrame:
-    """
-    Scraps and imports leaderboard of one or multiple Strava Club(s) to a dataset.
+def strava_club_leaderboard_weeks(*, driver: WebDriver, club_id: str, timezone: str = 'UTC', rate_limiter: AdaptiveRateLimiter, week_timeout: float = 5) -> pd.DataFrame:
+    """Scrap the current and last week leaderboards of a Strava Club (one page source snapshot per week, each parsed in a single pass) to a dataset."""
+    # Current week start (Monday)
+    week_start = pd.Timestamp.now(tz=timezone).replace(tzinfo=None).floor(freq='d').to_pydatetime() + relativedelta.relativedelta(weekday=relativedelta.MO(-1))
 
-    moving_time: seconds
-    distance, distance_longest, elevation_gain: meters
-    average_speed: meters/second
-    """
-    # Settings and variables
-    filter_date_min = parser.parse(filter_date_min)
-    filter_date_max = parser.parse(filter_date_max)
+    # Open Strava Club leaderboard page
+    rate_limiter.acquire()
 
-    # Strava login
-    driver = strava_authentication(strava_login=strava_login, strava_password=strava_password)
+    start = time.monotonic()
+    driver.get(url=('https://www.strava.com/clubs/' + club_id + '/leaderboard'))
+    WebDriverWait(driver=driver, timeout=20, poll_frequency=0.25).until(method=lambda driver: driver.execute_script(LEADERBOARD_STATE_SCRIPT) is not None)
+    rate_limiter.record_success(elapsed=time.monotonic() - start)
 
-    club_leaderboard_df = pd.DataFrame(data=None, index=None, dtype='str')
+    # Current week Strava Club Leaderboard
+    leaderboards = [(week_start, parse_club_leaderboard(html=driver.page_source))]
 
-    for club_id in club_ids:
-        # Open Strava Club leaderboard page
-        driver.get(url=('https://www.strava.com/clubs/' + club_id + '/leaderboard'))
-        time.sleep(3)
+    # Last week Strava Club Leaderboard
+    leaderboard_state = driver.execute_script(LEADERBOARD_STATE_SCRIPT)
+    driver.find_element(by=By.XPATH, value='//span[@class="button last-week"]').click()
 
-        # Create variables
+    try:
+        WebDriverWait(driver=driver, timeout=week_timeout, poll_frequency=0.25).until(method=lambda driver: driver.execute_script(LEADERBOARD_STATE_SCRIPT) != leaderboard_state)
 
-        # club_name
-        club_name = driver.find_element(by=By.XPATH, value='//h1[@class="mb-sm"]').text.split(sep='\n')[0]
-
-        # club_activity_type
-        club_activity_type = driver.find_element(by=By.XPATH, value='//div[@class="club-meta"]//div[@class="location"]//span[@class="app-icon-wrapper  "]').text
+    # Leaderboard unchanged (e.g. both weeks empty)
+    except TimeoutException:
+        pass
 
-        # club_location
-        club_location = driver.find_element(by=By.XPATH, value='//div[@class="club-meta"]//div[@class="location"]').text
-        club_location = re.sub(pattern=rf'^{club_activity_type}(.*)$', repl=r'\1', string=club_location, flags=0).strip()
+    leaderboards.append((week_start - timedelta(days=7), parse_club_leaderboard(html=driver.page_source)))
 
-        # Get current week Strava Club Leaderboard
-        try:
-            driver.find_element(by=By.XPATH, value='//div[@class="leaderboard"]//h4[@class="empty-results"]').text
+    club = leaderboards[0][1]
 
-            club_leaderboard_import_df = pd.DataFrame(data=None, index=None, dtype='str')
+    rows = [
+        row | {'leaderboard_date_start': leaderboard_date_start, 'leaderboard_date_end': leaderboard_date_start + relativedelta.relativedelta(weekday=relativedelta.SU(+1))}
+        for leaderboard_date_start, leaderboard in leaderboards
+        for row in leaderboard['rows']
+    ]
 
-        except NoSuchElementException:
-            leaderboard_html = driver.find_element(by=By.XPATH, value='//table[@class="dense striped sortable"]').get_attribute(name='outerHTML')
+    if not rows:
+        return pd.DataFrame(data=None, index=None, dtype='str')
 
-            leaderboard_df = pd.read_html(io=StringIO(leaderboard_html), flavor='lxml', encoding='utf-8')
+    club_leaderboard_df = pd.DataFrame(data=rows, index=None, dtype=None)
 
-            if not leaderboard_df[0].empty:
-                for d in leaderboard_df:
-                    # leaderboard_date_start
-                    d['leaderboard_date_start'] = pd.Timestamp.now(tz=timezone).replace(tzinfo=None).floor(freq='d').to_pydatetime() + relativedelta.relativedelta(weekday=relativedelta.MO(-1))
+    club_leaderboard_df = (
+        # Leaderboard table columns dtypes (e.g. rank, activities count)
+        infer_numeric_columns(df=club_leaderboard_df, columns=[column for column in club_leaderboard_df.columns if column not in ['athlete_id', 'leaderboard_date_start', 'leaderboard_date_end']])
+        # Create 'club_id' column
+        .assign(club_id=club_id)
+        # Create 'club_name' column
+        .assign(club_name=club['club_name'])
+        # Create 'club_activity_type' column
+        .assign(club_activity_type=club['club_activity_type'])
+        # Create 'club_location' column
+        .assign(club_location=club['club_location'])
+    )
 
-                    # leaderboard_date_end
-                    d['leaderboard_date_end'] = (
-                        pd.Timestamp.now(tz=timezone).replace(tzinfo=None).floor(freq='d').to_pydatetime()
-                        + relativedelta.relativedelta(weekday=relativedelta.MO(-1))
-                        + relativedelta.relativedelta(weekday=relativedelta.SU(+1))
-                    )
+    # Rename columns
+    club_leaderboard_df = clean_names(club_leaderboard_df)
 
-                    # athlete_id
-                    d['athlete_id'] = lh.fromstring(html=leaderboard_html).xpath('.//tr//td//div//a//@href')
-                    d['athlete_id'] = d['athlete_id'].str.extract(pat=r'/athletes/([0-9]+)', flags=0, expand=True)
+    if club['club_activity_type'] == 'Cycling':
+        club_leaderboard_df = club_leaderboard_df.rename(columns={'rides': 'activities', 'longest': 'distance_longest', 'avg_speed': 'average_speed'})
 
-                club_leaderboard_import_df = d
+    if club['club_activity_type'] == 'Running':
+        club_leaderboard_df = club_leaderboard_df.rename(columns={'runs': 'activities', 'avg_pace': 'pace'})
 
-                # Remove objects
-                del leaderboard_df
+    if club['club_activity_type'] == 'Run/Walk/Hike':
+        pass
 
-            else:
-                club_leaderboard_import_df = pd.DataFrame(data=None, index=None, dtype='str')
+    # Return objects
+    return club_leaderboard_df
 
-        # Get last week Strava Club Leaderboard
-        driver.find_element(by=By.XPATH, value='//span[@class="button last-week"]').click()
 
-        try:
-            driver.find_element(by=By.XPATH, value='//div[@class="leaderboard"]//h4[@class="empty-results"]').text
+def strava_club_leaderboard(
+    *,
+    strava_login: str,
+    strava_password: str,
+    club_ids: list[str],
+    filter_date_min: str,
+    filter_date_max: str,
+    timezone: str = 'UTC',
+    workers: int = 1,
+    rate_limiter: AdaptiveRateLimiter | None = None,
+    session: StravaSession | None = None,
+) -> pd.DataFrame:
+    """
+    Scraps and imports leaderboard of one or multiple Strava Club(s) to a dataset.
 
-            club_leaderboard_import_df = pd.DataFrame(data=None, index=None, dtype='str')
+    workers: number of WebDriver sessions (sharing the same Strava login) scraping clubs in parallel.
 
-        except NoSuchElementException:
-            leaderboard_html = driver.find_element(by=By.XPATH, value='//table[@class="dense striped sortable"]').get_attribute(name='outerHTML')
+    moving_time: seconds
+    distance, distance_longest, elevation_gain: meters
+    average_speed: meters/second
+    """
+    # Settings and variables
+    filter_date_min = parser.parse(filter_date_min)
+    filter_date_max = parser.parse(filter_date_max)
 
-            leaderboard_df = pd.read_html(io=StringIO(leaderboard_html), flavor='lxml', encoding='utf-8')
+    if rate_limiter is None:
+        rate_limiter = strava_rate_limiter
+        rate_limiter.scale_to_workers(workers=max(1, min(workers, len(club_ids))))
 
-            if not leaderboard_df[0].empty:
-                for d in leaderboard_df:
-                    # leaderboard_date_start
-                    d['leaderboard_date_start'] = pd.Timestamp.now(tz=timezone).replace(tzinfo=None).floor(freq='d').to_pydatetime() + relativedelta.relativedelta(weekday=relativedelta.MO(-2))
+    if session is None:
+        session = strava_session
 
-                    # leaderboard_date_end
-                    d['leaderboard_date_end'] = (
-                        pd.Timestamp.now(tz=timezone).replace(tzinfo=None).floor(freq='d').to_pydatetime()
-                        + relativedelta.relativedelta(weekday=relativedelta.MO(-2))
-                        + relativedelta.relativedelta(weekday=relativedelta.SU(+1))
-                    )
+    # Strava login
+    strava_authentication(strava_login=strava_login, strava_password=strava_password, session=session)
 
-                    # athlete_id
-                    d['athlete_id'] = lh.fromstring(html=leaderboard_html).xpath('.//tr//td//div//a//@href')
-                    d['athlete_id'] = d['athlete_id'].str.extract(pat=r'/athletes/([0-9]+)', flags=0, expand=True)
+    # WebDriver sessions pool sharing the login cookies, each scraping one club at a time
+    drivers = strava_webdriver_pool(session=session, workers=max(1, min(workers, len(club_ids))))
+    drivers_available = queue.Queue()
 
-                    # Remove objects
-                    del leaderboard_df
+    for driver in drivers:
+        drivers_available.put(driver)
 
-            else:
-                club_leaderboard_import_df = pd.DataFrame(data=None, index=None, dtype='str')
-
-            # Concatenate DataFrames
-            club_leaderboard_import_df = pd.concat(objs=[club_leaderboard_import_df, d], axis=0, ignore_index=True, sort=False)
-
-            club_leaderboard_import_df = (
-                club_leaderboard_import_df
-                # Create 'club_id' column
-                .assign(club_id=lambda row: club_id)
-                # Create 'club_name' column
-                .assign(club_name=lambda row: club_name)
-                # Create 'club_activity_type' column
-                .assign(club_activity_type=lambda row: club_activity_type)
-                # Create 'club_location' column
-                .assign(club_location=lambda row: club_location)
-            )
+    def club_leaderboard(club_id: str) -> pd.DataFrame:
+        driver = drivers_available.get()
 
-            # Rename columns
-            club_leaderboard_import_df = clean_names(club_leaderboard_import_df)
+        try:
+            return strava_club_leaderboard_weeks(driver=driver, club_id=club_id, timezone=timezone, rate_limiter=rate_limiter)
 
-            if club_activity_type == 'Cycling':
-                club_leaderboard_import_df = club_leaderboard_import_df.rename(columns={'rides': 'activities', 'longest': 'distance_longest', 'avg_speed': 'average_speed'})
+        finally:
+            drivers_available.put(driver)
 
-            if club_activity_type == 'Running':
-                club_leaderboard_import_df = club_leaderboard_import_df.rename(columns={'runs': 'activities', 'avg_pace': 'pace'})
+    try:
+        with ThreadPoolExecutor(max_workers=len(drivers), thread_name_prefix='strava-club-leaderboard') as executor:
+            club_leaderboard_dfs = list(executor.map(club_leaderboard, club_ids))
 
-            if club_activity_type == 'Run/Walk/Hike':
-                pass
+    finally:
+        strava_webdriver_pool_quit(session=session, drivers=drivers)
 
-            # Concatenate DataFrames
-            club_leaderboard_df = pd.concat(objs=[club_leaderboard_df, club_leaderboard_import_df], axis=0, ignore_index=True, sort=False)
+    # Concatenate DataFrames (once, in the order of club_ids)
+    club_leaderboard_df = pd.concat(objs=[pd.DataFrame(data=None, index=None, dtype='str'), *club_leaderboard_dfs], axis=0, ignore_index=True, sort=False)
 
     club_leaderboard_df = club_leaderboard_df.rename(columns={'athlete': 'athlete_name', 'time': 'moving_time', 'elev_gain': 'elevation_gain'})
 
@@ -905,41 +1227,25 @@ def strava_club_leaderboard(*, strava_login: str, strava_password: str, club_ids
 
     # Change dtypes
 
-    # average_speed
+    # average_speed: km/h to m/s
     if 'average_speed' in club_leaderboard_df.columns:
-        club_leaderboard_df['average_speed'] = club_leaderboard_df['average_speed'].replace(to_replace=r'km/h$', value=r'', regex=True)
-        club_leaderboard_df['average_speed'] = club_leaderboard_df['average_speed'].astype(dtype='float')
-        club_leaderboard_df['average_speed'] = club_leaderboard_df['average_speed'] / 3.6
+        club_leaderboard_df['average_speed'] = units_to_float(series=club_leaderboard_df['average_speed'], unit='km/h', factor=1 / 3.6)
 
-    # distance
+    # distance: km to m
     if 'distance' in club_leaderboard_df.columns:
-        club_leaderboard_df['distance'] = club_leaderboard_df['distance'].replace(to_replace=r'^--$', value=r'0 km', regex=True)
-        club_leaderboard_df['distance'] = club_leaderboard_df['distance'].replace(to_replace=r',', value=r'', regex=True)
-        club_leaderboard_df['distance'] = club_leaderboard_df['distance'].replace(to_replace=r' km$', value=r'', regex=True)
-        club_leaderboard_df['distance'] = club_leaderboard_df['distance'].astype(dtype='float')
-        club_leaderboard_df['distance'] = club_leaderboard_df['distance'] * 1000
+        club_leaderboard_df['distance'] = units_to_float(series=club_leaderboard_df['distance'], unit='km', factor=1000, placeholder_value=0)
 
-    # distance_longest
+    # distance_longest: km to m
     if 'distance_longest' in club_leaderboard_df.columns:
-        club_leaderboard_df['distance_longest'] = club_leaderboard_df['distance_longest'].replace(to_replace=r',', value=r'', regex=True)
-        club_leaderboard_df['distance_longest'] = club_leaderboard_df['distance_longest'].replace(to_replace=r' km$', value=r'', regex=True)
-        club_leaderboard_df['distance_longest'] = club_leaderboard_df['distance_longest'].astype(dtype='float')
-        club_leaderboard_df['distance_longest'] = club_leaderboard_df['distance_longest'] * 1000
+        club_leaderboard_df['distance_longest'] = units_to_float(series=club_leaderboard_df['distance_longest'], unit='km', factor=1000)
 
     # elevation_gain
     if 'elevation_gain' in club_leaderboard_df.columns:
-        club_leaderboard_df['elevation_gain'] = club_leaderboard_df['elevation_gain'].replace(to_replace=r'^--$', value=r'0 m', regex=True)
-        club_leaderboard_df['elevation_gain'] = club_leaderboard_df['elevation_gain'].replace(to_replace=r',', value=r'', regex=True)
-        club_leaderboard_df['elevation_gain'] = club_leaderboard_df['elevation_gain'].replace(to_replace=r' m$', value=r'', regex=True)
-        club_leaderboard_df['elevation_gain'] = club_leaderboard_df['elevation_gain'].astype(dtype='float')
+        club_leaderboard_df['elevation_gain'] = units_to_float(series=club_leaderboard_df['elevation_gain'], unit='m', placeholder_value=0)
 
-    # moving_time: '%H:%M' to seconds
+    # moving_time: '1h 23m' to seconds
     if 'moving_time' in club_leaderboard_df.columns:
-        club_leaderboard_df['moving_time'] = club_leaderboard_df['moving_time'].fillna(value='0m', axis=0)
-        club_leaderboard_df['moving_time'] = club_leaderboard_df['moving_time'].replace(to_replace=r'^([0-9]+m)$', value=r'00:\1', regex=True)
-        club_leaderboard_df['moving_time'] = club_leaderboard_df['moving_time'].replace(to_replace=r'h ', value=r':', regex=True)
-        club_leaderboard_df['moving_time'] = club_leaderboard_df['moving_time'].replace(to_replace=r'm$', value=r'', regex=True)
-        club_leaderboard_df['moving_time'] = club_leaderboard_df['moving_time'].apply(lambda row: float(row.split(sep=':')[0]) * 3600 + float(row.split(sep=':')[1]) * 60)
+        club_leaderboard_df['moving_time'] = durations_to_seconds(series=club_leaderboard_df['moving_time'].fillna(value='0m', axis=0))
 
     # pace
     """
@@ -1074,11 +1380,8 @@ def strava_club_leaderboard_manual(
 
 
 def google_api_credentials() -> Resource:
-    # Credentials settings
-    credentials = Credentials.from_service_account_file(filename=google_api_key, scopes=['https://www.googleapis.com/auth/spreadsheets'])
-
-    # service
-    service = build(serviceName='sheets', version='v4', credentials=credentials)
+    # Google Sheets API service (credentials, discovery document and connection reused by all calls of the thread)
+    service = google_sheets_service(key_file=google_api_key)
 
     # Return objects
     return service
@@ -1089,171 +1392,53 @@ def read_google_sheets(*, sheet_id: str, sheet_name: str) -> pd.DataFrame:
     service = google_api_credentials()
 
     # Import DataFrame stored in Google Sheets
-    result = service.spreadsheets().values().get(spreadsheetId=sheet_id, range=sheet_name).execute()
-    result = result.get('values', [])
-    df_import = pd.DataFrame(data=result[1:], index=None, columns=result[0], dtype='str')
-
-    if not df_import.empty:
-        # Change dtypes
-        df_import = df_import.replace(to_replace=r'^\s*$', value=None, regex=True)
-
-        # Change dtypes
-        if 'activity_date' in df_import.columns:
-            df_import['activity_date'] = df_import['activity_date'].apply(parser.parse)
-
-        if 'elapsed_time' in df_import.columns:
-            df_import = df_import.astype(dtype={'elapsed_time': 'float'})
-
-        if 'moving_time' in df_import.columns:
-            df_import = df_import.astype(dtype={'moving_time': 'float'})
-
-        if 'distance' in df_import.columns:
-            df_import = df_import.astype(dtype={'distance': 'float'})
-
-        if 'max_speed' in df_import.columns:
-            df_import = df_import.astype(dtype={'max_speed': 'float'})
-
-        if 'average_speed' in df_import.columns:
-            df_import = df_import.astype(dtype={'average_speed': 'float'})
-
-        if 'relative_effort' in df_import.columns:
-            df_import = df_import.astype(dtype={'relative_effort': 'float'})
+    values = google_sheets_values(service=service, sheet_id=sheet_id, sheet_name=sheet_name)
 
-        if 'tough_relative_effort' in df_import.columns:
-            df_import = df_import.astype(dtype={'tough_relative_effort': 'float'})
-
-        if 'historic_relative_effort' in df_import.columns:
-            df_import = df_import.astype(dtype={'historic_relative_effort': 'float'})
-
-        if 'massive_relative_effort' in df_import.columns:
-            df_import = df_import.astype(dtype={'massive_relative_effort': 'float'})
-
-        if 'steps' in df_import.columns:
-            df_import = df_import.astype(dtype={'steps': 'float'})
-
-        if 'elevation_gain' in df_import.columns:
-            df_import = df_import.astype(dtype={'elevation_gain': 'float'})
-
-        if 'max_heart_rate' in df_import.columns:
-            df_import = df_import.astype(dtype={'max_heart_rate': 'float'})
-
-        if 'average_heart_rate' in df_import.columns:
-            df_import = df_import.astype(dtype={'average_heart_rate': 'float'})
-
-        if 'max_cadence' in df_import.columns:
-            df_import = df_import.astype(dtype={'max_cadence': 'float'})
-
-        if 'average_cadence' in df_import.columns:
-            df_import = df_import.astype(dtype={'average_cadence': 'float'})
-
-        if 'max_watts' in df_import.columns:
-            df_import = df_import.astype(dtype={'max_watts': 'float'})
+    # Return objects
+    return google_sheets_df(values=values)
 
-        if 'average_watts' in df_import.columns:
-            df_import = df_import.astype(dtype={'average_watts': 'float'})
 
-        if 'calories' in df_import.columns:
-            df_import = df_import.astype(dtype={'calories': 'float'})
+def strava_club_to_google_sheets(
+    *,
+    df: pd.DataFrame,
+    club_members_df: pd.DataFrame,
+    sheet_id: str,
+    sheet_name: str,
+    sink: Sink | None = None,
+    publisher: GoogleSheetsPublisher | None = None,
+) -> None:
+    # Google API Credentials
+    service = google_api_credentials()
 
-        if 'average_temperature' in df_import.columns:
-            df_import = df_import.astype(dtype={'average_temperature': 'float'})
+    # Sheet writes publisher (a publisher passed by the caller is flushed by the caller, together with the writes of other sheets)
+    publisher_flush = publisher is None
 
-        if 'activity_kudos' in df_import.columns:
-            df_import = df_import.astype(dtype={'activity_kudos': 'int'})
+    if publisher is None:
+        publisher = GoogleSheetsPublisher(service=service, sheet_id=sheet_id, workers=4, service_factory=google_api_credentials)
 
-        if 'join_date' in df_import.columns:
-            df_import['join_date'] = df_import['join_date'].apply(parser.parse)
+    if publisher.sheet_id != sheet_id:
+        raise ValueError(f'publisher writes to spreadsheet {publisher.sheet_id!r}, not {sheet_id!r}')
 
-        if 'leaderboard_date_start' in df_import.columns:
-            df_import['leaderboard_date_start'] = df_import['leaderboard_date_start'].apply(parser.parse)
+    # Import DataFrame stored in Google Sheets (the values are kept to only write the rows that changed)
+    values = google_sheets_values(service=service, sheet_id=sheet_id, sheet_name=sheet_name)
 
-        if 'leaderboard_date_end' in df_import.columns:
-            df_import['leaderboard_date_end'] = df_import['leaderboard_date_end'].apply(parser.parse)
+    if sink is not None:
+        # Merge into the local store, the sheet publishing the stored dataset
+        dataset = club_dataset(columns=df.columns)
 
-        if 'rank' in df_import.columns:
-            df_import = df_import.astype(dtype={'rank': 'int'})
+        # club_leaderboard: member columns are not stored, they are refreshed from the club members dataset when published
+        member_columns = LEADERBOARD_MEMBER_COLUMNS if dataset == 'leaderboard' else []
 
-        if 'activities' in df_import.columns:
-            df_import = df_import.astype(dtype={'activities': 'int'})
+        # First publish from the local store: seed it with the rows stored in Google Sheets
+        if sink.is_empty(dataset=dataset) and len(values) > 1:
+            sink.append(dataset=dataset, df=google_sheets_df(values=values).drop(columns=member_columns, errors='ignore'))
 
-        if 'distance_longest' in df_import.columns:
-            df_import = df_import.astype(dtype={'distance_longest': 'float'})
+        sink.upsert(dataset=dataset, df=df)
+        df_updated = sink.read(dataset=dataset).drop(columns=member_columns, errors='ignore')
 
     else:
-        # Create empty DataFrame
-        df_import = pd.DataFrame(data=None, index=None, columns=None, dtype=None)
-
-    # Return objects
-    return df_import
-
-
-def strava_club_to_google_sheets(*, df: pd.DataFrame, club_members_df: pd.DataFrame, sheet_id: str, sheet_name: str) -> None:
-    # Google API Credentials
-    service = google_api_credentials()
-
-    df_import = read_google_sheets(sheet_id=sheet_id, sheet_name=sheet_name)
-
-    if not df_import.empty:
-        # club_activities
-        if 'activity_id' in df.columns:
-            # Delete Google Sheets DataFrame rows present in club_activities, completely overwriting it
-            df_import = (
-                df_import
-                # Outer join 'df'
-                .merge(right=df.filter(items=['club_id', 'activity_id']).drop_duplicates(subset=None, keep='first', ignore_index=True), how='outer', on=['club_id', 'activity_id'], indicator=True)
-                # Filter rows
-                .query(expr='_merge == "left_only"')
-                # Remove columns
-                .drop(columns=['_merge'], errors='ignore')
-            )
-
-        # club_members
-        if 'join_date' in df.columns:
-            # Keep Google Sheets DataFrame rows present in club_members, increment with new club members
-            df = (
-                df
-                # Outer join 'df_import'
-                .merge(
-                    right=df_import.filter(
-                        items=['club_id', 'athlete_id'],
-                    ).drop_duplicates(subset=None, keep='first', ignore_index=True),
-                    how='outer',
-                    on=['club_id', 'athlete_id'],
-                    indicator=True,
-                )
-                # Filter rows
-                .query(expr='_merge == "left_only"')
-                # Remove columns
-                .drop(columns=['_merge'], errors='ignore')
-            )
-
-        # club_leaderboard
-        if 'leaderboard_week' in df.columns:
-            # Delete Google Sheets DataFrame rows present in club_leaderboard, completely overwriting it
-            df_import = (
-                df_import
-                # Remove columns
-                .drop(columns=['athlete_location', 'athlete_location_country_code', 'athlete_location_country', 'athlete_team', 'athlete_picture'], errors='ignore')
-                # Outer join 'df'
-                .merge(
-                    right=df.filter(
-                        items=['club_id', 'leaderboard_week'],
-                    ).drop_duplicates(subset=None, keep='first', ignore_index=True),
-                    how='outer',
-                    on=['club_id', 'leaderboard_week'],
-                    indicator=True,
-                )
-                # Filter rows
-                .query(expr='_merge == "left_only"')
-                # Remove columns
-                .drop(columns=['_merge'], errors='ignore')
-            )
-
-    else:
-        pass
-
-    # Concatenate DataFrames
-    df_updated = pd.concat(objs=[df, df_import], axis=0, ignore_index=True, sort=False)
+        # Merge into the dataset stored in Google Sheets
+        df_updated = merge_club_datasets(df=df, df_import=google_sheets_df(values=values))
 
     # club_activities transform
     if 'activity_id' in df.columns:
@@ -1428,31 +1613,31 @@ def strava_club_to_google_sheets(*, df: pd.DataFrame, club_members_df: pd.DataFr
     # Change dtypes
     df_updated = df_updated.fillna(value='', axis=0)
 
-    # DataFrame to list
-    data = [df_updated.columns.values.tolist()]
-    data.extend(df_updated.values.tolist())
+    # Update DataFrame stored in Google Sheets (only the new and changed rows, matched by their natural keys, are written)
+    google_sheets_sync(publisher=publisher, sheet_name=sheet_name, values=values, df=df_updated, keys=DATASET_ROW_KEYS[club_dataset(columns=df.columns)])
 
-    # Clear sheet contents
-    service.spreadsheets().values().clear(spreadsheetId=sheet_id, range=sheet_name, body={}).execute()
-
-    # Upload/Overwrite DataFrame stored in Google Sheets
-    service.spreadsheets().values().update(spreadsheetId=sheet_id, range=sheet_name, valueInputOption='USER_ENTERED', body={'values': data}).execute()
+    if publisher_flush:
+        publisher.flush()
 
     # Return objects
     return df_updated
 
 
-def execution_time_to_google_sheets(*, sheet_id: str, sheet_name: str, timezone: str = 'UTC') -> None:
-    # Google API Credentials
-    service = google_api_credentials()
+def execution_time_to_google_sheets(*, sheet_id: str, sheet_name: str, timezone: str = 'UTC', publisher: GoogleSheetsPublisher | None = None) -> None:
+    # Sheet writes publisher (a publisher passed by the caller is flushed by the caller, together with the writes of other sheets)
+    publisher_flush = publisher is None
+
+    if publisher is None:
+        publisher = GoogleSheetsPublisher(service=google_api_credentials(), sheet_id=sheet_id)
+
+    if publisher.sheet_id != sheet_id:
+        raise ValueError(f'publisher writes to spreadsheet {publisher.sheet_id!r}, not {sheet_id!r}')
 
     # Clear sheet contents
-    service.spreadsheets().values().clear(spreadsheetId=sheet_id, range=sheet_name, body={}).execute()
+    publisher.clear(sheet_name=sheet_name)
 
     # Upload/Overwrite DataFrame stored in Google Sheets
-    service.spreadsheets().values().update(
-        spreadsheetId=sheet_id,
-        range=sheet_name,
-        valueInputOption='USER_ENTERED',
-        body={'values': [['last_execution'], [str(pd.Timestamp.now(tz=timezone).replace(microsecond=0, tzinfo=None))]]},
-    ).execute()
+    publisher.update(sheet_name=sheet_name, start_row=1, values=[['last_execution'], [str(pd.Timestamp.now(tz=timezone).replace(microsecond=0, tzinfo=None))]])
+
+    if publisher_flush:
+        publisher.flush()
@@ -0,0 +1,98 @@
+"""About: Vectorized normalization of Strava durations and values with units."""
+
+# Import packages
+
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+
+except ImportError:
+    pa = None
+
+
+# Settings and variables
+
+# Strava durations: '1:23:45', '23:45' (activities), '45s', '1h 23m', '23m' (leaderboard)
+DURATION_PATTERN = re.compile(
+    pattern=r'^\s*(?:(?:(?P<clock_hours>[0-9]+):)?(?P<clock_minutes>[0-9]+):(?P<clock_seconds>[0-9]+)|(?:(?P<hours>[0-9]+)h)?\s*(?:(?P<minutes>[0-9]+)m)?\s*(?:(?P<seconds>[0-9]+)s)?)\s*$',
+    flags=0,
+)
+
+
+# Functions
+
+
+def duration_to_seconds(*, duration: str) -> int | None:
+    """Get seconds from a Strava duration (e.g. '1:23:45', '23:45', '45s', '1h 23m'), None if it is not a duration."""
+    match = DURATION_PATTERN.match(duration)
+
+    # Not matching the pattern (or blank)
+    if match is None or not any(match.groups()):
+        return None
+
+    groups = match.groupdict(default='0')
+
+    # Return objects
+    return (int(groups['clock_hours']) + int(groups['hours'])) * 3600 + (int(groups['clock_minutes']) + int(groups['minutes'])) * 60 + int(groups['clock_seconds']) + int(groups['seconds'])
+
+
+def durations_to_seconds(*, series: pd.Series) -> pd.Series:
+    """Vectorized duration_to_seconds: get seconds from a Series of Strava durations, numbers being kept as seconds (missing or invalid durations are NaN). The pattern is matched by pyarrow (in C++) if it is installed."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(dtype='float')
+
+    text = series.astype(dtype='str')
+
+    if pa is not None:
+        text = text.astype(dtype=pd.ArrowDtype(pa.string()))
+
+    parts = text.str.extract(pat=DURATION_PATTERN.pattern, expand=True)
+
+    # Groups not matched (empty with pyarrow)
+    parts = parts.mask(cond=parts == '')
+
+    # Rows not matching the pattern (or blank)
+    invalid = parts.isna().all(axis=1) | series.isna()
+
+    parts = parts.astype(dtype='float').fillna(value=0)
+
+    seconds = (parts['clock_hours'] + parts['hours']) * 3600 + (parts['clock_minutes'] + parts['minutes']) * 60 + parts['clock_seconds'] + parts['seconds']
+    seconds = seconds.mask(cond=invalid)
+
+    # Numbers (e.g. durations already converted to seconds)
+    if invalid.any():
+        seconds[invalid] = pd.to_numeric(arg=series[invalid], errors='coerce')
+
+    # Return objects
+    return seconds
+
+
+def units_to_float(*, series: pd.Series, unit: str, factor: float = 1.0, placeholder_value: float | None = None) -> pd.Series:
+    """Convert a Series of Strava values with a unit (e.g. '1,234.5 km') to floats multiplied by factor. Strava's '--' placeholder is converted to placeholder_value."""
+    values = series.astype(dtype='str').str.replace(pat=rf',|\s+|{re.escape(unit)}$', repl='', regex=True)
+    values = values.mask(cond=values == '--', other=None if placeholder_value is None else str(placeholder_value))
+    values = values.mask(cond=series.isna())
+    values = values.astype(dtype='float') * factor
+
+    # Return objects
+    return values
+
+
+def infer_numeric_columns(*, df: pd.DataFrame, columns: list[str] | None = None) -> pd.DataFrame:
+    """Convert the text columns (among columns, default: all columns) whose values are all numbers (e.g. rank, activities count) to numeric dtypes, as pandas.read_html does."""
+    df = df.copy()
+
+    for column in df.columns if columns is None else columns:
+        if not pd.api.types.is_string_dtype(df[column]):
+            continue
+
+        values = pd.to_numeric(df[column], errors='coerce')
+
+        if values.notna().sum() == df[column].notna().sum():
+            df[column] = values
+
+    # Return objects
+    return df
@@ -0,0 +1,57 @@
+"""About: Tests of the country resolution of athlete locations (offline gazetteer, geocode cache and network geocoder)."""
+
+# Import packages
+
+from types import SimpleNamespace
+
+from geopy.exc import GeocoderTimedOut
+from geopy.geocoders import Nominatim
+import pytest
+
+from strava_club_scraper.cache_utils import GeocodeCache
+from strava_club_scraper.geocode_utils import LocationCountryResolver, resolve_country_offline
+
+
+# Functions
+
+
+@pytest.mark.parametrize(
+    ('location', 'country_code'),
+    [
+        ('Munich, Bavaria, Germany', 'de'),
+        ('Moscow, Russia', 'ru'),
+        ('Seattle, WA, USA', 'us'),
+        ('Perth, WA', None),
+        ('Lahore, Punjab', None),
+        ('Hasselt, Limburg', None),
+        ('Victoria', None),
+    ],
+)
+def test_resolve_country_offline_leaves_ambiguous_regions_to_the_geocoder(location: str, country_code: str | None) -> None:
+    country = resolve_country_offline(location=location)
+
+    assert (country and country['country_code']) == country_code
+
+
+def test_resolve_does_not_cache_failed_geocoding(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    results = [GeocoderTimedOut('timed out'), SimpleNamespace(raw={'address': {'country_code': 'au', 'country': 'Australia'}})]
+
+    def geocode(self: Nominatim, *args: object, **kwargs: object) -> SimpleNamespace:
+        result = results.pop(0)
+
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+    monkeypatch.setattr(Nominatim, 'geocode', geocode)
+
+    geocode_cache = GeocodeCache(path=str(tmp_path / 'geocodes.sqlite'))
+    resolver = LocationCountryResolver(geocode_cache=geocode_cache, min_delay_seconds=0)
+    resolver.geocode.max_retries = 0
+
+    assert resolver.resolve(location='Perth, WA') == {'country_code': None, 'country': None}
+    assert geocode_cache.get(location='perth, wa') is None
+
+    assert resolver.resolve(location='Perth, WA') == {'country_code': 'au', 'country': 'Australia'}
+    assert geocode_cache.get(location='perth, wa') == {'country_code': 'au', 'country': 'Australia'}
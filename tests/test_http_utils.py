@@ -0,0 +1,74 @@
+"""About: Tests of the browserless HTTP page fetcher against a local HTTP server."""
+
+# Import packages
+
+from collections.abc import Iterator
+import http.client
+import http.server
+import threading
+import time
+
+import pytest
+
+from strava_club_scraper.http_utils import HTTP_ERROR_STATUS, HttpPageFetcher
+
+
+# Classes
+
+
+class PageHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive handler answering each path with its own name, '/slow' after a delay longer than the fetcher timeout and '/broken' with a malformed status line."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        if self.path == '/slow':
+            time.sleep(1)
+
+        if self.path == '/broken':
+            self.wfile.write(b'NOT HTTP\r\n\r\n')
+            self.close_connection = True
+            return
+
+        body = self.path.encode()
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+# Functions
+
+
+@pytest.fixture
+def fetcher(monkeypatch: pytest.MonkeyPatch) -> Iterator[HttpPageFetcher]:
+    """HttpPageFetcher of a local HTTP server (plain HTTP connections), with a short timeout."""
+    server = http.server.ThreadingHTTPServer(server_address=('127.0.0.1', 0), RequestHandlerClass=PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(http.client, 'HTTPSConnection', http.client.HTTPConnection)
+
+    with HttpPageFetcher(host=f'127.0.0.1:{server.server_port}', headers={}, concurrency=2, timeout=0.2) as fetcher:
+        yield fetcher
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_pages_keeps_the_order_of_urls(fetcher: HttpPageFetcher) -> None:
+    urls = [f'http://{fetcher.host}/page{index}' for index in range(6)]
+
+    assert fetcher.get_pages(urls=urls) == [(200, f'/page{index}') for index in range(6)]
+
+
+def test_get_pages_returns_an_error_status_for_failed_requests(fetcher: HttpPageFetcher) -> None:
+    pages = fetcher.get_pages(urls=[f'http://{fetcher.host}/slow', f'http://{fetcher.host}/broken', f'http://{fetcher.host}/page'])
+
+    assert pages == [(HTTP_ERROR_STATUS, ''), (HTTP_ERROR_STATUS, ''), (200, '/page')]
+
+    # The connections of the failed requests are reopened by their next request
+    assert fetcher.get_pages(urls=[f'http://{fetcher.host}/page{index}' for index in range(4)]) == [(200, f'/page{index}') for index in range(4)]
@@ -0,0 +1,34 @@
+"""About: Tests of the adaptive token bucket rate limiter."""
+
+# Import packages
+
+from strava_club_scraper.rate_limit_utils import AdaptiveRateLimiter
+
+
+# Functions
+
+
+def test_scale_to_workers_scales_from_the_initial_values() -> None:
+    rate_limiter = AdaptiveRateLimiter(rate=1.0, burst=4)
+
+    rate_limiter.scale_to_workers(workers=8)
+    assert (rate_limiter.rate, rate_limiter.burst) == (8.0, 32)
+
+    # A later single worker run does not inherit the scale of the previous run
+    rate_limiter.scale_to_workers(workers=1)
+    assert (rate_limiter.rate, rate_limiter.burst) == (1.0, 4)
+    assert rate_limiter.tokens <= 4
+
+
+def test_scale_to_workers_never_raises_a_rate_decreased_by_too_many_requests() -> None:
+    rate_limiter = AdaptiveRateLimiter(rate=1.0, burst=4, backoff_base=0.0)
+
+    rate_limiter.scale_to_workers(workers=8)
+    rate_limiter.record_rate_limited(elapsed=0.1)
+    assert rate_limiter.rate == 4.0
+
+    rate_limiter.scale_to_workers(workers=1)
+    assert rate_limiter.rate == 1.0
+
+    rate_limiter.scale_to_workers(workers=8)
+    assert (rate_limiter.rate, rate_limiter.burst) == (1.0, 32)
@@ -0,0 +1,266 @@
+"""About: Tests of the differential Google Sheets sync (sheet_diff, google_sheets_sync and GoogleSheetsPublisher) against an in-memory fake of the Sheets API."""
+
+# Import packages
+
+import builtins
+import json
+import re
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from strava_club_scraper.rate_limit_utils import AdaptiveRateLimiter
+from strava_club_scraper.sheets_utils import GoogleSheetsPublisher, google_sheets_df, google_sheets_sync, google_sheets_values, sheet_cell
+
+
+# Settings and variables
+
+HEADER = ['club_id', 'activity_id', 'activity_name', 'distance']
+
+
+# Classes
+
+
+class FakeRequest:
+    """Request of the fake Sheets API, executed on execute()."""
+
+    def __init__(self, *, function: Any, body: dict[str, Any] | None = None) -> None:
+        self.function = function
+        self.body = None if body is None else json.dumps(body).encode()
+
+    def execute(self) -> dict[str, Any]:
+        return self.function()
+
+
+class FakeSheetsService:
+    """
+    In-memory fake of the Sheets API resources used by google_sheets_values and GoogleSheetsPublisher (spreadsheets().values().get/batchUpdate/batchClear and spreadsheets().get/batchUpdate).
+
+    Sheets are stored as {row number: cells}; cells entered as numeric strings are stored as numbers (as valueInputOption='USER_ENTERED' does), and values are returned as with valueRenderOption='UNFORMATTED_VALUE' (empty rows between rows included, trailing empty cells trimmed).
+    """
+
+    def __init__(self) -> None:
+        self.sheets = {}
+        self.calls = []
+
+    def spreadsheets(self) -> 'FakeSheetsService':
+        return self
+
+    def values(self) -> 'FakeSheetsService':
+        return self
+
+    def sheet(self, *, sheet_name: str) -> dict[int, list[Any]]:
+        return self.sheets.setdefault(sheet_name, {})
+
+    @staticmethod
+    def parse_range(*, sheet_range: str) -> tuple[str, int | None, int | None]:
+        match = re.match(pattern=r"^'(?P<sheet_name>.*)'(?:!A?(?P<start_row>[0-9]+)(?::(?P<end_row>[0-9]+))?)?$", string=sheet_range)
+
+        # Return objects
+        return match['sheet_name'].replace("''", "'"), match['start_row'] and int(match['start_row']), match['end_row'] and int(match['end_row'])
+
+    @staticmethod
+    def entered(*, value: Any) -> Any:
+        if isinstance(value, str) and value != '':
+            number = sheet_cell(value=value)
+
+            if isinstance(number, float):
+                return int(number) if number.is_integer() else number
+
+        return value
+
+    def write(self, *, sheet_name: str, start_row: int, rows: list[list[Any]]) -> None:
+        sheet = self.sheet(sheet_name=sheet_name)
+
+        for offset, row in enumerate(rows):
+            sheet[start_row + offset] = [self.entered(value=value) for value in row]
+
+    def clear(self, *, sheet_name: str, start_row: int | None, end_row: int | None) -> None:
+        sheet = self.sheet(sheet_name=sheet_name)
+
+        for row in list(sheet):
+            if start_row is None or start_row <= row <= end_row:
+                del sheet[row]
+
+    def get(self, *, spreadsheetId: str, range: str | None = None, fields: str | None = None, **kwargs: Any) -> FakeRequest:
+        # spreadsheets().get: sheet properties
+        if fields is not None:
+            properties = [{'properties': {'sheetId': sheet_id, 'title': sheet_name, 'gridProperties': {'rowCount': 1000, 'columnCount': 26}}} for sheet_id, sheet_name in enumerate(self.sheets)]
+            return FakeRequest(function=lambda: {'sheets': properties})
+
+        sheet = self.sheet(sheet_name=range)
+
+        def values() -> dict[str, Any]:
+            rows = []
+
+            # range: parameter name of the Sheets API
+            for row_number in builtins.range(1, max(sheet, default=0) + 1):
+                row = list(sheet.get(row_number, []))
+
+                while row and row[-1] == '':
+                    row.pop()
+
+                rows.append(row)
+
+            return {'values': rows} if rows else {}
+
+        return FakeRequest(function=values)
+
+    def batchUpdate(self, *, spreadsheetId: str, body: dict[str, Any]) -> FakeRequest:
+        # spreadsheets().batchUpdate (atomic mode): updateCells requests
+        if 'requests' in body:
+            self.calls.append('spreadsheets.batchUpdate')
+            sheet_names = list(self.sheets)
+
+            def update_cells() -> dict[str, Any]:
+                for request in body['requests']:
+                    update = request.get('updateCells')
+
+                    if update is None:
+                        continue
+
+                    if 'range' in update:
+                        grid_range = update['range']
+                        start_row = grid_range['startRowIndex'] + 1 if 'startRowIndex' in grid_range else None
+                        self.clear(sheet_name=sheet_names[grid_range['sheetId']], start_row=start_row, end_row=grid_range.get('endRowIndex'))
+
+                    else:
+                        rows = [[next(iter(cell['userEnteredValue'].values())) if cell else '' for cell in row['values']] for row in update['rows']]
+                        self.write(sheet_name=sheet_names[update['start']['sheetId']], start_row=update['start']['rowIndex'] + 1, rows=rows)
+
+                return {}
+
+            return FakeRequest(function=update_cells, body=body)
+
+        # spreadsheets().values().batchUpdate
+        self.calls.append('values.batchUpdate')
+
+        def update_values() -> dict[str, Any]:
+            for data in body['data']:
+                sheet_name, start_row, _ = self.parse_range(sheet_range=data['range'])
+                self.write(sheet_name=sheet_name, start_row=start_row, rows=data['values'])
+
+            return {}
+
+        return FakeRequest(function=update_values, body=body)
+
+    def batchClear(self, *, spreadsheetId: str, body: dict[str, Any]) -> FakeRequest:
+        self.calls.append('values.batchClear')
+
+        def clear_values() -> dict[str, Any]:
+            for sheet_range in body['ranges']:
+                sheet_name, start_row, end_row = self.parse_range(sheet_range=sheet_range)
+                self.clear(sheet_name=sheet_name, start_row=start_row, end_row=end_row)
+
+            return {}
+
+        return FakeRequest(function=clear_values, body=body)
+
+
+# Functions
+
+
+def activities_df(*, rows: list[tuple[int, int, str, float]], columns: list[str] = HEADER) -> pd.DataFrame:
+    """Club activities DataFrame of (club_id, activity_id, activity_name, distance) rows."""
+    return pd.DataFrame(data=rows, columns=HEADER)[columns]
+
+
+def sync(*, service: FakeSheetsService, df: pd.DataFrame, atomic: bool, keys: list[str] | None = None) -> dict[str, int | bool]:
+    """Sync the 'Activities' sheet of the fake service to df (rows matched by keys, default: club_id and activity_id) and flush the writes, returning the sync report."""
+    publisher = GoogleSheetsPublisher(service=service, sheet_id='sheet', atomic=atomic, chunk_rows=3, rate_limiter=AdaptiveRateLimiter(rate=1e6, burst=10**6, rate_max=1e6))
+
+    values = google_sheets_values(service=service, sheet_id='sheet', sheet_name='Activities')
+    report = google_sheets_sync(publisher=publisher, sheet_name='Activities', values=values, df=df, keys=['club_id', 'activity_id'] if keys is None else keys)
+    publisher.flush()
+
+    # Return objects
+    return report
+
+
+def sheet_rows(*, service: FakeSheetsService) -> list[list[Any]]:
+    """Values of the 'Activities' sheet of the fake service, cells normalized as compared by the sync."""
+    return [[sheet_cell(value=value) for value in row] for row in google_sheets_values(service=service, sheet_id='sheet', sheet_name='Activities')]
+
+
+def expected_rows(*, df: pd.DataFrame) -> list[list[Any]]:
+    """Header and rows of df, cells normalized as compared by the sync."""
+    return [list(df.columns)] + [[sheet_cell(value=value) for value in row] for row in df.itertuples(index=False, name=None)]
+
+
+@pytest.fixture
+def service() -> FakeSheetsService:
+    """Fake Sheets service with an 'Activities' sheet of 6 activities."""
+    service = FakeSheetsService()
+    sync(service=service, df=activities_df(rows=[(1, activity_id, f'Activity {activity_id}', 1000.0 * activity_id) for activity_id in range(1, 7)]), atomic=False)
+
+    # Return objects
+    return service
+
+
+@pytest.mark.parametrize('atomic', [False, True])
+def test_google_sheets_sync_writes_only_changed_rows(service: FakeSheetsService, atomic: bool) -> None:
+    # Activity 2 updated, activity 5 deleted (its row reused by an inserted activity), activities 7 and 8 inserted
+    df = activities_df(
+        rows=[(1, 1, 'Activity 1', 1000.0), (1, 2, 'Renamed', 2000.0), (1, 3, 'Activity 3', 3000.0), (1, 4, 'Activity 4', 4000.0), (1, 6, 'Activity 6', 6000.0), (1, 7, 'Activity 7', 7000.0), (1, 8, 'Activity 8', 8000.0)]
+    )
+
+    report = sync(service=service, df=df, atomic=atomic)
+
+    assert report == {'inserted': 2, 'updated': 1, 'unchanged': 4, 'moved': 0, 'deleted': 1, 'rewritten': False}
+    assert sorted(sheet_rows(service=service)[1:]) == sorted(expected_rows(df=df)[1:])
+
+
+@pytest.mark.parametrize('atomic', [False, True])
+def test_google_sheets_sync_moves_last_rows_up_after_deletions(service: FakeSheetsService, atomic: bool) -> None:
+    # Activities 1 and 3 deleted: the last rows are moved up into their rows, leaving no empty row in between
+    df = activities_df(rows=[(1, activity_id, f'Activity {activity_id}', 1000.0 * activity_id) for activity_id in (2, 4, 5, 6)])
+
+    report = sync(service=service, df=df, atomic=atomic)
+    rows = sheet_rows(service=service)
+
+    assert report == {'inserted': 0, 'updated': 0, 'unchanged': 4, 'moved': 2, 'deleted': 2, 'rewritten': False}
+    assert len(rows) == 5
+    assert all(rows)
+    assert sorted(rows[1:]) == sorted(expected_rows(df=df)[1:])
+
+
+@pytest.mark.parametrize(
+    ('df', 'keys'),
+    [
+        # Header changed (columns reordered)
+        (activities_df(rows=[(1, 1, 'Activity 1', 1000.0), (1, 2, 'Activity 2', 2000.0)], columns=['club_id', 'activity_id', 'distance', 'activity_name']), None),
+        # Duplicated keys
+        (activities_df(rows=[(1, 1, 'Activity 1', 1000.0), (1, 1, 'Activity 1 again', 1000.0)]), None),
+        # Key columns missing from the header
+        (activities_df(rows=[(1, 1, 'Activity 1', 1000.0), (1, 2, 'Activity 2', 2000.0)]), ['club_id', 'athlete_id']),
+    ],
+)
+def test_google_sheets_sync_rewrites_the_sheet_if_rows_cannot_be_matched(service: FakeSheetsService, df: pd.DataFrame, keys: list[str] | None) -> None:
+    report = sync(service=service, df=df, atomic=False, keys=keys)
+
+    assert report == {'inserted': 2, 'updated': 0, 'unchanged': 0, 'moved': 0, 'deleted': 6, 'rewritten': True}
+    assert sheet_rows(service=service) == expected_rows(df=df)
+
+
+def test_google_sheets_sync_sends_nothing_if_unchanged(service: FakeSheetsService) -> None:
+    service.calls.clear()
+
+    report = sync(service=service, df=activities_df(rows=[(1, activity_id, f'Activity {activity_id}', 1000.0 * activity_id) for activity_id in range(1, 7)]), atomic=False)
+
+    assert report['unchanged'] == 6
+    assert service.calls == []
+
+
+def test_google_sheets_df_converts_the_declared_columns_only() -> None:
+    leaderboard_df = google_sheets_df(values=[['club_id', 'leaderboard_week', 'rank', 'distance', 'pace'], ['1', '2023-07-03 to 2023-07-09', 1, 12000, '5:12 /km'], ['1', '2023-07-03 to 2023-07-09', 2, '', '']])
+
+    assert leaderboard_df['rank'].tolist() == [1, 2]
+    assert leaderboard_df['distance'].iloc[0] == 12000.0 and pd.isna(leaderboard_df['distance'].iloc[1])
+
+    # The leaderboard pace is kept as scraped (text)
+    assert leaderboard_df['pace'].iloc[0] == '5:12 /km' and pd.isna(leaderboard_df['pace'].iloc[1])
+
+    activities_df = google_sheets_df(values=[['club_id', 'activity_id', 'commute'], ['1', '10', True], ['1', '11', 'TRUE'], ['1', '12']])
+
+    assert activities_df['commute'].tolist() == [True, None, None]
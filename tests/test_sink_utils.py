@@ -0,0 +1,105 @@
+"""About: Tests of the storage backends (sinks) of the scraped club datasets and of their publishing to Google Sheets."""
+
+# Import packages
+
+import pandas as pd
+import pytest
+
+from strava_club_scraper import strava_club_scraper
+from strava_club_scraper.sink_utils import LEADERBOARD_MEMBER_COLUMNS, ParquetSink, merge_club_datasets
+
+
+pytest.importorskip('pyarrow')
+
+
+# Settings and variables
+
+LEADERBOARD_HEADER = ['club_id', 'club_name', 'leaderboard_week', 'leaderboard_date_start', 'leaderboard_date_end', 'rank', 'athlete_id', 'athlete_name', 'activities', 'distance', *LEADERBOARD_MEMBER_COLUMNS]
+
+
+# Functions
+
+
+def leaderboard_df(*, week: str, date_start: str, date_end: str, athlete_ids: list[str]) -> pd.DataFrame:
+    """Scraped leaderboard of a week (as returned by strava_club_leaderboard, without the member columns)."""
+    return pd.DataFrame(
+        data={
+            'club_id': '1',
+            'club_name': 'Club',
+            'leaderboard_week': week,
+            'leaderboard_date_start': pd.Timestamp(date_start),
+            'leaderboard_date_end': pd.Timestamp(date_end),
+            'rank': range(1, len(athlete_ids) + 1),
+            'athlete_id': athlete_ids,
+            'athlete_name': [f'Athlete {athlete_id}' for athlete_id in athlete_ids],
+            'activities': 1,
+            'distance': 1000.0,
+        },
+    )
+
+
+class Publisher:
+    """Publisher stub (writes captured by the google_sheets_sync stub)."""
+
+    sheet_id = 'sheet'
+
+    def flush(self) -> None:
+        pass
+
+
+@pytest.fixture
+def published(monkeypatch: pytest.MonkeyPatch) -> dict[str, pd.DataFrame]:
+    """Stub the Google Sheets calls of strava_club_to_google_sheets, the sheet storing a leaderboard week with stale member columns; the published DataFrame is captured."""
+    values = [
+        LEADERBOARD_HEADER,
+        ['1', 'Club', 'last_week', '2023-06-26', '2023-07-02', '1', '10', 'Athlete 10', '2', '5000', 'Old location', 'xx', 'Old country', 'Old team', 'old.jpg'],
+    ]
+    published = {}
+
+    monkeypatch.setattr(strava_club_scraper, 'google_api_credentials', lambda: None)
+    monkeypatch.setattr(strava_club_scraper, 'google_sheets_values', lambda *, service, sheet_id, sheet_name: values)
+    monkeypatch.setattr(strava_club_scraper, 'google_sheets_sync', lambda *, publisher, sheet_name, values, df, keys: published.update(df=df))
+
+    # Return objects
+    return published
+
+
+def test_merge_club_datasets_replaces_scraped_leaderboard_weeks() -> None:
+    df_import = leaderboard_df(week='last_week', date_start='2023-07-03', date_end='2023-07-09', athlete_ids=['10', '11'])
+    df = leaderboard_df(week='last_week', date_start='2023-07-03', date_end='2023-07-09', athlete_ids=['12'])
+
+    df_updated = merge_club_datasets(df=df, df_import=df_import)
+
+    assert df_updated['athlete_id'].tolist() == ['12']
+
+
+def test_parquet_sink_upsert_keeps_stored_members(tmp_path) -> None:
+    sink = ParquetSink(path=str(tmp_path))
+    members = pd.DataFrame(data={'club_id': '1', 'athlete_id': ['10', '11'], 'athlete_name': ['Stored', 'Stored'], 'join_date': pd.Timestamp('2023-07-01')})
+
+    sink.append(dataset='members', df=members)
+    sink.upsert(dataset='members', df=members.assign(athlete_id=['11', '12'], athlete_name='Scraped', join_date=pd.Timestamp('2023-08-01')))
+
+    df = sink.read(dataset='members').sort_values(by='athlete_id', ignore_index=True)
+
+    assert df['athlete_id'].tolist() == ['10', '11', '12']
+    assert df['athlete_name'].tolist() == ['Stored', 'Stored', 'Scraped']
+
+
+@pytest.mark.parametrize('use_sink', [False, True])
+def test_strava_club_to_google_sheets_refreshes_leaderboard_member_columns(tmp_path, published: dict[str, pd.DataFrame], use_sink: bool) -> None:
+    df = leaderboard_df(week='this_week', date_start='2023-07-10', date_end='2023-07-16', athlete_ids=['10'])
+    club_members_df = pd.DataFrame(data={'club_id': ['1'], 'athlete_id': ['10'], 'athlete_location': ['Berlin'], 'athlete_location_country_code': ['de'], 'athlete_location_country': ['Germany'], 'athlete_team': ['Team'], 'athlete_picture': ['new.jpg']})
+    sink = ParquetSink(path=str(tmp_path)) if use_sink else None
+
+    strava_club_scraper.strava_club_to_google_sheets(df=df, club_members_df=club_members_df, sheet_id='sheet', sheet_name='Leaderboard', sink=sink, publisher=Publisher())
+
+    df_published = published['df']
+
+    assert df_published['leaderboard_week'].tolist() == ['last_week', 'this_week']
+    assert list(df_published.columns[-len(LEADERBOARD_MEMBER_COLUMNS) :]) == LEADERBOARD_MEMBER_COLUMNS
+    assert df_published['athlete_location'].tolist() == ['Berlin', 'Berlin']
+    assert df_published['athlete_picture'].tolist() == ['new.jpg', 'new.jpg']
+
+    if sink is not None:
+        assert not set(LEADERBOARD_MEMBER_COLUMNS) & set(sink.read(dataset='leaderboard').columns)